@@ -8,32 +8,47 @@ Based on official LiveKit + Gemini Live example
 import logging
 import json
 import os
+import sys
 import asyncio
 
-import base64
 import time
-import io
 import gc
-from typing import Optional
+import inspect
+from typing import Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-from livekit.agents import JobContext, WorkerOptions, cli, Agent, llm, function_tool, RunContext
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli, Agent, llm, function_tool, RunContext
 from livekit.agents.voice import AgentSession
-from livekit.plugins import tavus, bey, google
 from livekit import rtc
 from livekit.rtc import VideoBufferType
-import google.generativeai as genai
-from google.genai import types
-import httpx
+
+from lazy_imports import lazy_import, module_available, preload
+
+# Plugins and optional dependencies load on first use (see lazy_imports.py):
+# only the configured avatar provider is imported, PIL only with vision
+tavus = lazy_import('livekit.plugins.tavus')
+bey = lazy_import('livekit.plugins.bey')
+google = lazy_import('livekit.plugins.google')
+httpx = lazy_import('httpx')
 
 # Note: PIL is optional - vision can work without it using base64 raw frames
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    Image = None
+PIL_AVAILABLE = module_available('PIL')
+Image = lazy_import('PIL.Image') if PIL_AVAILABLE else None
+
+from bootstrap import BootstrapGraph, ReadinessBarrier
+import http_client
+from http_client import close_http_client, shared_http_client
+from medical_tools import PatientRepository, connect_context_cache, get_pool_manager, serve_context_cache
+from vision import (LIVE_VIDEO_INPUT_USD_PER_M, AdaptiveJpegEncoder, BufferPool, BufferWriter, EncodedImage,
+                    FrameChangeDetector, FrameScore, get_vision_client, FrameMemoryStats, GCPolicy, GeometryConfig,
+                    LatestFrameCapture, LiveVideoConfig, ObservationCache, ObservationPublisher, OutputGeometry,
+                    RegionOfInterestDetector, TrackRegistry,
+                    VisionExecutor, VisionJobDropped, VisionModeStats, VisionQueueFull,
+                    average_hash, compute_output_geometry, get_backend as get_yuv_backend,
+                    estimate_image_tokens, get_process_encoder, profile_for_focus,
+                    i420_to_rgb, is_avatar_identity, luma_thumbnail, nv12_to_rgb,
+                    resolve_vision_mode, score_frame, select_best_frame, shutdown_process_encoder)
 
 from tenacity import (retry, stop_after_attempt, wait_exponential,
                       retry_if_exception_type, before_sleep_log)
@@ -55,9 +70,6 @@ if 'GEMINI_API_KEY' in os.environ and 'GOOGLE_API_KEY' not in os.environ:
 logger = logging.getLogger("mediai-avatar")
 logger.setLevel(logging.INFO)
 
-# Configure Gemini for vision
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-
 # API configuration for agent tools
 NEXT_PUBLIC_URL = os.getenv('NEXT_PUBLIC_BASE_URL') or os.getenv(
     'NEXT_PUBLIC_URL', 'http://localhost:5000')
@@ -72,6 +84,19 @@ else:
 
 _current_agent_instance: Optional['MediAIAgent'] = None
 
+# Minimum seconds between Gemini Vision analyses in streaming mode
+STREAMING_ANALYSIS_INTERVAL = 30.0
+
+# look_at_patient frame source: 'oneshot' (default) opens a VideoStream per call and
+# closes it right after the capture; 'persistent' (opt-in, not yet validated on
+# non-AVX hosts) keeps one stream open per patient track (LatestFrameCapture)
+VISION_CAPTURE_MODE = os.getenv('VISION_CAPTURE_MODE', 'oneshot').lower()
+
+# look_at_patient burst (opt-in): with VISION_BURST_FRAMES > 1, up to N frames are captured
+# over the window and the sharpest/best exposed one is analysed (default 1 = single frame)
+VISION_BURST_FRAMES = max(1, int(os.getenv('VISION_BURST_FRAMES', '1')))
+VISION_BURST_WINDOW = float(os.getenv('VISION_BURST_WINDOW_MS', '300')) / 1000.0
+
 
 @retry(stop=stop_after_attempt(3),
        wait=wait_exponential(multiplier=1, min=1, max=10),
@@ -172,6 +197,21 @@ class MetricsCollector:
         self.tts_tokens = 0
         self.vision_input_tokens = 0
         self.vision_output_tokens = 0
+        self.live_video_input_tokens = 0  # VISION_MODE=live frames, billed as audio/video input
+        self.vision_frames_analysed = 0
+        self.vision_frames_skipped = 0
+        self.vision_cache = None  # ObservationCache (look_at_patient hits/misses)
+        self.vision_queue = None  # VisionExecutor (queue depth / wait time)
+        self.vision_roi = None  # RegionOfInterestDetector (crop rate / last crop)
+        self.vision_push = None  # ObservationPublisher (observations pushed into the chat)
+        self.vision_modes = None  # VisionModeStats (analysis call vs live frames)
+        self.db_pool = None  # MeteredPool (acquire wait / connections in use)
+        self.bootstrap = None  # BootstrapGraph of the session start
+        self.readiness = None  # ReadinessBarrier awaited by on_enter
+        self.prewarm = None  # prewarm() step timings of this job process (None when cold)
+        self.vision_images = 0
+        self.vision_image_bytes = 0
+        self.vision_last_image = None  # bytes/resolution/quality of the last upload
         self.active_seconds = 0
         self.last_flush = time.time()
         self.session_start = time.time()
@@ -190,6 +230,7 @@ class MetricsCollector:
         self.last_sent_tts = 0
         self.last_sent_vision_input = 0
         self.last_sent_vision_output = 0
+        self.last_sent_live_video_input = 0
         self.last_sent_active_seconds = 0
         self.last_sent_avatar_seconds = 0
 
@@ -294,6 +335,12 @@ class MetricsCollector:
             f"[Metrics] TTS (audio): +{tokens} tokens for {duration_seconds:.1f}s (total: {self.tts_tokens})"
         )
 
+    def track_vision_image(self, encoded: 'EncodedImage'):
+        """Registra bytes/resolução/qualidade reais de cada imagem enviada."""
+        self.vision_images += 1
+        self.vision_image_bytes += len(encoded.data)
+        self.vision_last_image = encoded.describe()
+
     def track_vision(self, usage_metadata):
         """Rastreia tokens de visão do Gemini Vision - EXTRAI VALORES REAIS."""
         if not usage_metadata:
@@ -356,6 +403,7 @@ class MetricsCollector:
         # Audio/Video Output (TTS): $12.00/1M tokens
         # Vision/Image Input: $0.50/1M tokens (same as text for native audio)
         # Vision Output: $2.00/1M tokens (same as text for native audio)
+        # Live video frames (VISION_MODE=live): Audio/Video input, $3.00/1M tokens
 
         stt_cost_usd = (self.stt_tokens / 1_000_000) * 3.00       # Audio/Video input
         llm_input_cost_usd = (self.llm_input_tokens / 1_000_000) * 0.50    # Text input
@@ -363,10 +411,11 @@ class MetricsCollector:
         tts_cost_usd = (self.tts_tokens / 1_000_000) * 12.00      # Audio/Video output
         vision_input_cost_usd = (self.vision_input_tokens / 1_000_000) * 0.50  # Same as text input
         vision_output_cost_usd = (self.vision_output_tokens / 1_000_000) * 2.00  # Same as text output
+        live_video_cost_usd = (self.live_video_input_tokens / 1_000_000) * LIVE_VIDEO_INPUT_USD_PER_M
 
         gemini_total_usd = (stt_cost_usd + llm_input_cost_usd + llm_output_cost_usd +
                            tts_cost_usd + vision_input_cost_usd +
-                           vision_output_cost_usd)
+                           vision_output_cost_usd + live_video_cost_usd)
 
         # ========================================
         # AVATAR COST (adicional, cobrado por minuto)
@@ -404,13 +453,15 @@ class MetricsCollector:
         delta_tts = self.tts_tokens - self.last_sent_tts
         delta_vision_input = self.vision_input_tokens - self.last_sent_vision_input
         delta_vision_output = self.vision_output_tokens - self.last_sent_vision_output
+        delta_live_video_input = self.live_video_input_tokens - self.last_sent_live_video_input
         delta_active_seconds = self.active_seconds - self.last_sent_active_seconds
         delta_avatar_seconds = self.avatar_seconds - self.last_sent_avatar_seconds
 
         # Verificar se há mudanças para enviar
         if (delta_stt == 0 and delta_llm_input == 0 and delta_llm_output == 0
                 and delta_tts == 0 and delta_vision_input == 0
-                and delta_vision_output == 0 and delta_active_seconds == 0
+                and delta_vision_output == 0 and delta_live_video_input == 0
+                and delta_active_seconds == 0
                 and delta_avatar_seconds == 0):
             logger.debug(
                 "[Metrics] Nenhuma mudança desde último envio - pulando")
@@ -427,11 +478,14 @@ class MetricsCollector:
         delta_tts_cost_usd = (delta_tts / 1_000_000) * 12.00      # Audio/Video output: $12.00/1M
         delta_vision_input_cost_usd = (delta_vision_input / 1_000_000) * 0.50  # Image: $0.50/1M
         delta_vision_output_cost_usd = (delta_vision_output / 1_000_000) * 2.00  # Vision: $2.00/1M
+        # Live frames: Audio/Video input, $3.00/1M
+        delta_live_video_cost_usd = (delta_live_video_input / 1_000_000) * LIVE_VIDEO_INPUT_USD_PER_M
 
         delta_gemini_cost_usd = (delta_stt_cost_usd + delta_llm_input_cost_usd +
                                  delta_llm_output_cost_usd + delta_tts_cost_usd +
                                  delta_vision_input_cost_usd +
-                                 delta_vision_output_cost_usd)
+                                 delta_vision_output_cost_usd +
+                                 delta_live_video_cost_usd)
 
         # ========================================
         # Calcular custo Avatar (separado, cobrado por minuto)
@@ -465,8 +519,8 @@ class MetricsCollector:
             "llmInputTokens": delta_llm_input,
             "llmOutputTokens": delta_llm_output,
             "ttsTokens": delta_tts,
-            "visionTokens": delta_vision_input + delta_vision_output,
-            "visionInputTokens": delta_vision_input,
+            "visionTokens": delta_vision_input + delta_live_video_input + delta_vision_output,
+            "visionInputTokens": delta_vision_input + delta_live_video_input,
             "visionOutputTokens": delta_vision_output,
             "activeSeconds": delta_active_seconds,
             "avatarSeconds": delta_avatar_seconds,
@@ -475,6 +529,22 @@ class MetricsCollector:
             "metadata": {
                 "model": "gemini-2.5-flash",
                 "avatarProvider": self.avatar_provider,
+                "visionFramesAnalysed": self.vision_frames_analysed,
+                "visionFramesSkipped": self.vision_frames_skipped,
+                "liveVideoInputTokens": delta_live_video_input,
+                "visionCacheHits": self.vision_cache.hits if self.vision_cache else 0,
+                "visionCacheMisses": self.vision_cache.misses if self.vision_cache else 0,
+                "visionQueue": self.vision_queue.snapshot() if self.vision_queue else None,
+                "visionRoi": self.vision_roi.snapshot() if self.vision_roi else None,
+                "visionPush": self.vision_push.snapshot() if self.vision_push else None,
+                "visionModes": self.vision_modes.snapshot() if self.vision_modes else None,
+                "dbPool": self.db_pool.snapshot() if self.db_pool else None,
+                "bootstrap": self.bootstrap.snapshot() if self.bootstrap else None,
+                "readiness": self.readiness.snapshot() if self.readiness else None,
+                "prewarm": self.prewarm,
+                "visionImages": self.vision_images,
+                "visionImageBytes": self.vision_image_bytes,
+                "visionLastImage": self.vision_last_image,
                 "timestamp": time.time()
             }
         }
@@ -486,20 +556,20 @@ class MetricsCollector:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=10.0,
-                                         follow_redirects=True) as client:
+            async with shared_http_client() as client:
                 response = await client.post(url,
                                              json=payload,
-                                             headers=headers)
+                                             headers=headers,
+                                             timeout=10.0)
                 response.raise_for_status()
 
                 logger.info(
                     f"[Metrics] ✅ Métricas DELTA enviadas com sucesso!")
                 logger.info(
-                    f"[Metrics] Delta tokens: +{delta_stt + delta_llm_input + delta_llm_output + delta_tts + delta_vision_input + delta_vision_output}"
+                    f"[Metrics] Delta tokens: +{delta_stt + delta_llm_input + delta_llm_output + delta_tts + delta_vision_input + delta_live_video_input + delta_vision_output}"
                 )
                 logger.info(
-                    f"[Metrics] Total acumulado: {self.stt_tokens + self.llm_input_tokens + self.llm_output_tokens + self.tts_tokens + self.vision_input_tokens + self.vision_output_tokens}"
+                    f"[Metrics] Total acumulado: {self.stt_tokens + self.llm_input_tokens + self.llm_output_tokens + self.tts_tokens + self.vision_input_tokens + self.live_video_input_tokens + self.vision_output_tokens}"
                 )
                 logger.info(f"[Metrics] Tempo ativo: {self.active_seconds}s")
                 logger.info(
@@ -512,6 +582,7 @@ class MetricsCollector:
                 self.last_sent_tts = self.tts_tokens
                 self.last_sent_vision_input = self.vision_input_tokens
                 self.last_sent_vision_output = self.vision_output_tokens
+                self.last_sent_live_video_input = self.live_video_input_tokens
                 self.last_sent_active_seconds = self.active_seconds
                 self.last_sent_avatar_seconds = self.avatar_seconds
 
@@ -587,15 +658,109 @@ async def get_avatar_provider_config(pool) -> str:
         return 'tavus'
 
 
+# Avatar provider read by prewarm(): only a hint (which plugin to preload), sessions re-read it
+_prewarmed_avatar_provider: Optional[str] = None
+
+
+async def resolve_avatar_provider(pool) -> str:
+    """Avatar provider for this session, read from the database on every session.
+
+    The prewarmed value is only used when the job has no pool to read it with.
+    """
+    if pool is None and _prewarmed_avatar_provider is not None:
+        logger.info(f"[MediAI] No database pool - using avatar provider from prewarm: {_prewarmed_avatar_provider}")
+        return _prewarmed_avatar_provider
+    return await get_avatar_provider_config(pool)
+
+
+def avatar_plugin(avatar_provider: str):
+    """Lazy plugin module start_avatar() uses for `avatar_provider`, or None without credentials."""
+    if avatar_provider == 'bey':
+        return bey if os.getenv('BEY_API_KEY') else None
+    if all(os.getenv(var) for var in ('TAVUS_API_KEY', 'TAVUS_REPLICA_ID', 'TAVUS_PERSONA_ID')):
+        return tavus
+    return None
+
+
+def prewarm(proc: JobProcess):
+    """Per-process warm-up, run by LiveKit in idle job processes before a job is assigned.
+
+    This builds what would otherwise be built on the first job: the shared
+    HTTP client, PIL's codecs, the vision client and encoder workers and the
+    lazily imported plugins the session will use (Gemini and the configured
+    avatar provider's, looked up here only to pick the plugin; every session
+    reads the provider again). The asyncpg pool is not created here:
+    it is bound to the job's event loop, which does not exist yet (the
+    entrypoint starts it before connecting to the room).
+    """
+    timings = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            logger.warning(f"[MediAI] Prewarm step '{name}' failed: {e}")
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def warm_pil():
+        import io
+        Image.init()
+        Image.new('RGB', (16, 16)).save(io.BytesIO(), format='JPEG')
+
+    def warm_vision_encoder():
+        encoder = get_process_encoder()
+        if encoder is not None:
+            encoder.warm_up()
+
+    def resolve_provider():
+        global _prewarmed_avatar_provider
+
+        async def fetch():
+            import asyncpg
+            pool = await asyncpg.create_pool(os.environ['DATABASE_URL'], min_size=1, max_size=1, timeout=5)
+            try:
+                return await get_avatar_provider_config(pool)
+            finally:
+                await pool.close()
+
+        _prewarmed_avatar_provider = asyncio.run(fetch())
+
+    timed('http', http_client.prewarm)
+    if PIL_AVAILABLE:
+        timed('pil', warm_pil)
+    if os.getenv('ENABLE_VISION', 'false').lower() == 'true':
+        timed('visionClient', get_vision_client)
+        timed('visionEncoder', warm_vision_encoder)
+    if os.getenv('DATABASE_URL'):
+        timed('avatarConfig', resolve_provider)
+
+    provider = _prewarmed_avatar_provider or 'tavus'
+    timed('plugins', lambda: preload(*[module for module in (google, avatar_plugin(provider)) if module]))
+
+    proc.userdata['prewarm'] = timings
+    logger.info(f"[MediAI] 🔥 Process prewarmed in {sum(timings.values()):.0f} ms: {timings}")
+
+
 # =========================================
 # FUNCTION TOOLS - LiveKit Official Pattern
 # =========================================
 # Seguindo padrão oficial: https://docs.livekit.io/agents/build/tools/
 
 
+# Exams included in the patient context
+PATIENT_CONTEXT_EXAMS = max(0, int(os.getenv('PATIENT_CONTEXT_EXAMS', '3')))
+
+
 async def get_patient_context(pool, patient_id: str) -> str:
     """Get complete patient context for the AI.
-    
+
+    Single round trip (PatientRepository.get_prompt_context); asyncpg keeps the
+    prepared statement in the connection's statement cache (DB_STATEMENT_CACHE_SIZE),
+    so later sessions on the same pooled connection skip the parse/plan step.
+    Contexts are kept in the worker-level cache (medical_tools.context_cache), so a
+    reconnecting patient skips the database entirely until their data changes.
+
     Args:
         pool: asyncpg connection pool (shared across all operations)
         patient_id: Patient ID to fetch context for
@@ -604,41 +769,34 @@ async def get_patient_context(pool, patient_id: str) -> str:
         logger.warning("[MediAI] No database pool - returning default context")
         return "Paciente não identificado no banco de dados. Pergunte o nome do paciente."
 
+    context_cache = connect_context_cache()
+    cache_token = None
+    if context_cache is not None:
+        cached = await context_cache.get(patient_id)
+        if cached is not None:
+            logger.info(f"[MediAI] ⚡ Patient context from worker cache ({len(cached)} chars)")
+            return cached
+        # Taken before the query: a change notified while we read is not cached
+        cache_token = await context_cache.begin(patient_id)
+
     try:
         logger.info(f"[MediAI] 🔍 Acquiring database connection for patient {patient_id}...")
         
         # Add timeout to prevent hanging
         async with asyncio.timeout(15):
-            async with pool.acquire() as conn:
-                logger.info("[MediAI] ✅ Database connection acquired")
-                
-                patient = await conn.fetchrow(
-                    """
-                    SELECT name, email, age, reported_symptoms, doctor_notes, exam_results
-                    FROM patients WHERE id = $1
-                    """, patient_id)
-
-                logger.info(f"[MediAI] 📋 Patient query result: {patient is not None}")
-
-                exams = await conn.fetch(
-                    """
-                    SELECT type, status, result, preliminary_diagnosis, created_at::text as date
-                    FROM exams 
-                    WHERE patient_id = $1
-                    ORDER BY created_at DESC
-                    LIMIT 3
-                    """, patient_id)
-
-                wellness = await conn.fetchrow(
-                    """
-                    SELECT wellness_plan FROM patients WHERE id = $1
-                    """, patient_id)
-
-                if not patient:
-                    logger.warning(f"[MediAI] ⚠️ Patient not found: {patient_id}")
-                    return "Paciente não encontrado no sistema. Pergunte o nome do paciente."
-
-                context = f"""
+            query_start = time.perf_counter()
+            patient = await PatientRepository(pool).get_prompt_context(patient_id, PATIENT_CONTEXT_EXAMS)
+            query_ms = (time.perf_counter() - query_start) * 1000
+
+            logger.info(f"[MediAI] 📋 Patient query result: {patient is not None} ({query_ms:.0f} ms)")
+
+        if not patient:
+            logger.warning(f"[MediAI] ⚠️ Patient not found: {patient_id}")
+            return "Paciente não encontrado no sistema. Pergunte o nome do paciente."
+
+        exams = patient['recent_exams']
+
+        context = f"""
 INFORMAÇÕES DO PACIENTE:
 - Nome: {patient['name']}
 - Idade: {patient['age'] if patient['age'] else 'Não informada'} anos
@@ -649,32 +807,26 @@ INFORMAÇÕES DO PACIENTE:
 EXAMES RECENTES ({len(exams)}):
 """
 
-                for i, exam in enumerate(exams, 1):
-                    context += f"\n{i}. {exam['type']} - {exam['date']}"
-                    context += f"\n   Status: {exam['status']}"
-                    context += f"\n   Resultado: {exam['result']}"
-                    if exam['preliminary_diagnosis']:
-                        context += f"\n   Diagnóstico Preliminar: {exam['preliminary_diagnosis']}"
-                    context += "\n"
+        for i, exam in enumerate(exams, 1):
+            context += f"\n{i}. {exam['type']} - {exam['date']}"
+            context += f"\n   Status: {exam['status']}"
+            context += f"\n   Resultado: {exam['result']}"
+            if exam['preliminary_diagnosis']:
+                context += f"\n   Diagnóstico Preliminar: {exam['preliminary_diagnosis']}"
+            context += "\n"
 
-                if wellness and wellness['wellness_plan']:
-                    try:
-                        if isinstance(wellness['wellness_plan'], str):
-                            import json
-                            wp = json.loads(wellness['wellness_plan'])
-                        else:
-                            wp = wellness['wellness_plan']
-
-                        context += f"\n\nPLANO DE BEM-ESTAR:"
-                        if wp.get('dietaryPlan'):
-                            context += f"\nDieta: {wp['dietaryPlan'][:200]}..."
-                        if wp.get('exercisePlan'):
-                            context += f"\nExercícios: {wp['exercisePlan'][:200]}..."
-                    except:
-                        pass
+        if patient['dietary_plan'] or patient['exercise_plan']:
+            context += f"\n\nPLANO DE BEM-ESTAR:"
+            if patient['dietary_plan']:
+                context += f"\nDieta: {patient['dietary_plan']}..."
+            if patient['exercise_plan']:
+                context += f"\nExercícios: {patient['exercise_plan']}..."
 
-                logger.info(f"[MediAI] ✅ Patient context built: {len(context)} chars")
-                return context
+        if context_cache is not None:
+            await context_cache.put(patient_id, context, cache_token)
+
+        logger.info(f"[MediAI] ✅ Patient context built: {len(context)} chars")
+        return context
 
     except asyncio.TimeoutError:
         logger.error(f"[MediAI] ⏱️ Database query timeout for patient {patient_id}")
@@ -707,7 +859,7 @@ async def _search_doctors_impl(specialty: str = None, limit: int = 5) -> dict:
         }
 
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with shared_http_client() as client:
             url = f"{NEXT_PUBLIC_URL}/api/ai-agent/doctors"
             params = {"limit": str(limit)}
             if specialty:
@@ -896,7 +1048,7 @@ async def _get_available_slots_impl(doctor_id: str, date: str) -> dict:
     actual_doctor_id = resolved_id
 
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with shared_http_client() as client:
             url = f"{NEXT_PUBLIC_URL}/api/ai-agent/schedule"
             params = {"doctorId": actual_doctor_id, "date": date}
             headers = {"x-agent-secret": AGENT_SECRET}
@@ -1009,7 +1161,7 @@ async def _schedule_appointment_impl(doctor_id: str,
         return {"success": False, "error": "Configuração ausente"}
 
     try:
-        async with httpx.AsyncClient(follow_redirects=True) as client:
+        async with shared_http_client() as client:
             url = f"{NEXT_PUBLIC_URL}/api/ai-agent/schedule"
             headers = {
                 "x-agent-secret": AGENT_SECRET,
@@ -1277,51 +1429,12 @@ async def look_at_patient(context: Optional[object] = None, observation_focus: s
     try:
         logger.info(f"[Vision] 👁️ Looking at patient (focus: {observation_focus})")
 
-        async def _ensure_subscribed_video_track(track_pub, timeout_s: float = 5.0):
-            try:
-                if not getattr(track_pub, "subscribed", False):
-                    try:
-                        track_pub.set_subscribed(True)
-                    except Exception as subscribe_err:
-                        logger.warning(f"[Vision] Could not subscribe to video track: {subscribe_err}")
-            except Exception:
-                pass
-
-            start = time.time()
-            while time.time() - start < timeout_s:
-                try:
-                    track = getattr(track_pub, "track", None)
-                    if track is not None:
-                        return track
-                except Exception:
-                    pass
-                await asyncio.sleep(0.1)
-
-            return None
-
-        # Find patient video track
+        # Find patient video track (registry is fed by room events; waits only if the camera isn't up yet)
         video_track = None
-        patient_identity = None
-        avatar_identities = ['bey-avatar-agent', 'tavus-avatar', 'avatar-agent']
-
-        for participant in agent.room.remote_participants.values():
-            # Skip avatar agents
-            if participant.identity.lower() in avatar_identities or 'avatar' in participant.identity.lower():
-                continue
-            
-            # Find video track
-            for track_pub in participant.track_publications.values():
-                if track_pub.kind != rtc.TrackKind.KIND_VIDEO:
-                    continue
-
-                maybe_track = await _ensure_subscribed_video_track(track_pub)
-                if maybe_track is not None:
-                    video_track = maybe_track
-                    patient_identity = participant.identity
-                    logger.info(f"[Vision] Found video track from: {patient_identity}")
-                    break
-            if video_track:
-                break
+        found = await agent._track_registry.wait_for_video_track(timeout=5.0)
+        if found is not None:
+            patient_identity, video_track = found
+            logger.info(f"[Vision] Found video track from: {patient_identity}")
         
         if not video_track:
             logger.warning("[Vision] No video track available from patient")
@@ -1331,28 +1444,56 @@ async def look_at_patient(context: Optional[object] = None, observation_focus: s
                 "observation": None
             }
         
-        # Capture a single frame using VideoStream - grab first frame and close immediately
-        # This minimizes the time the VideoStream is active
         video_stream = None
         try:
-            logger.info("[Vision] 📸 Creating VideoStream for single frame capture...")
-            video_stream = rtc.VideoStream(video_track)
-            
-            # Get first frame with timeout
-            async def get_first_frame():
-                async for frame_event in video_stream:
-                    return frame_event.frame
-                return None
-            
-            frame = await asyncio.wait_for(get_first_frame(), timeout=5.0)
+            if VISION_CAPTURE_MODE == 'persistent':
+                # Latest frames from the session's long-lived stream (opened on first use)
+                frame_capture = await agent._get_frame_capture(video_track)
+                frames = await frame_capture.get_burst(VISION_BURST_FRAMES, VISION_BURST_WINDOW, timeout=5.0)
+            else:
+                # Capture a short burst using VideoStream - grab the frames and close immediately
+                # This minimizes the time the VideoStream is active
+                logger.info("[Vision] 📸 Creating VideoStream for frame capture...")
+                video_stream = rtc.VideoStream(video_track)
+                frame_iter = video_stream.__aiter__()
+                
+                # Get first frame with timeout
+                async def get_first_frame():
+                    async for frame_event in video_stream:
+                        return frame_event.frame
+                    return None
+                
+                frames = [await asyncio.wait_for(get_first_frame(), timeout=5.0)]
+                burst_deadline = time.monotonic() + VISION_BURST_WINDOW
+                while frames[0] is not None and len(frames) < VISION_BURST_FRAMES:
+                    remaining = burst_deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        frames.append((await asyncio.wait_for(frame_iter.__anext__(), timeout=remaining)).frame)
+                    except (asyncio.TimeoutError, StopAsyncIteration):
+                        break
+                
+                # Close stream immediately after getting frame
+                if video_stream:
+                    try:
+                        await video_stream.aclose()
+                    except Exception:
+                        pass
+                    video_stream = None
             
-            # Close stream immediately after getting frame
-            if video_stream:
+            # Several frames: keep only the sharpest / best exposed one (scored on the vision pool)
+            frame = frames[-1]
+            if len(frames) > 1:
                 try:
-                    await video_stream.aclose()
-                except Exception:
+                    best_index, scores = await agent._vision_executor.submit(
+                        select_best_frame, frames, agent._score_frame)
+                    frame = frames[best_index]
+                    logger.info(f"[Vision] Burst of {len(frames)} frames, picked #{best_index + 1}: "
+                                f"{[round(s.score) if s else None for s in scores]}")
+                except VisionQueueFull:
                     pass
-                video_stream = None
+            frames = None
             
             if frame is None or frame.width <= 0 or frame.height <= 0:
                 return {
@@ -1363,9 +1504,36 @@ async def look_at_patient(context: Optional[object] = None, observation_focus: s
             
             logger.info(f"[Vision] Got frame: {frame.width}x{frame.height}")
             
-            # Process frame to JPEG
-            frame_bytes = await asyncio.to_thread(agent._process_video_frame_sync, frame)
+            # Same focus + question on an effectively unchanged image: reuse the last answer
+            frame_hash = average_hash(agent._frame_thumbnail(frame))
+            cached_observation = agent._observation_cache.get(frame_hash, observation_focus, specific_question)
+            if cached_observation:
+                logger.info(f"[Vision] ♻️ Observation cache hit (focus: {observation_focus}) - skipping Gemini call")
+                agent._latest_vision_observation = cached_observation
+                agent._last_observation_focus = observation_focus
+                agent._last_specific_question = specific_question
+                return {
+                    "success": True,
+                    "observation_focus": observation_focus,
+                    "specific_question": specific_question,
+                    "observation": cached_observation,
+                    "message": f"Imagem do paciente inalterada - observação recente reutilizada. Foco: {observation_focus}"
+                }
             
+            # Process frame to JPEG on the dedicated vision pool
+            # (repeat calls on the same captured frame share one job)
+            try:
+                encoded = await agent._vision_executor.submit(
+                    agent._process_video_frame_sync, frame, observation_focus,
+                    key=('frame', id(frame), observation_focus))
+            except VisionQueueFull:
+                return {
+                    "success": False,
+                    "error": "Sistema de visão ocupado, tente novamente em instantes",
+                    "observation": None
+                }
+            
+            frame_bytes = encoded.data if encoded else None
             if not frame_bytes:
                 return {
                     "success": False,
@@ -1376,19 +1544,18 @@ async def look_at_patient(context: Optional[object] = None, observation_focus: s
             # Send to Gemini session for analysis with specific context
             observation = None
             if agent._agent_session:
-                observation = await agent._send_frame_to_session_with_context(frame_bytes, observation_focus, specific_question)
+                observation = await agent._send_frame_to_session_with_context(
+                    frame_bytes, observation_focus, specific_question,
+                    estimated_image_tokens=encoded.estimated_tokens)
                 if observation:
                     logger.info(f"[Vision] ✅ Frame analyzed by Gemini ({len(frame_bytes)} bytes)")
+                    agent._observation_cache.put(frame_hash, observation_focus, specific_question, observation)
                 else:
                     logger.warning(f"[Vision] Frame analysis returned no observation ({len(frame_bytes)} bytes)")
             
-            # Track metrics
-            if agent.metrics_collector:
-                agent.metrics_collector.vision_input_tokens += 258
-            
             # Cleanup
             del frame_bytes
-            gc.collect()
+            agent._vision_gc_policy.maybe_collect()
             
             return {
                 "success": True,
@@ -1432,22 +1599,30 @@ class MediAIAgent(Agent):
                  room: rtc.Room,
                  metrics_collector: Optional[MetricsCollector] = None,
                  patient_id: str = None,
-                 vision_streaming_enabled: bool = False):
+                 vision_streaming_enabled: bool = False,
+                 vision_mode: Optional[str] = None):
         global _current_agent_instance
 
+        vision_mode = vision_mode or ('streaming' if vision_streaming_enabled else 'on_demand')
+
         # Build dynamic tools list based on vision mode
         # If streaming is enabled, AI receives frames automatically + get_visual_observation tool
         # If streaming is disabled (on-demand mode), AI uses look_at_patient tool to see patient
+        # In live mode the realtime model sees the video itself; look_at_patient stays for close-ups
         agent_tools = [search_doctors, get_available_slots, schedule_appointment]
         
-        if not vision_streaming_enabled:
-            # On-demand mode: add look_at_patient tool to capture frames on demand
-            agent_tools.append(look_at_patient)
-            logger.info("[MediAI] 👁️ Vision mode: ON-DEMAND (look_at_patient tool available)")
-        else:
+        if vision_mode == 'streaming':
             # Streaming mode: add get_visual_observation to access analyzed frames
             agent_tools.append(get_visual_observation)
             logger.info("[MediAI] 👁️ Vision mode: STREAMING (get_visual_observation tool available)")
+        elif vision_mode == 'live':
+            agent_tools.append(look_at_patient)
+            logger.info("[MediAI] 👁️ Vision mode: LIVE (frames pushed to the realtime session, "
+                        "look_at_patient for close-ups)")
+        else:
+            # On-demand mode: add look_at_patient tool to capture frames on demand
+            agent_tools.append(look_at_patient)
+            logger.info("[MediAI] 👁️ Vision mode: ON-DEMAND (look_at_patient tool available)")
 
         super().__init__(instructions=instructions, tools=agent_tools)
         
@@ -1460,11 +1635,13 @@ class MediAIAgent(Agent):
         self.doctor_search_cache = None
         self.last_doctor_search_time = 0
         self._agent_session = None
+        self._readiness: Optional[ReadinessBarrier] = None  # set by the entrypoint
         self.last_frame_send_time = 0
         self._video_stream = None
         self._current_video_track = None
         self._video_streaming_active = False
-        self._vision_streaming_enabled = vision_streaming_enabled
+        self._vision_streaming_enabled = vision_mode in ('streaming', 'live')
+        self._vision_mode = vision_mode
         
         # Vision observation storage (for streaming mode)
         self._latest_vision_observation: Optional[str] = None
@@ -1472,143 +1649,154 @@ class MediAIAgent(Agent):
         self._last_observation_focus: str = "geral"
         self._last_specific_question: str = ""
 
+        # Allocation counter for the frame pipeline (peak RSS per vision call)
+        self._vision_memory_stats = FrameMemoryStats()
+        # Reused RGB/JPEG buffers (bounded, replaces per-frame gc.collect)
+        self._vision_buffer_pool = BufferPool(on_allocate=self._vision_memory_stats.record_allocation)
+        # Opt-in collections off the hot path (VISION_GC_POLICY, default off)
+        self._vision_gc_policy = GCPolicy()
+        # Dedicated, bounded pool for frame processing (keeps the default executor free);
+        # built with the process encoder on first use, see _vision_executor
+        self._vision_executor_instance: Optional[VisionExecutor] = None
+        self._process_encoder = None
+        # Per-focus resolution/JPEG quality within VISION_BYTE_BUDGET / VISION_TOKEN_BUDGET
+        self._adaptive_encoder = AdaptiveJpegEncoder()
+        # Skin-region crop for face/lesion foci (VISION_ROI, opt-in)
+        self._roi_detector = RegionOfInterestDetector()
+        if metrics_collector:
+            metrics_collector.vision_roi = self._roi_detector
+        # Output size knobs (VISION_TARGET_WIDTH/HEIGHT, VISION_ASPECT_POLICY)
+        self._vision_geometry = GeometryConfig.from_env()
+        # Skips encoding/analysis of near-identical streaming frames
+        self._frame_change_detector = FrameChangeDetector()
+        # Reuses look_at_patient answers while the image and question are unchanged
+        self._observation_cache = ObservationCache()
+        if metrics_collector:
+            metrics_collector.vision_cache = self._observation_cache
+        # Live mode: low-rate frames straight into the realtime session's video input
+        self._live_video_config = LiveVideoConfig()
+        # Side-by-side latency/cost of analysis calls vs live frames
+        self._vision_mode_stats = VisionModeStats(vision_mode)
+        if metrics_collector:
+            metrics_collector.vision_modes = self._vision_mode_stats
+        # Streaming mode: significant observations go straight into the chat context
+        self._observation_publisher = ObservationPublisher()
+        if metrics_collector:
+            metrics_collector.vision_push = self._observation_publisher
+        # Patient video tracks, kept current by room events (built on first use)
+        self._track_registry_instance: Optional[TrackRegistry] = None
+        # Streaming frames handed to the vision pool without blocking the video loop
+        self._stream_frame_tasks: set = set()
+        self._stream_frame_seq = 0
+        self._stream_sent_seq = 0
+        self._stream_send_lock = asyncio.Lock()
+        # Persistent on-demand capture (VISION_CAPTURE_MODE=persistent)
+        self._frame_capture: Optional[LatestFrameCapture] = None
+        self._frame_capture_track_sid: Optional[str] = None
+
         _current_agent_instance = self
         logger.info("[MediAI] Agent instance registered")
 
-    def _convert_i420_to_rgb_pure(self, yuv_data: bytes, width: int, height: int) -> Optional['Image.Image']:
-        """Convert I420/YUV420p to RGB using pure Python (no SIMD).
+    @property
+    def _vision_executor(self) -> VisionExecutor:
+        """Vision pool, created on the first look_at_patient call or streaming frame.
+
+        Sessions without vision never start its threads or the process encoder.
+        """
+        if self._vision_executor_instance is None:
+            self._vision_executor_instance = VisionExecutor()
+            # Optional out-of-process JPEG encoding (VISION_ENCODER=process), used by pool jobs
+            self._process_encoder = get_process_encoder()
+            if self.metrics_collector:
+                self.metrics_collector.vision_queue = self._vision_executor_instance
+        return self._vision_executor_instance
+
+    @property
+    def _track_registry(self) -> TrackRegistry:
+        """Patient video track index, created on first use (it picks up tracks already in the room)."""
+        if self._track_registry_instance is None:
+            self._track_registry_instance = TrackRegistry(self.room)
+        return self._track_registry_instance
+
+    def _convert_i420_to_rgb(self, yuv_data, width: int, height: int,
+                             geometry: Optional[OutputGeometry] = None,
+                             out: Optional[bytearray] = None) -> Optional['Image.Image']:
+        """Convert I420/YUV420p to RGB using the vision colour-conversion engine.
         
-        I420 format: Y plane (width*height) + U plane (width/2*height/2) + V plane (width/2*height/2)
+        yuv_data may be a memoryview over the LiveKit frame buffer; planes are
+        read in place. The backend (numpy/table/pure) is selected via VISION_YUV_BACKEND; all
+        backends produce bit-identical BT.601 output.
         
-        NOTE: Converts at 1/2 resolution to balance quality and performance.
-        Final resize to target resolution is handled later in _process_video_frame_sync.
+        Conversion, crop and resize happen in a single pass at geometry.sample_size
+        (1/2 resolution when no geometry is given). When out is given (a pooled
+        buffer) the RGB pixels are written into it instead of a new bytearray.
         """
         try:
-            y_size = width * height
-            uv_size = (width // 2) * (height // 2)
-            
-            if len(yuv_data) < y_size + 2 * uv_size:
-                logger.warning(f"[Vision] I420 data too small: {len(yuv_data)} < {y_size + 2 * uv_size}")
+            backend = get_yuv_backend()
+            result = i420_to_rgb(yuv_data, width, height, backend=backend, geometry=geometry, out=out)
+            if result is None:
                 return None
-            
-            y_plane = yuv_data[:y_size]
-            u_plane = yuv_data[y_size:y_size + uv_size]
-            v_plane = yuv_data[y_size + uv_size:y_size + 2 * uv_size]
-            
-            # Use 1/2 resolution for better quality (was 1/4 which is too low)
-            # Final resolution is controlled by _process_video_frame_sync
-            downsample_factor = 2
-            target_w = width // downsample_factor
-            target_h = height // downsample_factor
-            
-            logger.info(f"[Vision] I420 converting {width}x{height} -> {target_w}x{target_h}")
-            
-            rgb_data = bytearray(target_w * target_h * 3)
-            
-            for y in range(target_h):
-                for x in range(target_w):
-                    # Sample from original coordinates
-                    src_x = x * downsample_factor
-                    src_y = y * downsample_factor
-                    
-                    y_idx = src_y * width + src_x
-                    uv_idx = (src_y // 2) * (width // 2) + (src_x // 2)
-                    
-                    Y = y_plane[y_idx] if y_idx < len(y_plane) else 128
-                    U = u_plane[uv_idx] if uv_idx < len(u_plane) else 128
-                    V = v_plane[uv_idx] if uv_idx < len(v_plane) else 128
-                    
-                    # YUV to RGB conversion (BT.601 standard)
-                    C = Y - 16
-                    D = U - 128
-                    E = V - 128
-                    
-                    R = max(0, min(255, (298 * C + 409 * E + 128) >> 8))
-                    G = max(0, min(255, (298 * C - 100 * D - 208 * E + 128) >> 8))
-                    B = max(0, min(255, (298 * C + 516 * D + 128) >> 8))
-                    
-                    idx = (y * target_w + x) * 3
-                    rgb_data[idx] = R
-                    rgb_data[idx + 1] = G
-                    rgb_data[idx + 2] = B
-            
-            return Image.frombytes('RGB', (target_w, target_h), bytes(rgb_data))
+
+            rgb_data, (target_w, target_h) = result
+            if rgb_data is not out:
+                self._vision_memory_stats.record_allocation(len(rgb_data))
+            logger.info(f"[Vision] I420 converted {width}x{height} -> {target_w}x{target_h} ({backend.name})")
+            # frombuffer decodes straight from the converter output (no bytes() copy)
+            img = Image.frombuffer('RGB', (target_w, target_h), rgb_data, 'raw', 'RGB', 0, 1)
+            self._record_image_allocation(img)
+            return img
             
         except Exception as e:
             logger.error(f"[Vision] I420 conversion error: {e}")
             return None
 
-    def _convert_nv12_to_rgb_pure(self, nv12_data: bytes, width: int, height: int) -> Optional['Image.Image']:
-        """Convert NV12 to RGB using pure Python (no SIMD).
-        
-        NV12 format: Y plane (width*height) + interleaved UV plane (width*height/2)
+    def _convert_nv12_to_rgb(self, nv12_data, width: int, height: int,
+                             geometry: Optional[OutputGeometry] = None,
+                             out: Optional[bytearray] = None) -> Optional['Image.Image']:
+        """Convert NV12 to RGB using the vision colour-conversion engine.
         
-        NOTE: Converts at 1/2 resolution to balance quality and performance.
+        Sampling follows the same single-pass geometry as _convert_i420_to_rgb.
         """
         try:
-            y_size = width * height
-            uv_size = width * (height // 2)
-            
-            if len(nv12_data) < y_size + uv_size:
-                logger.warning(f"[Vision] NV12 data too small: {len(nv12_data)} < {y_size + uv_size}")
+            backend = get_yuv_backend()
+            result = nv12_to_rgb(nv12_data, width, height, backend=backend, geometry=geometry, out=out)
+            if result is None:
                 return None
-            
-            y_plane = nv12_data[:y_size]
-            uv_plane = nv12_data[y_size:y_size + uv_size]
-            
-            # Use 1/2 resolution for better quality (was 1/4 which is too low)
-            downsample_factor = 2
-            target_w = width // downsample_factor
-            target_h = height // downsample_factor
-            
-            logger.info(f"[Vision] NV12 converting {width}x{height} -> {target_w}x{target_h}")
-            
-            rgb_data = bytearray(target_w * target_h * 3)
-            
-            for y in range(target_h):
-                for x in range(target_w):
-                    src_x = x * downsample_factor
-                    src_y = y * downsample_factor
-                    
-                    y_idx = src_y * width + src_x
-                    uv_idx = (src_y // 2) * width + (src_x // 2) * 2
-                    
-                    Y = y_plane[y_idx] if y_idx < len(y_plane) else 128
-                    U = uv_plane[uv_idx] if uv_idx < len(uv_plane) else 128
-                    V = uv_plane[uv_idx + 1] if uv_idx + 1 < len(uv_plane) else 128
-                    
-                    # YUV to RGB conversion (BT.601 standard)
-                    C = Y - 16
-                    D = U - 128
-                    E = V - 128
-                    
-                    R = max(0, min(255, (298 * C + 409 * E + 128) >> 8))
-                    G = max(0, min(255, (298 * C - 100 * D - 208 * E + 128) >> 8))
-                    B = max(0, min(255, (298 * C + 516 * D + 128) >> 8))
-                    
-                    idx = (y * target_w + x) * 3
-                    rgb_data[idx] = R
-                    rgb_data[idx + 1] = G
-                    rgb_data[idx + 2] = B
-            
-            return Image.frombytes('RGB', (target_w, target_h), bytes(rgb_data))
+
+            rgb_data, (target_w, target_h) = result
+            if rgb_data is not out:
+                self._vision_memory_stats.record_allocation(len(rgb_data))
+            logger.info(f"[Vision] NV12 converted {width}x{height} -> {target_w}x{target_h} ({backend.name})")
+            # frombuffer decodes straight from the converter output (no bytes() copy)
+            img = Image.frombuffer('RGB', (target_w, target_h), rgb_data, 'raw', 'RGB', 0, 1)
+            self._record_image_allocation(img)
+            return img
             
         except Exception as e:
             logger.error(f"[Vision] NV12 conversion error: {e}")
             return None
 
     def _process_video_frame_sync(self,
-                                  frame: rtc.VideoFrame) -> Optional[bytes]:
-        """Process video frame synchronously - returns JPEG bytes.
+                                  frame: rtc.VideoFrame,
+                                  observation_focus: str = "geral",
+                                  live_max_size: Optional[Tuple[int, int]] = None):
+        """Process video frame synchronously - returns the encoded JPEG.
         
         ULTRA-SIMPLIFIED VERSION: Avoids operations that may cause SIGILL.
         Uses multiple fallback strategies to handle different frame formats.
         
-        Returns JPEG bytes that Gemini can process directly.
+        Resolution and JPEG quality follow the observation_focus profile
+        (detail / face / overview) within the byte and token budget.
+        
+        Returns an EncodedImage (JPEG bytes Gemini can process directly plus
+        the size/quality actually sent). With live_max_size (live mode) it
+        returns an RGBA rtc.VideoFrame no larger than that size instead, for
+        the realtime session's push_video.
         """
-        rgba_frame = None
         img = None
-        img_buffer = None
+        rgb_buffer = None
+        jpeg_writer = None
+        frame_started = False
         
         try:
             logger.info("[Vision] Processing frame...")
@@ -1619,16 +1807,66 @@ class MediAIAgent(Agent):
             
             height = frame.height
             width = frame.width
+            self._vision_memory_stats.begin_frame()
+            frame_started = True
             
-            # Try to get raw data directly without conversion first
-            # This avoids potential SIGILL from native conversion libs
+            # Zero-copy ingestion: read the LiveKit frame buffer through a memoryview
+            # and hand it straight to PIL / the YUV converter (no bytes() or plane copies)
+            # This also avoids potential SIGILL from native conversion libs
             raw_data = None
             try:
-                raw_data = bytes(frame.data)
-                logger.info(f"[Vision] Got raw frame data: {len(raw_data)} bytes, format: {frame.type}")
+                raw_data = memoryview(frame.data).cast('B')
+                logger.info(f"[Vision] Got raw frame view: {raw_data.nbytes} bytes, format: {frame.type}")
             except Exception as e:
                 logger.warning(f"[Vision] Could not get raw data: {e}")
             
+            # Focus decides resolution and starting JPEG quality
+            profile = profile_for_focus(observation_focus)
+            geometry_config = self._adaptive_encoder.geometry_config(profile, self._vision_geometry)
+            if live_max_size is not None:
+                geometry_config = GeometryConfig(min_size=(1, 1), max_size=live_max_size)
+            
+            fmt = self._frame_format_name(frame.type) if raw_data else None
+            
+            # Face/lesion foci: crop to the skin region and sample it at full resolution
+            crop = None
+            natural_downsample = profile.natural_downsample
+            if fmt is not None and profile.name in ('face', 'detail'):
+                crop = self._roi_detector.find(raw_data, width, height, fmt, face=profile.name == 'face')
+                if crop:
+                    natural_downsample = 1
+                    logger.info(f"[Vision] ROI crop for '{observation_focus}': {crop} "
+                                f"({self._roi_detector.last_area_ratio:.0%} of frame)")
+            
+            if live_max_size is not None:
+                # Live frames: source resolution, only bounded by live_max_size
+                natural_downsample = 1
+            
+            # Process-pool mode: planes go to a worker via shared memory, JPEG bytes come back
+            if self._process_encoder is not None and fmt is not None and live_max_size is None:
+                geometry = compute_output_geometry(
+                    width, height, geometry_config,
+                    natural_downsample=natural_downsample or (2 if fmt in ('i420', 'nv12') else 1),
+                    crop=crop)
+                # Same byte-budget loop as the thread path: re-encode at lower quality
+                # (then smaller size) while the worker's JPEG is over VISION_BYTE_BUDGET
+                attempt = {'data': None, 'geometry': geometry}
+
+                def encode_in_worker(quality: int, scale: float) -> int:
+                    attempt['geometry'] = geometry.scaled(scale) if scale < 1.0 else geometry
+                    attempt['data'] = self._process_encoder.encode(raw_data, width, height, fmt,
+                                                                   attempt['geometry'], quality)
+                    return len(attempt['data']) if attempt['data'] else 0
+
+                quality, _, _ = self._adaptive_encoder.fit_budget(profile, encode_in_worker)
+                frame_bytes = attempt['data']
+                if not frame_bytes:
+                    return None
+                self._vision_memory_stats.record_allocation(len(frame_bytes))
+                encoded = EncodedImage(frame_bytes, *attempt['geometry'].output_size, quality, profile.name)
+                self._record_encoded_image(encoded)
+                return encoded
+            
             # Determine frame format and create PIL Image
             # CRITICAL: Avoid frame.convert() as it may use AVX instructions that crash
             if raw_data:
@@ -1637,27 +1875,46 @@ class MediAIAgent(Agent):
                     logger.info(f"[Vision] Frame type: {frame_type}")
                     
                     # Try to interpret based on frame type
-                    if frame_type == VideoBufferType.RGBA:
-                        img = Image.frombytes('RGBA', (width, height), raw_data)
-                        img = img.convert('RGB')
-                    elif frame_type == VideoBufferType.RGB24:
-                        img = Image.frombytes('RGB', (width, height), raw_data)
-                    elif frame_type == VideoBufferType.BGRA:
-                        img = Image.frombytes('RGBA', (width, height), raw_data)
-                        # Swap R and B channels for BGRA
-                        r, g, b, a = img.split()
-                        img = Image.merge('RGB', (b, g, r))
+                    # Packed formats are unpacked by PIL directly into RGB in a single pass
+                    packed_raw_modes = {
+                        VideoBufferType.RGBA: 'RGBX',
+                        VideoBufferType.RGB24: 'RGB',
+                        # BGRX raw mode swaps R and B while unpacking
+                        VideoBufferType.BGRA: 'BGRX',
+                    }
+                    if frame_type in packed_raw_modes:
+                        geometry = compute_output_geometry(width, height, geometry_config,
+                                                           natural_downsample=natural_downsample or 1,
+                                                           crop=crop)
+                        img = Image.frombuffer('RGB', (width, height), raw_data, 'raw',
+                                               packed_raw_modes[frame_type], 0, 1)
+                        self._record_image_allocation(img)
+                        if not geometry.is_identity(width, height):
+                            # Crop + resize in one PIL pass straight to the sample size
+                            img = img.resize(geometry.sample_size, Image.LANCZOS, box=geometry.crop)
+                            self._record_image_allocation(img)
                     elif hasattr(VideoBufferType, 'I420') and frame_type == VideoBufferType.I420:
                         # YUV420 (I420) is common in WebRTC
-                        # Convert using pure Python (no SIMD)
+                        # Converted by the vision engine (no libyuv/AVX dependency)
+                        # directly at the final analysis size
                         logger.info("[Vision] Converting I420/YUV420 to RGB...")
-                        img = self._convert_i420_to_rgb_pure(raw_data, width, height)
+                        geometry = compute_output_geometry(width, height, geometry_config,
+                                                           natural_downsample=natural_downsample or 2,
+                                                           crop=crop)
+                        sample_w, sample_h = geometry.sample_size
+                        rgb_buffer = self._vision_buffer_pool.acquire(sample_w * sample_h * 3)
+                        img = self._convert_i420_to_rgb(raw_data, width, height, geometry, out=rgb_buffer)
                         if img is None:
                             return None
                     elif hasattr(VideoBufferType, 'NV12') and frame_type == VideoBufferType.NV12:
                         # NV12 is another common format - similar to I420
                         logger.info("[Vision] Converting NV12 to RGB...")
-                        img = self._convert_nv12_to_rgb_pure(raw_data, width, height)
+                        geometry = compute_output_geometry(width, height, geometry_config,
+                                                           natural_downsample=natural_downsample or 2,
+                                                           crop=crop)
+                        sample_w, sample_h = geometry.sample_size
+                        rgb_buffer = self._vision_buffer_pool.acquire(sample_w * sample_h * 3)
+                        img = self._convert_nv12_to_rgb(raw_data, width, height, geometry, out=rgb_buffer)
                         if img is None:
                             return None
                     else:
@@ -1678,77 +1935,96 @@ class MediAIAgent(Agent):
             
             logger.info(f"[Vision] Image created: {img.size}")
             
-            # Resize to target resolution for better vision analysis
-            # Target 800x600 for better detail in medical observations (skin spots, bruises)
-            target_width = 800
-            target_height = 600
-            
-            # Only resize if image is significantly different from target
-            current_w, current_h = img.size
-            if current_w < 320 or current_h < 240:
-                # Upscale very small images to minimum usable size
-                scale = max(320 / current_w, 240 / current_h)
-                new_w = int(current_w * scale)
-                new_h = int(current_h * scale)
+            # Only upscaling is left after the single-pass conversion
+            # (targets larger than the source are never sampled above source resolution)
+            if geometry.needs_upscale:
                 try:
-                    img = img.resize((new_w, new_h), Image.BILINEAR)
-                    logger.info(f"[Vision] Upscaled from {current_w}x{current_h} to {new_w}x{new_h}")
+                    img = img.resize(geometry.output_size, Image.BILINEAR)
+                    self._record_image_allocation(img)
+                    logger.info(f"[Vision] Upscaled from {geometry.sample_size} to {geometry.output_size}")
                 except Exception as resize_err:
                     logger.warning(f"[Vision] Upscale failed: {resize_err}")
-            elif current_w > 1280 or current_h > 960:
-                # Downscale very large images to save tokens but keep good quality
-                # Maintain aspect ratio
-                scale = min(1280 / current_w, 960 / current_h)
-                new_w = int(current_w * scale)
-                new_h = int(current_h * scale)
-                try:
-                    img = img.resize((new_w, new_h), Image.LANCZOS)
-                    logger.info(f"[Vision] Downscaled from {current_w}x{current_h} to {new_w}x{new_h}")
-                except Exception as resize_err:
-                    logger.warning(f"[Vision] Downscale failed: {resize_err}, keeping original")
 
-            # Encode to JPEG with high quality for accurate medical vision analysis
-            img_buffer = io.BytesIO()
-            # Quality 85 ensures details like skin texture and discoloration are preserved
-            img.save(img_buffer, format='JPEG', quality=85)
-            frame_bytes = img_buffer.getvalue()
+            if live_max_size is not None:
+                # The realtime plugin reads RGBA frames without native conversion and encodes them itself
+                rgba = img.convert('RGBA')
+                img = None
+                video_frame = rtc.VideoFrame(rgba.width, rgba.height, VideoBufferType.RGBA, rgba.tobytes())
+                self._vision_memory_stats.record_allocation(len(video_frame.data))
+                return video_frame
+
+            # Encode to JPEG into pooled scratch memory (JPEGs are well under 1/4 of the pixel count)
+            # Quality starts high for detail foci (skin texture, discoloration) and
+            # steps down only as far as needed to fit the byte budget
+            jpeg_writer = BufferWriter(self._vision_buffer_pool.acquire(img.width * img.height // 4))
+            encoded = self._adaptive_encoder.encode(img, profile, jpeg_writer)
+            self._vision_memory_stats.record_allocation(len(encoded.data))
             
-            img_buffer.close()
-            del img
             img = None
-            
-            del rgba_frame
-            rgba_frame = None
 
-            logger.info(f"[Vision] Frame processed: {len(frame_bytes)} bytes")
-            gc.collect()
-            return frame_bytes
+            self._record_encoded_image(encoded)
+            return encoded
 
         except MemoryError as e:
             logger.error(f"[Vision] Memory error: {e}")
-            gc.collect()
             return None
         except Exception as e:
             logger.error(f"[Vision] Error processing frame: {e}")
             import traceback
             logger.error(f"[Vision] Traceback: {traceback.format_exc()}")
-            gc.collect()
             return None
         finally:
-            if img is not None:
-                del img
-            if img_buffer is not None:
-                try:
-                    img_buffer.close()
-                except:
-                    pass
-            if rgba_frame is not None:
-                del rgba_frame
-            gc.collect()
+            # Images sharing the pooled buffers must be gone before they are reused
+            img = None
+            if jpeg_writer is not None:
+                self._vision_buffer_pool.release(jpeg_writer.detach_buffer())
+            self._vision_buffer_pool.release(rgb_buffer)
+            if frame_started:
+                self._vision_memory_stats.end_frame()
+                stats = self._vision_memory_stats
+                logger.info(
+                    f"[Vision] Memory: {stats.last_frame_bytes_allocated} bytes allocated, "
+                    f"RSS +{stats.last_frame_rss_growth} (peak RSS {stats.peak_rss_bytes // (1024 * 1024)} MB)"
+                )
+
+    def _record_encoded_image(self, encoded: EncodedImage):
+        """Log and report what is actually uploaded (bytes, resolution, quality)."""
+        logger.info(
+            f"[Vision] Frame processed: {len(encoded.data)} bytes, {encoded.width}x{encoded.height}, "
+            f"q{encoded.quality} ({encoded.profile}, ~{encoded.estimated_tokens} tokens)")
+        if self.metrics_collector:
+            self.metrics_collector.track_vision_image(encoded)
+
+    def _record_image_allocation(self, img: 'Image.Image'):
+        """Count a PIL image's pixel storage unless it shares the frame buffer."""
+        if not img.readonly:
+            self._vision_memory_stats.record_allocation(img.width * img.height * 4)
+
+    def get_vision_memory_stats(self) -> dict:
+        """Allocation/RSS counters for the vision frame pipeline."""
+        return self._vision_memory_stats.snapshot()
+
+    async def _get_frame_capture(self, video_track) -> LatestFrameCapture:
+        """Persistent frame capture for video_track, replacing one bound to another track."""
+        track_sid = getattr(video_track, 'sid', None)
+        if self._frame_capture is not None and self._frame_capture_track_sid != track_sid:
+            await self._frame_capture.aclose()
+            self._frame_capture = None
+
+        if self._frame_capture is None:
+            logger.info(f"[Vision] 📸 Opening persistent frame capture for track {track_sid}")
+            self._frame_capture = LatestFrameCapture(
+                lambda: rtc.VideoStream(video_track, capacity=1))
+            self._frame_capture_track_sid = track_sid
+        return self._frame_capture
 
     async def cleanup_video_stream(self):
         """Properly cleanup video stream resources."""
         try:
+            if self._frame_capture is not None:
+                await self._frame_capture.aclose()
+                self._frame_capture = None
+                self._frame_capture_track_sid = None
             self._video_streaming_active = False
             if self._video_stream is not None:
                 try:
@@ -1757,7 +2033,13 @@ class MediAIAgent(Agent):
                     pass
                 self._video_stream = None
             self._current_video_track = None
-            gc.collect()
+            for task in list(self._stream_frame_tasks):
+                task.cancel()
+            if self._track_registry_instance is not None:
+                self._track_registry_instance.close()
+            if self._vision_executor_instance is not None:
+                self._vision_executor_instance.shutdown()
+            self._vision_buffer_pool.clear()
         except Exception as e:
             logger.debug(f"[Vision] Error cleaning up video stream: {e}")
 
@@ -1776,8 +2058,7 @@ class MediAIAgent(Agent):
             return
         
         # Filter out avatar agents
-        avatar_identities = ['bey-avatar-agent', 'tavus-avatar', 'avatar-agent']
-        if participant.identity.lower() in avatar_identities or 'avatar' in participant.identity.lower():
+        if is_avatar_identity(participant.identity):
             logger.info(f"[Vision] Skipping avatar participant: {participant.identity}")
             return
         
@@ -1785,32 +2066,10 @@ class MediAIAgent(Agent):
         
         # Find video track
         video_track = None
-        for track_pub in participant.track_publications.values():
-            if track_pub.kind != rtc.TrackKind.KIND_VIDEO:
-                continue
-
-            try:
-                if not track_pub.subscribed:
-                    try:
-                        track_pub.set_subscribed(True)
-                    except Exception as subscribe_err:
-                        logger.warning(f"[Vision] Could not subscribe to video track: {subscribe_err}")
-            except Exception:
-                pass
-
-            start = time.time()
-            while time.time() - start < 5.0:
-                try:
-                    if track_pub.track is not None:
-                        video_track = track_pub.track
-                        logger.info(f"[Vision] Found video track: {track_pub.sid}")
-                        break
-                except Exception:
-                    pass
-                await asyncio.sleep(0.1)
-
-            if video_track:
-                break
+        found = await self._track_registry.wait_for_video_track(participant.identity, timeout=5.0)
+        if found is not None:
+            video_track = found[1]
+            logger.info(f"[Vision] Found video track: {getattr(video_track, 'sid', '?')}")
         
         if not video_track:
             logger.warning("[Vision] No video track available from patient")
@@ -1828,19 +2087,29 @@ class MediAIAgent(Agent):
         CRITICAL PERFORMANCE RULES:
         - Only processes 1 frame every 4 seconds
         - Ignores all frames between intervals
+        - Skips frames that barely differ from the last analysed one
+          (VISION_CHANGE_THRESHOLD, see FrameChangeDetector)
         - Immediately releases memory after sending
         
+        In live mode (VISION_MODE=live) the same loop pushes downscaled frames
+        into the realtime session every VISION_LIVE_FRAME_INTERVAL seconds
+        instead of analysing them with a separate Gemini call.
+        
         NOTE: This function may cause SIGILL on CPUs without AVX support.
         Set ENABLE_VISION_STREAMING=false to disable.
         """
+        live_mode = self._vision_mode == 'live'
+        
         # Check if video streaming is explicitly disabled
         streaming_enabled = os.getenv('ENABLE_VISION_STREAMING', 'true').lower() == 'true'
-        if not streaming_enabled:
+        if not streaming_enabled and not live_mode:
             logger.info("[Vision] 🚫 Video streaming disabled via ENABLE_VISION_STREAMING=false")
             self._video_streaming_active = False
             return
         
         FRAME_INTERVAL = 4.0  # Only send 1 frame every 4 seconds
+        if live_mode:
+            FRAME_INTERVAL = self._live_video_config.frame_interval
         
         video_stream = None
         try:
@@ -1869,36 +2138,29 @@ class MediAIAgent(Agent):
                 if frame is None or frame.width <= 0 or frame.height <= 0:
                     continue
                 
-                try:
-                    # Process frame in separate thread to avoid blocking
-                    frame_bytes = await asyncio.to_thread(
-                        self._process_video_frame_sync, frame)
-                    
-                    if not frame_bytes:
-                        continue
-                    
-                    # Send frame to Gemini Live session
-                    await self._send_frame_to_session(frame_bytes)
-                    
+                # Don't encode frames the analysis throttle would discard anyway
+                if not live_mode and not self._streaming_analysis_due(current_time):
+                    continue
+                
+                # CHANGE DETECTION: skip encoding + Gemini call while the patient is static
+                thumbnail = self._frame_thumbnail(frame)
+                if not self._frame_change_detector.has_changed(thumbnail, current_time):
                     last_send_time = current_time
-                    
-                    # Track metrics
                     if self.metrics_collector:
-                        # Estimate ~258 tokens per frame (480x480 JPEG)
-                        self.metrics_collector.vision_input_tokens += 258
-                    
-                    logger.debug(f"[Vision] 📸 Frame sent ({len(frame_bytes)} bytes)")
-                    
-                    # Immediate cleanup
-                    del frame_bytes
-                    frame_bytes = None
-                    
-                except Exception as e:
-                    logger.error(f"[Vision] Error processing frame: {e}")
+                        self.metrics_collector.vision_frames_skipped += 1
+                    logger.debug(
+                        f"[Vision] Frame unchanged (diff {self._frame_change_detector.last_difference:.1f} "
+                        f"< {self._frame_change_detector.threshold}), skipping analysis")
                     continue
-                finally:
-                    # Force garbage collection every frame
-                    gc.collect()
+                
+                # Hand the frame to the vision pool and keep reading: while the pool is
+                # busy, a newer frame replaces the pending one (key 'stream', droppable)
+                self._stream_frame_seq += 1
+                task = asyncio.create_task(
+                    self._handle_stream_frame(frame, thumbnail, current_time, self._stream_frame_seq, live_mode))
+                self._stream_frame_tasks.add(task)
+                task.add_done_callback(self._stream_frame_tasks.discard)
+                last_send_time = current_time
                     
         except asyncio.CancelledError:
             logger.info("[Vision] Video loop cancelled")
@@ -1908,22 +2170,148 @@ class MediAIAgent(Agent):
             logger.error(f"[Vision] Traceback: {traceback.format_exc()}")
         finally:
             self._video_streaming_active = False
+            for task in list(self._stream_frame_tasks):
+                task.cancel()
             if video_stream is not None:
                 try:
                     await video_stream.aclose()
                 except Exception:
                     pass
             self._video_stream = None
-            gc.collect()
             logger.info("[Vision] 🎥 Video loop ended")
 
-    async def _send_frame_to_session(self, frame_bytes: bytes):
+    async def _handle_stream_frame(self, frame: rtc.VideoFrame, thumbnail: Optional[bytes],
+                                   current_time: float, seq: int, live_mode: bool):
+        """Encode one streaming/live frame on the vision pool and send it, newest frame first.
+
+        Superseded frames end with VisionJobDropped; a frame that finishes after a
+        newer one was already sent is discarded.
+        """
+        try:
+            if live_mode:
+                await self._push_live_frame(frame, thumbnail, current_time, seq)
+                return
+            
+            encoded = await self._vision_executor.submit(
+                self._process_video_frame_sync, frame, key='stream', droppable=True)
+            if not encoded:
+                return
+            frame_bytes = encoded.data
+            
+            async with self._stream_send_lock:
+                if seq < self._stream_sent_seq:
+                    return
+                self._stream_sent_seq = seq
+                
+                # Send frame to Gemini Live session
+                observation = await self._send_frame_to_session(frame_bytes, encoded.estimated_tokens)
+                if observation:
+                    self._frame_change_detector.mark_analysed(thumbnail, current_time)
+                    if self.metrics_collector:
+                        self.metrics_collector.vision_frames_analysed += 1
+                    await self._push_observation_to_chat(observation)
+            
+            logger.debug(f"[Vision] 📸 Frame sent ({len(frame_bytes)} bytes)")
+        except (VisionJobDropped, VisionQueueFull):
+            logger.debug("[Vision] Streaming frame dropped by vision queue")
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"[Vision] Error processing frame: {e}")
+        finally:
+            # Opt-in collection (VISION_GC_POLICY); never forced per frame
+            self._vision_gc_policy.maybe_collect()
+
+    def _streaming_analysis_due(self, current_time: float) -> bool:
+        """True once STREAMING_ANALYSIS_INTERVAL has passed since the last streaming analysis."""
+        last = getattr(self, '_last_vision_analysis_time', None)
+        return last is None or current_time - last >= STREAMING_ANALYSIS_INTERVAL
+
+    @staticmethod
+    def _frame_format_name(frame_type) -> Optional[str]:
+        """Map a LiveKit VideoBufferType to the vision package's format names."""
+        names = {
+            VideoBufferType.RGBA: 'rgba',
+            VideoBufferType.BGRA: 'bgra',
+            VideoBufferType.RGB24: 'rgb24',
+        }
+        if hasattr(VideoBufferType, 'I420'):
+            names[VideoBufferType.I420] = 'i420'
+        if hasattr(VideoBufferType, 'NV12'):
+            names[VideoBufferType.NV12] = 'nv12'
+        return names.get(frame_type)
+
+    def _frame_thumbnail(self, frame: rtc.VideoFrame) -> Optional[bytes]:
+        """Small luma thumbnail of a raw frame for change detection (no conversion)."""
+        try:
+            fmt = self._frame_format_name(frame.type)
+            if fmt is None:
+                return None
+            return luma_thumbnail(memoryview(frame.data).cast('B'), frame.width, frame.height, fmt)
+        except Exception as e:
+            logger.debug(f"[Vision] Could not build frame thumbnail: {e}")
+            return None
+
+    async def _push_live_frame(self, frame: rtc.VideoFrame, thumbnail: Optional[bytes], current_time: float,
+                               seq: int):
+        """Live mode: downscale on the vision pool and push into the realtime session's video input."""
+        started = time.perf_counter()
+        video_frame = await self._vision_executor.submit(
+            self._process_video_frame_sync, frame, "geral", self._live_video_config.max_size,
+            key='stream', droppable=True)
+        if video_frame is None or seq < self._stream_sent_seq:
+            return
+        self._stream_sent_seq = seq
+        
+        self.realtime_llm_session.push_video(video_frame)
+        prepare_ms = (time.perf_counter() - started) * 1000
+        
+        self._frame_change_detector.mark_analysed(thumbnail, current_time)
+        tokens = self._live_video_config.tokens_per_frame
+        self._vision_mode_stats.record_live_frame(prepare_ms, tokens)
+        if self.metrics_collector:
+            self.metrics_collector.vision_frames_analysed += 1
+            self.metrics_collector.live_video_input_tokens += tokens
+        logger.debug(f"[Vision] 📡 Live frame pushed {video_frame.width}x{video_frame.height} ({prepare_ms:.0f} ms)")
+
+    async def _push_observation_to_chat(self, observation: str):
+        """Inject a significant streaming observation into the session chat context.
+        
+        Sent as a user-role item (Gemini Live drops system items) without
+        completing the turn, so the model gets the context but does not reply
+        to it. Deduplicated and rate-limited by ObservationPublisher.
+        """
+        if not self._observation_publisher.should_push(observation):
+            return
+        try:
+            chat_ctx = self.chat_ctx.copy()
+            chat_ctx.add_message(role="user", content=ObservationPublisher.format_message(observation))
+            await self.update_chat_ctx(chat_ctx)
+            self._observation_publisher.mark_pushed(observation)
+            logger.info(f"[Vision] 📤 Observation pushed into chat context: {observation[:80]}...")
+        except Exception as e:
+            logger.warning(f"[Vision] Could not push observation into chat context: {e}")
+
+    def _score_frame(self, frame: rtc.VideoFrame) -> Optional[FrameScore]:
+        """Local sharpness/exposure score of a raw frame (burst selection)."""
+        try:
+            fmt = self._frame_format_name(frame.type)
+            if fmt is None:
+                return None
+            return score_frame(memoryview(frame.data).cast('B'), frame.width, frame.height, fmt)
+        except Exception as e:
+            logger.debug(f"[Vision] Could not score frame: {e}")
+            return None
+
+    async def _send_frame_to_session(self, frame_bytes: bytes, estimated_image_tokens: Optional[int] = None):
         """Analyze a video frame using Gemini Vision API.
         Legacy wrapper for backward compatibility.
         """
-        return await self._send_frame_to_session_with_context(frame_bytes, "geral", "")
+        return await self._send_frame_to_session_with_context(frame_bytes, "geral", "",
+                                                              estimated_image_tokens=estimated_image_tokens)
 
-    async def _send_frame_to_session_with_context(self, frame_bytes: bytes, observation_focus: str = "geral", specific_question: str = ""):
+    async def _send_frame_to_session_with_context(self, frame_bytes: bytes, observation_focus: str = "geral", specific_question: str = "",
+                                                  estimated_image_tokens: Optional[int] = None):
         """Analyze a video frame using Gemini Vision API with specific context and focus.
         
         This enhanced version provides detailed, contextual analysis based on:
@@ -1935,52 +2323,43 @@ class MediAIAgent(Agent):
             frame_bytes: JPEG image data
             observation_focus: Specific area to focus on (e.g., "hematoma", "mancha", "ferimento")
             specific_question: Exact question from patient that needs visual answer
+            estimated_image_tokens: fallback token estimate when Gemini returns no usage metadata
         """
         # Throttling logic - separate for streaming vs on-demand
         # If specific question is present, bypass standard throttling
         is_on_demand = bool(specific_question) or observation_focus != "geral"
         
         if not is_on_demand:
-            ANALYSIS_INTERVAL = 30.0
             current_time = time.time()
-            if hasattr(self, '_last_vision_analysis_time'):
+            if not self._streaming_analysis_due(current_time):
                 time_since_last = current_time - self._last_vision_analysis_time
-                if time_since_last < ANALYSIS_INTERVAL:
-                    logger.debug(f"[Vision] Skipping analysis - {ANALYSIS_INTERVAL - time_since_last:.1f}s until next")
-                    return
+                logger.debug(f"[Vision] Skipping analysis - {STREAMING_ANALYSIS_INTERVAL - time_since_last:.1f}s until next")
+                return
             self._last_vision_analysis_time = current_time
 
         try:
-            model_name = os.getenv('GEMINI_VISION_MODEL') or os.getenv('GEMINI_LLM_MODEL') or 'gemini-2.5-flash'
-            if 'native-audio' in model_name:
-                model_name = 'gemini-2.5-flash'
-            vision_model = genai.GenerativeModel(model_name)
-            
-            # Prepare image for Gemini
-            image_part = {
-                "inline_data": {
-                    "mime_type": "image/jpeg",
-                    "data": base64.b64encode(frame_bytes).decode('utf-8')
-                }
-            }
+            # Shared per-process client (model resolved once, connection kept warm)
+            vision_client = get_vision_client()
             
             # Create contextual prompt based on focus and question
             prompt = self._create_contextual_vision_prompt(observation_focus, specific_question)
 
-            # Call Gemini Vision API in a thread to avoid blocking
-            def analyze_sync():
+            async def run_vision_analysis():
                 try:
-                    response = vision_model.generate_content([prompt, image_part])
-                    return response.text if response and response.text else None
+                    return await vision_client.analyze(prompt, frame_bytes)
                 except Exception as e:
-                    logger.error(f"[Vision] Error in analyze_sync: {e}")
+                    logger.error(f"[Vision] Error in vision analysis: {e}")
                     raise e  # Re-raise to trigger circuit breaker
-            
-            async def run_vision_analysis():
-                return await asyncio.to_thread(analyze_sync)
 
             # Use circuit breaker to prevent cascading failures
-            observation = await gemini_circuit_breaker.call(run_vision_analysis)
+            result = await gemini_circuit_breaker.call_async(run_vision_analysis)
+            observation = result.text
+            
+            usage = result.usage_metadata
+            self._vision_mode_stats.record_analysis(
+                result.latency_ms,
+                getattr(usage, 'prompt_token_count', 0) or (estimated_image_tokens or estimate_image_tokens(0, 0)),
+                getattr(usage, 'candidates_token_count', 0) or len(observation or '') // 4)
             
             if observation:
                 # Store the latest observation for the agent to reference
@@ -1990,15 +2369,22 @@ class MediAIAgent(Agent):
                 self._last_specific_question = specific_question
                 logger.info(f"[Vision] ✅ Contextual frame analyzed: {observation[:150]}...")
                 
-                # Track vision tokens
+                # Track vision tokens (real usage when Gemini reports it)
                 if self.metrics_collector:
-                    self.metrics_collector.vision_input_tokens += 258
-                    self.metrics_collector.vision_output_tokens += len(observation) // 4
+                    if result.usage_metadata:
+                        self.metrics_collector.track_vision(result.usage_metadata)
+                    else:
+                        self.metrics_collector.vision_input_tokens += (
+                            estimated_image_tokens or estimate_image_tokens(0, 0))
+                        self.metrics_collector.vision_output_tokens += len(observation) // 4
                 return observation
             else:
                 logger.warning("[Vision] No observation returned from Gemini Vision")
                 return None
                 
+        except asyncio.TimeoutError:
+            logger.warning("[Vision] Vision analysis timed out - no observation this time")
+            return None
         except Exception as e:
             logger.error(f"[Vision] Error analyzing frame with context: {e}")
             import traceback
@@ -2101,12 +2487,17 @@ INSTRUÇÕES IMPORTANTES:
     async def on_enter(self):
         """Called when agent enters the session - generates initial greeting using session.say()"""
 
-        # Wait for avatar to fully load and sync audio/video
-        # This ensures the avatar is visible before greeting starts
-        logger.info(
-            "[MediAI] ⏳ Waiting for avatar to be visible and audio/video to sync..."
-        )
-        await asyncio.sleep(8)
+        # Wait for the avatar video, the session and the patient's audio
+        # (bounded by AGENT_READY_TIMEOUT instead of a fixed delay)
+        if self._readiness is not None:
+            logger.info(
+                "[MediAI] ⏳ Waiting for avatar video, session and patient audio..."
+            )
+            if await self._readiness.wait():
+                logger.info(f"[MediAI] ✅ Session ready in {self._readiness.waited_ms:.0f} ms")
+            else:
+                logger.warning(f"[MediAI] ⏱️ Readiness timeout after {self._readiness.timeout:g}s, "
+                               f"still waiting for: {', '.join(self._readiness.pending)}")
 
         # Start metrics periodic flush
         if self.metrics_collector:
@@ -2142,6 +2533,122 @@ INSTRUÇÕES IMPORTANTES:
             logger.error(f"[Patient] Error handling transcription: {e}")
 
 
+async def start_avatar(avatar_provider: str, session: AgentSession, room: rtc.Room,
+                       metrics_collector: 'MetricsCollector'):
+    """Start the configured avatar for the session (audio only when it is unavailable).
+
+    Returns True when an avatar was started.
+
+    Must run after session.start() has set up RoomIO: the avatar then takes over
+    the session's audio output (starting both concurrently relies on plugin and
+    RoomIO internals that differ across livekit-agents versions).
+    """
+    logger.info(f"[MediAI] 🎭 Avatar provider selected: {avatar_provider}")
+
+    # Initialize avatar based on configuration
+    if avatar_provider == 'bey':
+        # Beyond Presence (BEY) Avatar
+        bey_api_key = os.getenv('BEY_API_KEY')
+        bey_avatar_id = os.getenv(
+            'BEY_AVATAR_ID')  # Optional, uses default if not set
+
+        if bey_api_key:
+            logger.info(
+                "[MediAI] 🎭 Initializing Beyond Presence (BEY) avatar...")
+
+            try:
+                # Create BEY avatar session
+                avatar_params = {'avatar_participant_name': 'MediAI'}
+
+                # Add avatar_id if specified
+                if bey_avatar_id:
+                    avatar_params['avatar_id'] = bey_avatar_id
+
+                avatar = bey.AvatarSession(**avatar_params)
+
+                logger.info("[MediAI] 🎥 Starting BEY avatar...")
+                await avatar.start(session, room=room)
+
+                # Iniciar rastreamento de custo do avatar
+                metrics_collector.start_avatar_tracking('bey')
+                
+                logger.info(
+                    "[MediAI] ✅ Beyond Presence avatar started successfully!")
+                return True
+
+            except Exception as e:
+                logger.error(f"[MediAI] ⚠️ BEY avatar error: {e}")
+                logger.info("[MediAI] Continuing with audio only")
+        else:
+            logger.warning(
+                "[MediAI] BEY_API_KEY not found - running audio only")
+
+    else:
+        # Tavus Avatar (default)
+        tavus_api_key = os.getenv('TAVUS_API_KEY')
+        replica_id = os.getenv('TAVUS_REPLICA_ID')
+        persona_id = os.getenv('TAVUS_PERSONA_ID')
+
+        if tavus_api_key and replica_id and persona_id:
+            logger.info("[MediAI] 🎭 Initializing Tavus avatar...")
+
+            try:
+                avatar = tavus.AvatarSession(replica_id=replica_id,
+                                             persona_id=persona_id,
+                                             avatar_participant_name="MediAI")
+
+                logger.info("[MediAI] 🎥 Starting Tavus avatar...")
+                await avatar.start(session, room=room)
+
+                # Iniciar rastreamento de custo do avatar
+                metrics_collector.start_avatar_tracking('tavus')
+                
+                logger.info("[MediAI] ✅ Tavus avatar started successfully!")
+                return True
+
+            except Exception as e:
+                logger.error(f"[MediAI] ⚠️ Tavus avatar error: {e}")
+                logger.info("[MediAI] Continuing with audio only")
+        else:
+            logger.warning(
+                "[MediAI] Tavus credentials not found - running audio only")
+
+    return False
+
+
+def watch_room_readiness(room: rtc.Room, readiness: ReadinessBarrier):
+    """Signal 'avatar' when an agent participant publishes video and 'patient_audio'
+    when a patient's audio track is subscribed (checked now and on every room change
+    until both arrived or the barrier is done)."""
+    events = ('participant_connected', 'track_published', 'track_subscribed')
+    watching = False
+
+    def stop_watching():
+        nonlocal watching
+        if watching:
+            watching = False
+            for event in events:
+                room.off(event, check)
+
+    def check(*_):
+        for participant in room.remote_participants.values():
+            is_agent = participant.kind == rtc.ParticipantKind.PARTICIPANT_KIND_AGENT
+            for publication in participant.track_publications.values():
+                if is_agent and publication.kind == rtc.TrackKind.KIND_VIDEO:
+                    readiness.signal('avatar')
+                elif (not is_agent and publication.kind == rtc.TrackKind.KIND_AUDIO
+                      and publication.subscribed):
+                    readiness.signal('patient_audio')
+        if not {'avatar', 'patient_audio'} & set(readiness.pending):
+            stop_watching()
+
+    for event in events:
+        room.on(event, check)
+    watching = True
+    readiness.on_done(stop_watching)
+    check()
+
+
 async def entrypoint(ctx: JobContext):
     """Main entrypoint for the LiveKit agent with Tavus avatar."""
     try:
@@ -2155,82 +2662,101 @@ async def entrypoint(ctx: JobContext):
 
 async def _entrypoint_impl(ctx: JobContext):
     """Implementation of the main entrypoint logic."""
-    await ctx.connect()
+    # Bootstrap graph: pool, room connect and avatar-provider lookup run concurrently;
+    # patient context and session start join as their inputs are ready, the avatar
+    # starts once the session has
+    db_pool_manager = get_pool_manager()
+    bootstrap = BootstrapGraph()
+    bootstrap.add('pool', db_pool_manager.get_pool)
+    bootstrap.add('connect', ctx.connect)
+    bootstrap.add('avatar_provider', resolve_avatar_provider, after=('pool',))
+
+    # One try/finally from here on: a failed connect, a missing patient or the end of
+    # the session all cancel pending stages and close the loop's pool
+    try:
+        await bootstrap.result('connect')
 
-    def _extract_patient_id(raw_metadata: Optional[str]) -> Optional[str]:
-        if not raw_metadata:
-            return None
-        try:
-            parsed = json.loads(raw_metadata)
-        except Exception:
-            return None
-        if not isinstance(parsed, dict):
+        def _extract_patient_id(raw_metadata: Optional[str]) -> Optional[str]:
+            if not raw_metadata:
+                return None
+            try:
+                parsed = json.loads(raw_metadata)
+            except Exception:
+                return None
+            if not isinstance(parsed, dict):
+                return None
+            for key in ('patient_id', 'patientId'):
+                value = parsed.get(key)
+                if isinstance(value, str) and value.strip():
+                    return value.strip()
             return None
-        for key in ('patient_id', 'patientId'):
-            value = parsed.get(key)
-            if isinstance(value, str) and value.strip():
-                return value.strip()
-        return None
-
-    patient_id = _extract_patient_id(ctx.room.metadata)
-    if not patient_id:
-        try:
-            for participant in ctx.room.remote_participants.values():
-                patient_id = _extract_patient_id(getattr(participant, 'metadata', None))
-                if patient_id:
-                    break
-        except Exception:
-            patient_id = None
-
-    if not patient_id:
-        logger.error("No patient_id in room or participant metadata")
-        return
 
-    logger.info(f"[MediAI] 🎯 Starting agent for patient: {patient_id}")
-
-    # Create database connection pool (prevents connection churning)
-    import asyncpg
-    database_url = os.getenv('DATABASE_URL')
+        patient_id = _extract_patient_id(ctx.room.metadata)
+        if not patient_id:
+            try:
+                for participant in ctx.room.remote_participants.values():
+                    patient_id = _extract_patient_id(getattr(participant, 'metadata', None))
+                    if patient_id:
+                        break
+            except Exception:
+                patient_id = None
 
-    pool = None
-    if database_url:
-        try:
-            pool = await asyncpg.create_pool(database_url,
-                                             min_size=1,
-                                             max_size=5,
-                                             command_timeout=10)
-            logger.info("[MediAI] 💾 Database connection pool created")
-        except Exception as pool_error:
-            logger.error(
-                f"[MediAI] Failed to create database pool: {pool_error}")
-
-    # Criar MetricsCollector
-    session_id = ctx.room.name or f"session-{int(time.time())}"
-    metrics_collector = MetricsCollector(patient_id=patient_id,
-                                         session_id=session_id)
-    logger.info(
-        f"[Metrics] 📊 Iniciado coletor de métricas para sessão {session_id}")
+        if not patient_id:
+            logger.error("No patient_id in room or participant metadata")
+            return
 
-    logger.info(f"[MediAI] 📋 Loading patient context...")
-    patient_context = await get_patient_context(pool, patient_id)
-    logger.info(
-        f"[MediAI] ✅ Patient context loaded ({len(patient_context)} chars)")
+        logger.info(f"[MediAI] 🎯 Starting agent for patient: {patient_id}")
 
-    logger.info(f"[MediAI] 🤖 Creating Gemini Live API model...")
+        bootstrap.add('patient_context', lambda pool: get_patient_context(pool, patient_id), after=('pool',))
 
-    # Select Gemini model (native audio for STT+LLM+TTS integration)
-    # Default: gemini-2.5-flash-native-audio-preview-09-2025 for best audio quality
-    gemini_model = os.getenv('GEMINI_LLM_MODEL', 'gemini-2.5-flash-preview-native-audio')
-    logger.info(f"[MediAI] 🎙️ Using Gemini model: {gemini_model}")
+        # Shared database connection pool (created once per job loop, sized by DB_POOL_*)
+        pool = await bootstrap.result('pool')
 
-    # Check if vision is enabled
-    vision_enabled = os.getenv('ENABLE_VISION', 'false').lower() == 'true'
-    vision_streaming_enabled = os.getenv('ENABLE_VISION_STREAMING', 'false').lower() == 'true'
+        # Criar MetricsCollector
+        session_id = ctx.room.name or f"session-{int(time.time())}"
+        metrics_collector = MetricsCollector(patient_id=patient_id,
+                                             session_id=session_id)
+        metrics_collector.db_pool = pool
+        metrics_collector.prewarm = ctx.proc.userdata.get('prewarm')
+        logger.info(
+            f"[Metrics] 📊 Iniciado coletor de métricas para sessão {session_id}")
 
-    # Build system prompt based on vision mode
-    if vision_enabled:
-        if vision_streaming_enabled:
-            vision_instructions = """VISÃO EM TEMPO REAL (STREAMING):
+        logger.info(f"[MediAI] 📋 Loading patient context...")
+        patient_context = await bootstrap.result('patient_context')
+        logger.info(
+            f"[MediAI] ✅ Patient context loaded ({len(patient_context)} chars)")
+
+        logger.info(f"[MediAI] 🤖 Creating Gemini Live API model...")
+
+        # Select Gemini model (native audio for STT+LLM+TTS integration)
+        # Default: gemini-2.5-flash-native-audio-preview-09-2025 for best audio quality
+        gemini_model = os.getenv('GEMINI_LLM_MODEL', 'gemini-2.5-flash-preview-native-audio')
+        logger.info(f"[MediAI] 🎙️ Using Gemini model: {gemini_model}")
+
+        # Check if vision is enabled
+        vision_enabled = os.getenv('ENABLE_VISION', 'false').lower() == 'true'
+        # on_demand | streaming | live (VISION_MODE, or ENABLE_VISION_STREAMING=true for streaming)
+        vision_mode = resolve_vision_mode()
+        vision_streaming_enabled = vision_mode == 'streaming'
+
+        # Build system prompt based on vision mode
+        if vision_enabled:
+            if vision_mode == 'live':
+                vision_instructions = """VISÃO AO VIVO (VÍDEO DIRETO):
+✅ VOCÊ ESTÁ VENDO O VÍDEO DO PACIENTE diretamente, em baixa resolução (cerca de 1 quadro a cada poucos segundos)
+- Use o que você vê no vídeo junto com o que você ouve para uma avaliação completa
+- Para detalhes finos (mancha, ferimento, pele, olhos), chame look_at_patient(observation_focus="...", specific_question="...") para uma imagem em alta resolução
+- Quando o paciente mostrar algo na câmera, olhe o vídeo antes de responder
+- Seja profissional e respeitosa nas observações visuais
+- NÃO faça comentários sobre aparência que não sejam relevantes para saúde"""
+            elif vision_streaming_enabled:
+                vision_push_instructions = ""
+                if os.getenv('VISION_PUSH_OBSERVATIONS', 'true').lower() == 'true':
+                    vision_push_instructions = """
+✅ Mudanças visuais relevantes chegam automaticamente na conversa como "[Observação visual automática] ..."
+- Use essas observações diretamente; NÃO chame get_visual_observation para repetir o que já está na conversa
+- Elas são contexto, não falas do paciente - não responda a elas isoladamente"""
+                vision_instructions = """VISÃO EM TEMPO REAL (STREAMING):
 ✅ O sistema está analisando o vídeo do paciente automaticamente a cada 30 segundos
 ✅ Use a ferramenta get_visual_observation para acessar a observação visual mais recente
 - Chame get_visual_observation quando quiser saber como o paciente está visualmente
@@ -2239,9 +2765,9 @@ async def _entrypoint_impl(ctx: JobContext):
 - Se notar algo preocupante na observação visual, comente naturalmente
 - Seja profissional e respeitosa nas observações visuais
 - NÃO faça comentários sobre aparência que não sejam relevantes para saúde
-- Use get_visual_observation periodicamente para acompanhar o estado do paciente"""
-        else:
-            vision_instructions = """VISÃO SOB DEMANDA (PREFERENCIAL):
+- Use get_visual_observation periodicamente para acompanhar o estado do paciente""" + vision_push_instructions
+            else:
+                vision_instructions = """VISÃO SOB DEMANDA (PREFERENCIAL):
 ✅ VOCÊ PODE VER O PACIENTE usando a ferramenta look_at_patient
 - Use look_at_patient(observation_focus="...", specific_question="...") para examinar visualmente
 - A ferramenta retorna o campo observation com a descrição visual; use isso na sua resposta
@@ -2254,13 +2780,13 @@ async def _entrypoint_impl(ctx: JobContext):
 - Use a visão sempre que o paciente mostrar algo ou pedir sua opinião visual
 - Combine o que você VÊ com o que você OUVE para uma avaliação completa
 - Seja profissional e detalhista nas descrições visuais"""
-    else:
-        vision_instructions = """VISÃO:
+        else:
+            vision_instructions = """VISÃO:
 - Nesta consulta, você NÃO tem acesso visual ao paciente
 - Baseie sua avaliação apenas nas informações verbais fornecidas
 - Faça perguntas detalhadas para entender melhor os sintomas do paciente"""
 
-    system_prompt = f"""Você é MediAI, uma assistente médica virtual brasileira especializada em triagem de pacientes e orientação de saúde.
+        system_prompt = f"""Você é MediAI, uma assistente médica virtual brasileira especializada em triagem de pacientes e orientação de saúde.
 
 CAPACIDADES IMPORTANTES:
 {vision_instructions}
@@ -2316,214 +2842,192 @@ CONTEXTO DO PACIENTE:
 {patient_context}
 """
 
-    logger.info(f"[MediAI] 🎙️ Creating agent session with Gemini Live API...")
-
-    # Create agent instance with patient_id (thread-safe: stored on instance)
-    # Function tools acessam patient_id via context.agent.patient_id
-    # Pass vision_streaming_enabled to control dynamic tools list
-    agent = MediAIAgent(instructions=system_prompt,
-                        room=ctx.room,
-                        metrics_collector=metrics_collector,
-                        patient_id=patient_id,
-                        vision_streaming_enabled=vision_streaming_enabled)
-
-    # Create AgentSession with integrated Gemini Live model (STT + LLM + TTS)
-    # Language is controlled via voice selection and system instructions
-    # Erinome voice is designed for Portuguese (pt-BR)
-    session = AgentSession(
-        llm=google.beta.realtime.RealtimeModel(
-            model=
-            gemini_model,  # Using selected model (native audio or standard realtime)
-            voice="Kore",  # Female voice optimized for Portuguese (pt-BR)
-            temperature=
-            0.5,  # Lower for more consistent responses and pronunciation
-            instructions=system_prompt,
-        ), )
-
-    logger.info("[MediAI] 🏥 Starting medical consultation session...")
-    logger.info(
-        "[MediAI] 🛠️ Function tools serão executados automaticamente pelo LiveKit"
-    )
-
-    # Register listener for user transcriptions to detect doctor search intent
-    @session.on("user_input_transcribed")
-    def on_user_transcribed(event):
-        """Real-time intent detection from patient speech transcriptions."""
-        asyncio.create_task(agent._handle_user_transcription(event))
-
-    # NOTE: Não é mais necessário registrar handler manual para tool_call
-    # O LiveKit agora gerencia automaticamente a execução das function tools
-    # quando fnc_ctx é passado para o RealtimeModel
-
-    # Start session with agent
-    await session.start(
-        agent=agent,
-        room=ctx.room,
-    )
-
-    # Store session reference in agent for video streaming
-    agent._agent_session = session
-
-    logger.info("[MediAI] ✅ Session started successfully!")
+        logger.info(f"[MediAI] 🎙️ Creating agent session with Gemini Live API...")
+
+        # Create agent instance with patient_id (thread-safe: stored on instance)
+        # Function tools acessam patient_id via context.agent.patient_id
+        # Pass vision_streaming_enabled to control dynamic tools list
+        agent = MediAIAgent(instructions=system_prompt,
+                            room=ctx.room,
+                            metrics_collector=metrics_collector,
+                            patient_id=patient_id,
+                            vision_streaming_enabled=vision_streaming_enabled,
+                            vision_mode=vision_mode)
+
+        # Live mode: frames reach the realtime model already downscaled; match its encoder to them
+        live_video_options = {}
+        if vision_enabled and vision_mode == 'live':
+            live_video_options = {
+                "image_encode_options": agent._live_video_config.encode_options(),
+                "media_resolution": agent._live_video_config.media_resolution_option(),
+            }
+            # Older livekit-plugins-google releases lack these kwargs; pass only what the
+            # installed RealtimeModel accepts instead of failing the session with TypeError
+            try:
+                accepted = inspect.signature(google.beta.realtime.RealtimeModel).parameters
+            except (TypeError, ValueError):
+                accepted = {}
+            unsupported = [name for name in live_video_options if name not in accepted]
+            if unsupported:
+                logger.warning(f"[Vision] RealtimeModel does not accept {', '.join(unsupported)}; "
+                               f"live frames use the plugin defaults (upgrade livekit-plugins-google)")
+                for name in unsupported:
+                    live_video_options.pop(name)
+
+        # Create AgentSession with integrated Gemini Live model (STT + LLM + TTS)
+        # Language is controlled via voice selection and system instructions
+        # Erinome voice is designed for Portuguese (pt-BR)
+        session = AgentSession(
+            llm=google.beta.realtime.RealtimeModel(
+                model=
+                gemini_model,  # Using selected model (native audio or standard realtime)
+                voice="Kore",  # Female voice optimized for Portuguese (pt-BR)
+                temperature=
+                0.5,  # Lower for more consistent responses and pronunciation
+                instructions=system_prompt,
+                **live_video_options,
+            ), )
+
+        logger.info("[MediAI] 🏥 Starting medical consultation session...")
+        logger.info(
+            "[MediAI] 🛠️ Function tools serão executados automaticamente pelo LiveKit"
+        )
 
-    # Vision capability configuration
-    # Default: On-demand vision via look_at_patient tool (stable, no crashes)
-    # Optional: Continuous streaming (requires AVX-capable CPU, may crash otherwise)
+        # Register listener for user transcriptions to detect doctor search intent
+        @session.on("user_input_transcribed")
+        def on_user_transcribed(event):
+            """Real-time intent detection from patient speech transcriptions."""
+            asyncio.create_task(agent._handle_user_transcription(event))
+
+        # NOTE: Não é mais necessário registrar handler manual para tool_call
+        # O LiveKit agora gerencia automaticamente a execução das function tools
+        # quando fnc_ctx é passado para o RealtimeModel
+
+        # on_enter waits on real signals instead of a fixed delay
+        readiness = ReadinessBarrier(('session', 'avatar', 'patient_audio'))
+        agent._readiness = readiness
+        metrics_collector.readiness = readiness
+        watch_room_readiness(ctx.room, readiness)
+
+        async def _avatar_stage(avatar_provider, connect, session_start):
+            started = await start_avatar(avatar_provider, session, ctx.room, metrics_collector)
+            if not started:
+                readiness.skip('avatar', 'no avatar')
+            return started
+
+        # Start session with agent, then the avatar on top of its audio output
+        bootstrap.add('session_start', lambda: session.start(agent=agent, room=ctx.room))
+        bootstrap.add('avatar', _avatar_stage, after=('avatar_provider', 'connect', 'session_start'))
+        await bootstrap.result('session_start')
+        readiness.signal('session')
+
+        # Store session reference in agent for video streaming
+        agent._agent_session = session
+
+        logger.info("[MediAI] ✅ Session started successfully!")
+
+        # Vision capability configuration
+        # Default: On-demand vision via look_at_patient tool (stable, no crashes)
+        # Optional: Continuous streaming (requires AVX-capable CPU, may crash otherwise)
     
-    if vision_enabled:
-        if vision_streaming_enabled:
-            # EXPERIMENTAL: Continuous streaming - may crash on CPUs without AVX
-            logger.info("[MediAI] 👁️ Vision: CONTINUOUS STREAMING mode (1 frame/4s)")
-            logger.warning("[MediAI] ⚠️ Streaming may crash on CPUs without AVX support")
-            
-            # Start video streaming for existing participants
-            for participant in ctx.room.remote_participants.values():
-                asyncio.create_task(agent.start_video_streaming(participant))
+        if vision_enabled:
+            # Open the shared vision client's connection before the first look_at_patient call
+            asyncio.create_task(get_vision_client().warm_up())
+
+            if vision_mode in ('streaming', 'live'):
+                # EXPERIMENTAL: Continuous streaming - may crash on CPUs without AVX
+                if vision_mode == 'live':
+                    logger.info(f"[MediAI] 👁️ Vision: LIVE mode (1 frame/"
+                                f"{agent._live_video_config.frame_interval:g}s into the realtime session)")
+                else:
+                    logger.info("[MediAI] 👁️ Vision: CONTINUOUS STREAMING mode (1 frame/4s)")
+                logger.warning("[MediAI] ⚠️ Streaming may crash on CPUs without AVX support")
             
-            # Register listener for new participant connections
-            @ctx.room.on("participant_connected")
-            def on_participant_connected(participant):
-                """Start video streaming when a new participant connects."""
-                logger.info(f"[Vision] 👤 Participant connected: {participant.identity}")
-                asyncio.create_task(agent.start_video_streaming(participant))
+                # Start video streaming for existing participants
+                for participant in ctx.room.remote_participants.values():
+                    asyncio.create_task(agent.start_video_streaming(participant))
             
-            # Register listener for track subscriptions (when camera is enabled)
-            @ctx.room.on("track_subscribed")
-            def on_track_subscribed(track, publication, participant):
-                """Start video streaming when a video track is subscribed."""
-                if track.kind == rtc.TrackKind.KIND_VIDEO:
-                    logger.info(f"[Vision] 📹 Video track subscribed from: {participant.identity}")
+                # Register listener for new participant connections
+                @ctx.room.on("participant_connected")
+                def on_participant_connected(participant):
+                    """Start video streaming when a new participant connects."""
+                    logger.info(f"[Vision] 👤 Participant connected: {participant.identity}")
                     asyncio.create_task(agent.start_video_streaming(participant))
+            
+                # Register listener for track subscriptions (when camera is enabled)
+                @ctx.room.on("track_subscribed")
+                def on_track_subscribed(track, publication, participant):
+                    """Start video streaming when a video track is subscribed."""
+                    if track.kind == rtc.TrackKind.KIND_VIDEO:
+                        logger.info(f"[Vision] 📹 Video track subscribed from: {participant.identity}")
+                        asyncio.create_task(agent.start_video_streaming(participant))
+            else:
+                # DEFAULT: On-demand vision via look_at_patient tool
+                logger.info("[MediAI] 👁️ Vision: ON-DEMAND mode via look_at_patient tool")
+                if VISION_CAPTURE_MODE == 'persistent':
+                    logger.info("[MediAI] 💡 Agent can see patient when needed "
+                                "(persistent capture stream - opt-in, not validated on non-AVX hosts)")
+                else:
+                    logger.info("[MediAI] 💡 Agent can see patient when needed (stable, no SIGILL risk)")
         else:
-            # DEFAULT: On-demand vision via look_at_patient tool
-            logger.info("[MediAI] 👁️ Vision: ON-DEMAND mode via look_at_patient tool")
-            logger.info("[MediAI] 💡 Agent can see patient when needed (stable, no SIGILL risk)")
-    else:
-        logger.info("[MediAI] 👁️ Vision disabled (set ENABLE_VISION=true to enable)")
+            logger.info("[MediAI] 👁️ Vision disabled (set ENABLE_VISION=true to enable)")
 
-    # Hook into session events to track metrics
-    # Note: Gemini Live API integrates STT/LLM/TTS, so we estimate based on interaction
-    # CRITICAL: Since we use Native Audio, the audio channel is continuously open.
-    # We must estimate audio tokens based on session duration.
+        # Hook into session events to track metrics
+        # Note: Gemini Live API integrates STT/LLM/TTS, so we estimate based on interaction
+        # CRITICAL: Since we use Native Audio, the audio channel is continuously open.
+        # We must estimate audio tokens based on session duration.
     
-    # Estimated tokens per second of audio (based on Gemini average ~25 tokens/second)
-    TOKENS_PER_SECOND_AUDIO = 25
+        # Estimated tokens per second of audio (based on Gemini average ~25 tokens/second)
+        TOKENS_PER_SECOND_AUDIO = 25
     
-    async def track_conversation():
-        """Background task to track conversation metrics with audio token estimation."""
-        last_track_time = time.time()
+        async def track_conversation():
+            """Background task to track conversation metrics with audio token estimation."""
+            last_track_time = time.time()
         
-        try:
-            while True:
-                await asyncio.sleep(5)  # Check every 5 seconds
+            try:
+                while True:
+                    await asyncio.sleep(5)  # Check every 5 seconds
                 
-                current_time = time.time()
-                elapsed_seconds = current_time - last_track_time
-                last_track_time = current_time
+                    current_time = time.time()
+                    elapsed_seconds = current_time - last_track_time
+                    last_track_time = current_time
                 
-                # Update active time on every iteration
-                metrics_collector.update_active_time()
-
-                # Rastrear atividade baseado em participantes conectados
-                if len(ctx.room.remote_participants) > 0:
-                    # ========================================
-                    # AUDIO TOKEN ESTIMATION (Native Audio)
-                    # ========================================
-                    # The audio channel is continuously open with Gemini Native Audio.
-                    # We estimate tokens based on elapsed time:
-                    # - STT (Audio Input): Model "listens" continuously = 100% of time
-                    # - TTS (Audio Output): Model speaks ~50% of time (conservative estimate)
+                    # Update active time on every iteration
+                    metrics_collector.update_active_time()
+
+                    # Rastrear atividade baseado em participantes conectados
+                    if len(ctx.room.remote_participants) > 0:
+                        # ========================================
+                        # AUDIO TOKEN ESTIMATION (Native Audio)
+                        # ========================================
+                        # The audio channel is continuously open with Gemini Native Audio.
+                        # We estimate tokens based on elapsed time:
+                        # - STT (Audio Input): Model "listens" continuously = 100% of time
+                        # - TTS (Audio Output): Model speaks ~50% of time (conservative estimate)
                     
-                    stt_tokens_delta = int(elapsed_seconds * TOKENS_PER_SECOND_AUDIO)
-                    tts_tokens_delta = int(elapsed_seconds * TOKENS_PER_SECOND_AUDIO * 0.5)
+                        stt_tokens_delta = int(elapsed_seconds * TOKENS_PER_SECOND_AUDIO)
+                        tts_tokens_delta = int(elapsed_seconds * TOKENS_PER_SECOND_AUDIO * 0.5)
                     
-                    # Add to metrics collector
-                    metrics_collector.stt_tokens += stt_tokens_delta
-                    metrics_collector.tts_tokens += tts_tokens_delta
+                        # Add to metrics collector
+                        metrics_collector.stt_tokens += stt_tokens_delta
+                        metrics_collector.tts_tokens += tts_tokens_delta
                     
-                    logger.debug(
-                        f"[Metrics] Audio estimation: +{stt_tokens_delta} STT, +{tts_tokens_delta} TTS "
-                        f"(totals: {metrics_collector.stt_tokens} STT, {metrics_collector.tts_tokens} TTS)"
-                    )
+                        logger.debug(
+                            f"[Metrics] Audio estimation: +{stt_tokens_delta} STT, +{tts_tokens_delta} TTS "
+                            f"(totals: {metrics_collector.stt_tokens} STT, {metrics_collector.tts_tokens} TTS)"
+                        )
                     
-        except asyncio.CancelledError:
-            logger.info("[Metrics] Background tracking stopped")
-
-    # Start background tracking
-    tracking_task = asyncio.create_task(track_conversation())
-
-    # Get avatar provider configuration from database (async call with pool)
-    avatar_provider = await get_avatar_provider_config(pool)
-    logger.info(f"[MediAI] 🎭 Avatar provider selected: {avatar_provider}")
-
-    # Initialize avatar based on configuration
-    if avatar_provider == 'bey':
-        # Beyond Presence (BEY) Avatar
-        bey_api_key = os.getenv('BEY_API_KEY')
-        bey_avatar_id = os.getenv(
-            'BEY_AVATAR_ID')  # Optional, uses default if not set
-
-        if bey_api_key:
-            logger.info(
-                "[MediAI] 🎭 Initializing Beyond Presence (BEY) avatar...")
-
-            try:
-                # Create BEY avatar session
-                avatar_params = {'avatar_participant_name': 'MediAI'}
-
-                # Add avatar_id if specified
-                if bey_avatar_id:
-                    avatar_params['avatar_id'] = bey_avatar_id
-
-                avatar = bey.AvatarSession(**avatar_params)
-
-                logger.info("[MediAI] 🎥 Starting BEY avatar...")
-                await avatar.start(session, room=ctx.room)
-
-                # Iniciar rastreamento de custo do avatar
-                metrics_collector.start_avatar_tracking('bey')
-                
-                logger.info(
-                    "[MediAI] ✅ Beyond Presence avatar started successfully!")
-
-            except Exception as e:
-                logger.error(f"[MediAI] ⚠️ BEY avatar error: {e}")
-                logger.info("[MediAI] Continuing with audio only")
-        else:
-            logger.warning(
-                "[MediAI] BEY_API_KEY not found - running audio only")
-
-    else:
-        # Tavus Avatar (default)
-        tavus_api_key = os.getenv('TAVUS_API_KEY')
-        replica_id = os.getenv('TAVUS_REPLICA_ID')
-        persona_id = os.getenv('TAVUS_PERSONA_ID')
-
-        if tavus_api_key and replica_id and persona_id:
-            logger.info("[MediAI] 🎭 Initializing Tavus avatar...")
-
-            try:
-                avatar = tavus.AvatarSession(replica_id=replica_id,
-                                             persona_id=persona_id,
-                                             avatar_participant_name="MediAI")
-
-                logger.info("[MediAI] 🎥 Starting Tavus avatar...")
-                await avatar.start(session, room=ctx.room)
+            except asyncio.CancelledError:
+                logger.info("[Metrics] Background tracking stopped")
 
-                # Iniciar rastreamento de custo do avatar
-                metrics_collector.start_avatar_tracking('tavus')
-                
-                logger.info("[MediAI] ✅ Tavus avatar started successfully!")
+        # Start background tracking
+        tracking_task = asyncio.create_task(track_conversation())
 
-            except Exception as e:
-                logger.error(f"[MediAI] ⚠️ Tavus avatar error: {e}")
-                logger.info("[MediAI] Continuing with audio only")
-        else:
-            logger.warning(
-                "[MediAI] Tavus credentials not found - running audio only")
+        await bootstrap.result('avatar')
+        metrics_collector.bootstrap = bootstrap
+        logger.info(f"[MediAI] ⏱️ Bootstrap: {bootstrap.describe()}")
 
-    # Wait for session to end
-    try:
+        # Wait for session to end
         # This will block until the room is disconnected
         await asyncio.Event().wait()
     except asyncio.CancelledError:
@@ -2532,6 +3036,9 @@ CONTEXTO DO PACIENTE:
         # Cleanup and send final metrics
         logger.info("[MediAI] 🛑 Session ending, cleaning up...")
 
+        # Stages still running (e.g. pool/avatar lookup after a failed connect)
+        await bootstrap.cancel()
+
         # Cleanup VideoStream cache (on-demand vision only - no streaming task)
         if 'agent' in locals() and agent:
             await agent.cleanup_video_stream()
@@ -2549,10 +3056,11 @@ CONTEXTO DO PACIENTE:
             metrics_collector.stop_avatar_tracking()
             await metrics_collector.stop()
 
-        # Close database connection pool
-        if 'pool' in locals() and pool:
-            logger.info("[MediAI] 💾 Closing database connection pool...")
-            await pool.close()
+        # Close this loop's shared pool and HTTP client before the job loop goes away
+        await db_pool_manager.close()
+        await close_http_client()
+        # Process-pool JPEG workers and their shared-memory segments (VISION_ENCODER=process)
+        shutdown_process_encoder()
         
         # Clear global agent instance reference to allow GC
         global _current_agent_instance
@@ -2563,10 +3071,24 @@ CONTEXTO DO PACIENTE:
 
 
 if __name__ == "__main__":
+    # Worker-level patient context cache, shared by the job processes
+    if len(sys.argv) > 1 and sys.argv[1] in ('start', 'dev'):
+        serve_context_cache()
+
+    # Opt-in: idle job processes kept imported and prewarmed (each holds its own imports,
+    # encoder workers and memory); by default every job starts cold, as before
+    prewarm_options = {}
+    if os.getenv('AGENT_PREWARM', 'false').lower() == 'true':
+        prewarm_options = {
+            "prewarm_fnc": prewarm,
+            "initialize_process_timeout": float(os.getenv('AGENT_PREWARM_TIMEOUT', '20')),
+        }
+
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
-            num_idle_processes=0,
+            num_idle_processes=int(os.getenv('AGENT_NUM_IDLE_PROCESSES', '0')),
             job_memory_warn_mb=400,
             job_memory_limit_mb=2000,
+            **prewarm_options,
         ))
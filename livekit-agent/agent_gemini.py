@@ -8,7 +8,13 @@ import json
 from dotenv import load_dotenv
 
 from livekit import agents
-from livekit.plugins import tavus, google, silero
+from livekit.plugins import silero
+
+from lazy_imports import lazy_import
+
+# Loaded on first use in the entrypoint (job main thread); Tavus only with credentials
+google = lazy_import('livekit.plugins.google')
+tavus = lazy_import('livekit.plugins.tavus')
 
 # Load environment variables
 load_dotenv()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+In-Thread vs Process-Pool Frame Encoding Benchmark
+Simulates N concurrent consultations in one worker process, each encoding a
+720p I420 frame as fast as its vision executor allows, while an event-loop
+probe measures how late a 5 ms timer fires (a proxy for realtime audio jitter).
+
+Usage:
+    python benchmarks/bench_encoder_sessions.py [--sessions 1,4,8] [--seconds 5] [--processes 2]
+
+thread:  encode_frame_to_jpeg in a ThreadPoolExecutor (what VISION_ENCODER=thread does)
+process: ProcessPoolEncoder via shared memory (VISION_ENCODER=process)
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from vision.encoder import ProcessPoolEncoder, encode_frame_to_jpeg
+from vision.geometry import compute_output_geometry
+
+WIDTH, HEIGHT = 1280, 720
+PROBE_INTERVAL = 0.005
+
+
+def make_i420_frame(width: int, height: int) -> bytes:
+    """Smooth gradient + noise, closer to camera content than pure noise."""
+    rng = random.Random(width * height)
+    luma = bytes(((x + y) // 4 + rng.randint(0, 15)) & 0xFF
+                 for y in range(height) for x in range(width))
+    chroma = bytes(128 + rng.randint(-8, 8) for _ in range(2 * (width // 2) * (height // 2)))
+    return luma + chroma
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(mode: str, sessions: int, seconds: float, frame: bytes, processes: int) -> dict:
+    geometry = compute_output_geometry(WIDTH, HEIGHT, natural_downsample=2)
+    threads = ThreadPoolExecutor(max_workers=sessions * 2)
+    encoder = ProcessPoolEncoder(max_workers=processes) if mode == 'process' else None
+    loop = asyncio.get_running_loop()
+
+    if encoder is not None:
+        # Start the workers before measuring
+        await loop.run_in_executor(threads, encoder.encode, frame, WIDTH, HEIGHT, 'i420', geometry)
+
+    latencies = []
+    lags = []
+    deadline = time.perf_counter() + seconds
+
+    def encode_once():
+        if encoder is not None:
+            return encoder.encode(frame, WIDTH, HEIGHT, 'i420', geometry)
+        return encode_frame_to_jpeg(frame, WIDTH, HEIGHT, 'i420', geometry)
+
+    async def session():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await loop.run_in_executor(threads, encode_once)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def probe():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+    await asyncio.gather(probe(), *(session() for _ in range(sessions)))
+
+    threads.shutdown(wait=True)
+    if encoder is not None:
+        encoder.shutdown()
+
+    return {
+        'frames_per_s': len(latencies) / seconds,
+        'encode_p50_ms': statistics.median(latencies) if latencies else 0.0,
+        'encode_p95_ms': percentile(latencies, 95),
+        'lag_p99_ms': percentile(lags, 99),
+        'lag_max_ms': max(lags) if lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', default='1,4,8', help='comma-separated concurrent session counts')
+    parser.add_argument('--seconds', type=float, default=5.0, help='duration of each run')
+    parser.add_argument('--processes', type=int, default=2, help='encoder worker processes')
+    args = parser.parse_args()
+
+    frame = make_i420_frame(WIDTH, HEIGHT)
+    print(f"Frame: {WIDTH}x{HEIGHT} I420, {args.seconds:.0f}s per run, {args.processes} encoder processes")
+    print()
+    print(f"{'mode':<8} {'sessions':>8} {'frames/s':>9} {'enc p50 (ms)':>13} {'enc p95 (ms)':>13} "
+          f"{'lag p99 (ms)':>13} {'lag max (ms)':>13}")
+    for sessions in (int(s) for s in args.sessions.split(',')):
+        for mode in ('thread', 'process'):
+            r = asyncio.run(run(mode, sessions, args.seconds, frame, args.processes))
+            print(f"{mode:<8} {sessions:>8} {r['frames_per_s']:>9.1f} {r['encode_p50_ms']:>13.1f} "
+                  f"{r['encode_p95_ms']:>13.1f} {r['lag_p99_ms']:>13.2f} {r['lag_max_ms']:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
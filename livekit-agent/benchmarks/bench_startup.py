@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Cold vs Prewarmed Job Start Benchmark
+Measures how long a job process needs before its entrypoint can do useful
+work, with and without the idle-process prewarm (AGENT_NUM_IDLE_PROCESSES /
+prewarm_fnc in agent.py).
+
+cold:      the clock starts when the process is spawned; it imports agent.py
+           and builds the HTTP client, Gemini plugin, PIL codecs, vision
+           client / encoder workers and avatar provider on first use, like
+           a job with num_idle_processes=0
+prewarmed: the process is spawned, imports agent.py and runs prewarm() ahead
+           of time; the clock starts when the "job" is handed to it
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--vision] [--process-encoder]
+
+The prewarmed case is what a worker does with AGENT_PREWARM=true and
+AGENT_NUM_IDLE_PROCESSES>=1 (both off by default).
+
+DATABASE_URL is used for the avatar provider lookup when set.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CHILD = r'''
+import asyncio, json, sys, time
+spawned_at = float(sys.argv[2])
+import_start = time.perf_counter()
+import agent
+import_ms = (time.perf_counter() - import_start) * 1000
+
+class Proc:
+    userdata = {}
+
+if sys.argv[1] == 'prewarmed':
+    agent.prewarm(Proc())
+    print('ready', flush=True)
+    sys.stdin.readline()
+job_start = time.perf_counter()
+
+async def first_job_work():
+    # What the first job needs from the warm-up set, built lazily if prewarm did not
+    agent.http_client.get_http_client()
+    agent.google.beta
+    if agent.PIL_AVAILABLE:
+        import io
+        agent.Image.new('RGB', (16, 16)).save(io.BytesIO(), format='JPEG')
+    if agent.os.getenv('ENABLE_VISION', 'false').lower() == 'true':
+        agent.get_vision_client()
+        encoder = agent.get_process_encoder()
+        if encoder is not None:
+            encoder.warm_up()
+    pool = None
+    if agent.os.getenv('DATABASE_URL'):
+        import asyncpg
+        pool = await asyncpg.create_pool(agent.os.environ['DATABASE_URL'], min_size=1, max_size=1)
+    try:
+        await agent.resolve_avatar_provider(pool)
+    finally:
+        if pool is not None:
+            await pool.close()
+    await agent.close_http_client()
+
+asyncio.run(first_job_work())
+print(json.dumps({"importMs": import_ms, "jobMs": (time.perf_counter() - job_start) * 1000,
+                  "prewarm": Proc.userdata.get('prewarm')}), flush=True)
+'''
+
+
+def run_once(mode: str, env: dict) -> dict:
+    spawned_at = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', CHILD, mode, str(spawned_at)], cwd=AGENT_DIR, env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if mode == 'prewarmed':
+        line = proc.stdout.readline()
+        if line.strip() != 'ready':
+            raise RuntimeError(f"prewarm failed: {line!r}")
+        job_requested = time.perf_counter()
+        proc.stdin.write('go\n')
+        proc.stdin.flush()
+    else:
+        job_requested = spawned_at
+    result = json.loads(proc.stdout.readline())
+    ready_at = time.perf_counter()
+    proc.wait()
+    result["startToReadyMs"] = (ready_at - job_requested) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--vision', action='store_true', help='ENABLE_VISION=true (vision client)')
+    parser.add_argument('--process-encoder', action='store_true', help='VISION_ENCODER=process (implies --vision)')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('GEMINI_API_KEY', 'benchmark')
+    if args.vision or args.process_encoder:
+        env['ENABLE_VISION'] = 'true'
+    if args.process_encoder:
+        env['VISION_ENCODER'] = 'process'
+
+    print(f"{'mode':<10} {'start->ready':>14} {'import':>10} {'first-job work':>16}")
+    for mode in ('cold', 'prewarmed'):
+        results = [run_once(mode, env) for _ in range(args.runs)]
+        ready = statistics.median(r["startToReadyMs"] for r in results)
+        imports = statistics.median(r["importMs"] for r in results)
+        work = statistics.median(r["jobMs"] for r in results)
+        imported = f"{imports:8.0f}ms" if mode == 'cold' else f"{'(idle)':>10}"
+        print(f"{mode:<10} {ready:12.0f}ms {imported} {work:14.0f}ms")
+        if mode == 'prewarmed':
+            print(f"  prewarm steps (last run, ms): {results[-1]['prewarm']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+YUV -> RGB Conversion Micro-Benchmark
+Compares the vision colour-conversion backends at 480p/720p/1080p and checks
+that every backend is bit-identical to the pure-Python reference (with box
+filtering off; timings include the numpy backend's box filter).
+
+Usage:
+    python benchmarks/bench_yuv_conversion.py [--repeat N] [--skip-pure] [--target WxH]
+
+--target converts straight to the given analysis size in one pass (fit policy),
+the way _process_video_frame_sync does when VISION_TARGET_WIDTH/HEIGHT are set.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from vision.geometry import GeometryConfig, compute_output_geometry
+from vision.yuv import available_backends, get_backend, i420_to_rgb, nv12_to_rgb
+
+RESOLUTIONS = {
+    '480p': (640, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+}
+
+
+def make_frame(width: int, height: int, fmt: str) -> bytes:
+    """Random frame data with the exact size LiveKit delivers."""
+    rng = random.Random(width * height)
+    y_size = width * height
+    if fmt == 'i420':
+        size = y_size + 2 * (width // 2) * (height // 2)
+    else:
+        size = y_size + width * (height // 2)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def time_backend(convert, data, width, height, backend, geometry, repeat: int) -> float:
+    """Best-of-N wall time in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        convert(data, width, height, backend=backend, geometry=geometry)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='runs per backend (best is reported)')
+    parser.add_argument('--skip-pure', action='store_true', help='skip the slow reference backend timing')
+    parser.add_argument('--target', help='single-pass output size, e.g. 800x600 (default: 1/2 resolution)')
+    args = parser.parse_args()
+
+    config = None
+    if args.target:
+        target_w, target_h = (int(v) for v in args.target.lower().split('x'))
+        config = GeometryConfig(target_width=target_w, target_height=target_h)
+
+    backends = available_backends()
+    print(f"Backends available: {', '.join(backends)}")
+    print()
+    print(f"{'format':<6} {'res':<6} " + ' '.join(f"{b + ' (ms)':>12}" for b in backends) + "   identical")
+
+    reference = get_backend('pure')
+    for fmt, convert in (('i420', i420_to_rgb), ('nv12', nv12_to_rgb)):
+        for label, (width, height) in RESOLUTIONS.items():
+            data = make_frame(width, height, fmt)
+            geometry = compute_output_geometry(width, height, config, natural_downsample=2) if config else None
+            expected, _ = convert(data, width, height, backend=reference, geometry=geometry, box_filter=False)
+
+            timings = []
+            identical = True
+            for name in backends:
+                backend = get_backend(name)
+                if name == 'pure' and args.skip_pure:
+                    timings.append('skipped')
+                    continue
+                repeat = 1 if name == 'pure' else args.repeat
+                timings.append(f"{time_backend(convert, data, width, height, backend, geometry, repeat):.1f}")
+                rgb, _ = convert(data, width, height, backend=backend, geometry=geometry, box_filter=False)
+                identical = identical and rgb == expected
+
+            print(f"{fmt:<6} {label:<6} " + ' '.join(f"{t:>12}" for t in timings) +
+                  f"   {'yes' if identical else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Startup Import Report
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+breaks the import cost of the agent down by direct import, by top-level
+package and by the most expensive individual modules. With --job-path it also
+loads the module's lazy imports (lazy_imports.py) to show what a job pays
+later, on the code path that needs them.
+
+Usage:
+    python benchmarks/startup_report.py [--module agent] [--top 15] [--job-path] [--budget-ms 3000]
+
+--budget-ms exits with status 1 when the module import exceeds the budget, so
+the report can guard cold start in CI or before a deploy.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+AGENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+class ImportRecord(NamedTuple):
+    name: str
+    depth: int
+    self_ms: float
+    cumulative_ms: float
+
+
+def child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault('GEMINI_API_KEY', 'startup-report')
+    return env
+
+
+def collect_importtime(module: str) -> List[ImportRecord]:
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=AGENT_DIR, env=child_env(), capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    records = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append(ImportRecord(name, len(indent) // 2,
+                                        int(self_us) / 1000, int(cumulative_us) / 1000))
+    return records
+
+
+def collect_job_path(module: str) -> Dict[str, float]:
+    """Import time of every lazy module `module` declares, loaded after the import."""
+    script = (
+        f"import json, {module} as target, lazy_imports\n"
+        "lazy = [v for v in vars(target).values() if isinstance(v, lazy_imports.LazyModule)]\n"
+        "for m in lazy:\n"
+        "    try:\n"
+        "        lazy_imports.preload(m)\n"
+        "    except Exception:\n"
+        "        pass\n"
+        "print(json.dumps({m.__name__: lazy_imports.load_times().get(m.__name__) for m in lazy}))\n"
+    )
+    proc = subprocess.run([sys.executable, '-c', script], cwd=AGENT_DIR, env=child_env(),
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"job path for {module} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_table(title: str, rows, top: int):
+    print(f"\n{title}")
+    for name, ms in rows[:top]:
+        print(f"  {ms:9.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='agent', help='module to import (agent, agent_gemini, ...)')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--job-path', action='store_true', help='also load the lazy imports a job uses')
+    parser.add_argument('--budget-ms', type=float, default=None, help='fail when the import exceeds this')
+    args = parser.parse_args()
+
+    records = collect_importtime(args.module)
+    target = next((r for r in records if r.name == args.module and r.depth == 0), None)
+    if target is None:
+        raise SystemExit(f"no importtime record for '{args.module}'")
+
+    # Records are emitted in completion order, so a module's children precede it
+    start = records.index(target)
+    while start > 0 and records[start - 1].depth > 0:
+        start -= 1
+    subtree = records[start:records.index(target)]
+
+    direct = sorted(((r.name, r.cumulative_ms) for r in subtree if r.depth == 1),
+                    key=lambda row: row[1], reverse=True)
+    by_package: Dict[str, float] = defaultdict(float)
+    for record in subtree:
+        by_package[record.name.split('.')[0]] += record.self_ms
+    packages = sorted(by_package.items(), key=lambda row: row[1], reverse=True)
+    heaviest = sorted(((r.name, r.self_ms) for r in subtree), key=lambda row: row[1], reverse=True)
+
+    print(f"import {args.module}: {target.cumulative_ms:.1f} ms "
+          f"({len(subtree)} modules, {target.self_ms:.1f} ms in the module body)")
+    print_table("Direct imports (cumulative)", direct, args.top)
+    print_table("By top-level package (self time)", packages, args.top)
+    print_table("Heaviest modules (self time)", heaviest, args.top)
+
+    if args.job_path:
+        job_path = collect_job_path(args.module)
+        rows = sorted(((name, ms or 0.0) for name, ms in job_path.items()), key=lambda row: row[1], reverse=True)
+        print_table("Lazy imports (paid on first use / in prewarm)", rows, len(rows))
+
+    if args.budget_ms is not None and target.cumulative_ms > args.budget_ms:
+        print(f"\n❌ import {args.module} took {target.cumulative_ms:.1f} ms, budget {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
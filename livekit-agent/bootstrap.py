@@ -0,0 +1,208 @@
+"""
+Session Bootstrap Graph
+Runs the independent steps of a consultation start concurrently: each stage
+starts as soon as the stages it depends on have finished, instead of the whole
+entrypoint running connect -> pool -> context -> session -> avatar in series.
+
+Stage functions receive the results of their dependencies as keyword
+arguments named after those stages. Stages can be added while the graph is
+running (e.g. once the room metadata tells us the patient id), and every stage
+records when it became ready, how long it waited for its dependencies and how
+long it ran, reported as the session's `bootstrap` metrics.
+
+ReadinessBarrier replaces fixed startup sleeps: it waits for named signals
+(avatar video published, session started, patient audio subscribed) and
+gives up after a timeout, so fast sessions are not held back.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+class BootstrapError(Exception):
+    """A stage could not run because one of its dependencies failed."""
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable[..., Awaitable[Any]], after: tuple):
+        self.name = name
+        self.fn = fn
+        self.after = after
+        self.task: Optional[asyncio.Task] = None
+        self.added_at = 0.0
+        self.ready_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.ok: Optional[bool] = None
+
+
+class BootstrapGraph:
+    """Dependency graph of async startup stages with per-stage timings."""
+
+    def __init__(self):
+        self._stages: Dict[str, _Stage] = {}
+        self._started_at = time.perf_counter()
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], after: Iterable[str] = ()) -> asyncio.Task:
+        """Schedule stage `name`; it runs fn(**{dep: result}) once every stage in `after` is done.
+
+        Dependencies must already be registered, which also rules out cycles.
+        """
+        if name in self._stages:
+            raise ValueError(f"bootstrap stage '{name}' already added")
+        after = tuple(after)
+        for dep in after:
+            if dep not in self._stages:
+                raise ValueError(f"bootstrap stage '{name}' depends on unknown stage '{dep}'")
+
+        stage = _Stage(name, fn, after)
+        stage.added_at = time.perf_counter()
+        stage.task = asyncio.create_task(self._run_stage(stage), name=f"bootstrap_{name}")
+        # Failures surface through result()/dependents; don't warn about unretrieved exceptions
+        stage.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        self._stages[name] = stage
+        return stage.task
+
+    async def _run_stage(self, stage: _Stage) -> Any:
+        kwargs = {}
+        try:
+            for dep in stage.after:
+                try:
+                    kwargs[dep] = await self._stages[dep].task
+                except Exception as e:
+                    raise BootstrapError(f"stage '{stage.name}' needs '{dep}', which failed: {e}") from e
+            stage.ready_at = time.perf_counter()
+            result = await stage.fn(**kwargs)
+            stage.ok = True
+            return result
+        except BaseException:
+            stage.ok = False
+            raise
+        finally:
+            stage.finished_at = time.perf_counter()
+
+    async def result(self, name: str) -> Any:
+        """Wait for stage `name` and return its result (re-raises its exception)."""
+        return await self._stages[name].task
+
+    async def cancel(self):
+        """Cancel stages that are still running."""
+        pending = [stage.task for stage in self._stages.values() if not stage.task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per stage: ms from bootstrap start to ready, wait for dependencies, run time."""
+        stages = {}
+        for name, stage in self._stages.items():
+            entry = {"after": list(stage.after), "ok": stage.ok}
+            if stage.ready_at is not None:
+                entry["readyMs"] = round((stage.ready_at - self._started_at) * 1000, 1)
+                entry["waitMs"] = round((stage.ready_at - stage.added_at) * 1000, 1)
+                if stage.finished_at is not None:
+                    entry["durationMs"] = round((stage.finished_at - stage.ready_at) * 1000, 1)
+            stages[name] = entry
+        finished = [stage.finished_at for stage in self._stages.values() if stage.finished_at is not None]
+        return {
+            "totalMs": round((max(finished) - self._started_at) * 1000, 1) if finished else None,
+            "stages": stages,
+        }
+
+    def describe(self) -> str:
+        """One-line summary for the logs, in completion order."""
+        done = sorted((stage for stage in self._stages.values() if stage.finished_at is not None),
+                      key=lambda stage: stage.finished_at)
+        parts = []
+        for stage in done:
+            ran = (stage.finished_at - (stage.ready_at or stage.finished_at)) * 1000
+            end = (stage.finished_at - self._started_at) * 1000
+            mark = "" if stage.ok else " ✗"
+            parts.append(f"{stage.name} {ran:.0f}ms (@{end:.0f}){mark}")
+        return ", ".join(parts)
+
+
+class ReadinessBarrier:
+    """Waits until every expected signal fired (or was skipped), bounded by a timeout.
+
+    Args:
+        signals: names of the signals to wait for
+        timeout: maximum wait in seconds (AGENT_READY_TIMEOUT, default 8)
+    """
+
+    def __init__(self, signals: Iterable[str], timeout: Optional[float] = None):
+        if timeout is None:
+            timeout = float(os.getenv('AGENT_READY_TIMEOUT', '8'))
+        self.timeout = timeout
+        self._created_at = time.perf_counter()
+        self._pending = set(signals)
+        self._signalled: Dict[str, float] = {}
+        self._skipped: Dict[str, str] = {}
+        self._ready = asyncio.Event()
+        self._done_callbacks: List[Callable[[], None]] = []
+        self._done = False
+        self.waited_ms: Optional[float] = None
+        self.timed_out: Optional[bool] = None
+        if not self._pending:
+            self._ready.set()
+            self._done = True
+
+    @property
+    def pending(self) -> Iterable[str]:
+        return sorted(self._pending)
+
+    def signal(self, name: str):
+        """Mark `name` as ready (repeated or unknown signals are ignored)."""
+        if name in self._pending:
+            self._pending.discard(name)
+            self._signalled[name] = round((time.perf_counter() - self._created_at) * 1000, 1)
+            self._check()
+
+    def skip(self, name: str, reason: str = ""):
+        """Stop waiting for `name` (e.g. no avatar configured)."""
+        if name in self._pending:
+            self._pending.discard(name)
+            self._skipped[name] = reason
+            self._check()
+
+    def on_done(self, callback: Callable[[], None]):
+        """Call `callback` once, when every signal arrived or wait() timed out."""
+        if self._done:
+            callback()
+        else:
+            self._done_callbacks.append(callback)
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def _check(self):
+        if not self._pending:
+            self._ready.set()
+            self._finish()
+
+    async def wait(self) -> bool:
+        """True when every signal arrived, False when the timeout expired first."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=self.timeout)
+            self.timed_out = False
+        except asyncio.TimeoutError:
+            self.timed_out = True
+            self._finish()
+        self.waited_ms = round((time.perf_counter() - started) * 1000, 1)
+        return not self.timed_out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "signalledMs": dict(self._signalled),
+            "skipped": dict(self._skipped),
+            "pending": list(self.pending),
+            "waitedMs": self.waited_ms,
+            "timedOut": self.timed_out,
+        }
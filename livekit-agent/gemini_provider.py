@@ -7,10 +7,14 @@ import os
 import asyncio
 import base64
 from typing import AsyncIterator, Optional
-import google.generativeai as genai
 from livekit import agents
 from livekit.agents import stt, llm, tts
 
+from lazy_imports import lazy_import
+
+# google.generativeai costs ~0.7s to import; load it when a provider is built
+genai = lazy_import('google.generativeai')
+
 
 class GeminiSTT(stt.STT):
     """Speech-to-Text using Gemini Multimodal API."""
@@ -0,0 +1,66 @@
+"""
+Shared HTTP Client
+One httpx.AsyncClient per event loop for the Next.js API calls (tools and
+metrics), so consecutive calls reuse keep-alive connections instead of paying
+a TCP + TLS handshake each time.
+
+httpx binds its connection pool to the loop of the first request, so clients
+are keyed by loop. prewarm() builds one client (SSL context, certifi bundle)
+before any loop exists; the first loop that asks for a client adopts it.
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from lazy_imports import lazy_import
+
+httpx = lazy_import('httpx')
+
+# httpx's own default, as the per-call tool/avatar clients this replaces used;
+# the metrics POST keeps its longer 10 s timeout per call
+DEFAULT_TIMEOUT = 5.0
+
+_clients: Dict[asyncio.AbstractEventLoop, 'httpx.AsyncClient'] = {}
+_prewarmed: Optional['httpx.AsyncClient'] = None
+_lock = threading.Lock()
+
+
+def _new_client() -> 'httpx.AsyncClient':
+    return httpx.AsyncClient(timeout=DEFAULT_TIMEOUT, follow_redirects=True)
+
+
+def prewarm():
+    """Build a client ahead of the first loop (call from the process prewarm)."""
+    global _prewarmed
+    with _lock:
+        if _prewarmed is None:
+            _prewarmed = _new_client()
+
+
+def get_http_client() -> 'httpx.AsyncClient':
+    """The running loop's shared client."""
+    global _prewarmed
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client, _prewarmed = (_prewarmed or _new_client()), None
+            _clients[loop] = client
+    return client
+
+
+@asynccontextmanager
+async def shared_http_client() -> AsyncIterator['httpx.AsyncClient']:
+    """`async with` drop-in for httpx.AsyncClient() that leaves the shared client open."""
+    yield get_http_client()
+
+
+async def close_http_client():
+    """Close the running loop's client (call before the loop shuts down)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,88 @@
+"""
+Lazy Imports
+Defers heavy optional dependencies (avatar plugins, the Gemini plugin, PIL,
+httpx) until the code path that needs them runs, so the worker process and a
+cold job process do not pay for providers or vision features that are not
+configured.
+
+lazy_import() returns a module proxy: the real import happens on the first
+attribute access and its duration is recorded (load_times(), reported by
+benchmarks/startup_report.py). LiveKit plugins register themselves on import
+and that must happen on the main thread: agent.py preloads the ones a job
+needs in prewarm(), otherwise their first use is in the entrypoint, which
+runs on the job process's main thread (never touch them from an executor
+thread first).
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+from types import ModuleType
+from typing import Dict, List
+
+_load_times: Dict[str, float] = {}
+_lock = threading.RLock()
+
+
+class LazyModule(ModuleType):
+    """Module proxy that imports `name` on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    _load_times[self.__name__] = round((time.perf_counter() - start) * 1000, 1)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Proxy for module `name`, imported on first use."""
+    return LazyModule(name)
+
+
+def module_available(name: str) -> bool:
+    """Whether `name` is installed, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def preload(*modules: LazyModule) -> Dict[str, float]:
+    """Import the given lazy modules now; returns {name: ms} for the ones that were not loaded yet."""
+    timings = {}
+    for module in modules:
+        if not module.loaded:
+            module._load()
+            timings[module.__name__] = _load_times.get(module.__name__, 0.0)
+    return timings
+
+
+def load_times() -> Dict[str, float]:
+    """Import time (ms) of every lazy module loaded so far in this process."""
+    with _lock:
+        return dict(_load_times)
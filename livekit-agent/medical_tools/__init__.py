@@ -3,13 +3,30 @@ Medical Tools for MediAI LiveKit Agent
 Provides functions for accessing patient medical history, exams, and wellness plans.
 """
 
-from .patient_data import get_patient_info, get_patient_exams, get_consultation_history
-from .wellness import get_wellness_plan, update_wellness_plan
+from .patient_data import (PatientRepository, get_patient_info, get_patient_exams,
+                           get_consultation_history, get_patient_full_context)
+from .wellness import WellnessRepository, get_wellness_plan, update_wellness_plan, get_wellness_summary
+from .pool import DatabasePoolManager, MeteredPool, get_pool_manager, require_pool
+from .context_cache import (PatientContextCache, ContextInvalidationListener, ContextCacheClient,
+                            connect_context_cache, serve_context_cache)
 
 __all__ = [
+    'PatientRepository',
+    'WellnessRepository',
     'get_patient_info',
     'get_patient_exams',
     'get_consultation_history',
+    'get_patient_full_context',
     'get_wellness_plan',
-    'update_wellness_plan'
+    'update_wellness_plan',
+    'get_wellness_summary',
+    'DatabasePoolManager',
+    'MeteredPool',
+    'get_pool_manager',
+    'require_pool',
+    'PatientContextCache',
+    'ContextInvalidationListener',
+    'ContextCacheClient',
+    'connect_context_cache',
+    'serve_context_cache'
 ]
@@ -0,0 +1,315 @@
+"""
+Patient Context Cache
+Worker-level TTL + LRU cache of the formatted patient context, so a patient
+reconnecting after a dropped call starts without a database round trip.
+
+LiveKit runs every job in its own process, so the cache lives in the worker
+(main) process and jobs reach it through a multiprocessing manager on a local
+socket (serve_context_cache / connect_context_cache). The address and auth key
+are passed to job processes through the environment.
+
+Staleness is ruled out by Postgres LISTEN/NOTIFY: the triggers in
+sql/patient_context_notify.sql send the patient id on PATIENT_CONTEXT_CHANNEL
+whenever a patient's prompt fields or exams change, and a listener thread in
+the worker invalidates that entry. The cache only answers while the listener
+is connected and the triggers are installed; every (re)connect starts from an
+empty cache, since notifications sent while disconnected are lost. A fetch
+that races with an invalidation is not stored (begin/put tokens).
+
+Configuration (environment):
+    PATIENT_CONTEXT_CACHE            enable the cache (default true; needs DATABASE_URL)
+    PATIENT_CONTEXT_CACHE_TTL        entry lifetime in seconds (default 900)
+    PATIENT_CONTEXT_CACHE_SIZE       LRU capacity (default 256)
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("mediai-avatar")
+
+PATIENT_CONTEXT_CHANNEL = "patient_context_changed"
+TRIGGER_NAMES = ("patients_context_notify", "exams_context_notify")
+
+ADDRESS_ENV = "PATIENT_CONTEXT_CACHE_ADDRESS"
+AUTHKEY_ENV = "PATIENT_CONTEXT_CACHE_AUTHKEY"
+
+# Invalidation records kept for in-flight fetches (begin -> put)
+MAX_INVALIDATION_RECORDS = 4096
+
+Token = Tuple[int, int]
+
+
+def cache_enabled() -> bool:
+    return (os.getenv('PATIENT_CONTEXT_CACHE', 'true').lower() == 'true'
+            and bool(os.getenv('DATABASE_URL')))
+
+
+class PatientContextCache:
+    """Thread-safe TTL/LRU map of patient_id -> formatted context.
+
+    Args:
+        max_entries: LRU capacity (PATIENT_CONTEXT_CACHE_SIZE, default 256)
+        ttl_seconds: entry lifetime (PATIENT_CONTEXT_CACHE_TTL, default 900s)
+    """
+
+    def __init__(self,
+                 max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        if max_entries is None:
+            max_entries = int(os.getenv('PATIENT_CONTEXT_CACHE_SIZE', '256'))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('PATIENT_CONTEXT_CACHE_TTL', '900'))
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+        # patient_id -> sequence number of its last invalidation
+        self._invalidated: 'OrderedDict[str, int]' = OrderedDict()
+        self._sequence = 0
+        self._pruned_sequence = 0
+        self._epoch = 0
+        self._live = False
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.stale_stores = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def set_live(self, live: bool):
+        """Listener state: entries are only served/stored while invalidations are flowing."""
+        with self._lock:
+            if live != self._live:
+                # Either way the cached entries can no longer be trusted
+                self._entries.clear()
+                self._epoch += 1
+            self._live = live
+
+    def get(self, patient_id: str) -> Optional[str]:
+        """Cached context, or None (counted as miss)."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(patient_id) if self._live else None
+            if entry is not None and now - entry[1] > self.ttl_seconds:
+                del self._entries[patient_id]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(patient_id)
+            self.hits += 1
+            return entry[0]
+
+    def begin(self, patient_id: str) -> Token:
+        """Token taken before querying the database; pass it to put()."""
+        with self._lock:
+            return self._epoch, self._sequence
+
+    def put(self, patient_id: str, context: str, token: Token) -> bool:
+        """Store context fetched after begin(); dropped if the patient changed meanwhile."""
+        if not self.enabled:
+            return False
+        epoch, sequence = token
+        with self._lock:
+            if not self._live or epoch != self._epoch:
+                return False
+            if sequence < self._pruned_sequence or self._invalidated.get(patient_id, 0) > sequence:
+                self.stale_stores += 1
+                return False
+            self._entries[patient_id] = (context, time.monotonic())
+            self._entries.move_to_end(patient_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stores += 1
+            return True
+
+    def invalidate(self, patient_id: str):
+        with self._lock:
+            self._sequence += 1
+            self._invalidated[patient_id] = self._sequence
+            self._invalidated.move_to_end(patient_id)
+            while len(self._invalidated) > MAX_INVALIDATION_RECORDS:
+                _, pruned = self._invalidated.popitem(last=False)
+                self._pruned_sequence = max(self._pruned_sequence, pruned)
+            self._entries.pop(patient_id, None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "live": self._live,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "staleStores": self.stale_stores,
+                "invalidations": self.invalidations,
+            }
+
+
+class ContextInvalidationListener:
+    """LISTENs on PATIENT_CONTEXT_CHANNEL in a daemon thread and invalidates the cache.
+
+    Keeps its own event loop and connection (outside the job pools), checks the
+    connection every keepalive seconds and reconnects with backoff.
+    """
+
+    def __init__(self, cache: PatientContextCache, database_url: str,
+                 channel: str = PATIENT_CONTEXT_CHANNEL, keepalive: float = 30.0):
+        self.cache = cache
+        self.database_url = database_url
+        self.channel = channel
+        self.keepalive = keepalive
+        self._thread: Optional[threading.Thread] = None
+        self.connects = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()),
+                                        name="patient-context-listener", daemon=True)
+        self._thread.start()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        if payload:
+            self.cache.invalidate(payload)
+
+    async def _run(self):
+        import asyncpg
+
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.database_url)
+                installed = await conn.fetchval(
+                    "SELECT count(*) FROM pg_trigger WHERE tgname = ANY($1::text[]) AND NOT tgisinternal",
+                    list(TRIGGER_NAMES))
+                if installed < len(TRIGGER_NAMES):
+                    logger.warning("[MediAI] Patient context cache disabled: notify triggers not installed "
+                                   "(run livekit-agent/sql/patient_context_notify.sql)")
+                    return
+                await conn.add_listener(self.channel, self._on_notify)
+                self.cache.set_live(True)
+                self.connects += 1
+                backoff = 1.0
+                logger.info(f"[MediAI] 💾 Patient context cache listening on '{self.channel}'")
+                while not conn.is_closed():
+                    await asyncio.sleep(self.keepalive)
+                    await conn.execute("SELECT 1")
+            except Exception as e:
+                logger.warning(f"[MediAI] Patient context listener disconnected: {e}")
+            finally:
+                self.cache.set_live(False)
+                if conn is not None and not conn.is_closed():
+                    try:
+                        await conn.close(timeout=5)
+                    except Exception:
+                        pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+
+class _CacheManager(BaseManager):
+    pass
+
+
+def serve_context_cache() -> Optional[PatientContextCache]:
+    """Start the worker-level cache, its listener and the manager server (worker process only).
+
+    Exports the manager address/auth key to the environment inherited by job processes.
+    """
+    if not cache_enabled():
+        return None
+
+    cache = PatientContextCache()
+    _CacheManager.register('cache', callable=lambda: cache)
+    authkey = secrets.token_bytes(16)
+    server = _CacheManager(authkey=authkey).get_server()
+    threading.Thread(target=server.serve_forever, name="patient-context-cache", daemon=True).start()
+
+    os.environ[ADDRESS_ENV] = server.address if isinstance(server.address, str) else f"{server.address[0]}:{server.address[1]}"
+    os.environ[AUTHKEY_ENV] = authkey.hex()
+
+    ContextInvalidationListener(cache, os.environ['DATABASE_URL']).start()
+    logger.info(f"[MediAI] 💾 Patient context cache serving at {os.environ[ADDRESS_ENV]}")
+    return cache
+
+
+class ContextCacheClient:
+    """Job-side async access to the worker cache; every failure degrades to a miss."""
+
+    def __init__(self, proxy, timeout: float = 1.0):
+        self._proxy = proxy
+        self.timeout = timeout
+
+    async def _call(self, method: str, *args):
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(getattr(self._proxy, method), *args), timeout=self.timeout)
+        except Exception as e:
+            logger.debug(f"[MediAI] Patient context cache {method} failed: {e}")
+            return None
+
+    async def get(self, patient_id: str) -> Optional[str]:
+        return await self._call('get', patient_id)
+
+    async def begin(self, patient_id: str) -> Optional[Token]:
+        return await self._call('begin', patient_id)
+
+    async def put(self, patient_id: str, context: str, token: Optional[Token]) -> bool:
+        if token is None:
+            return False
+        return bool(await self._call('put', patient_id, context, tuple(token)))
+
+    async def snapshot(self) -> Optional[Dict[str, object]]:
+        return await self._call('snapshot')
+
+
+_client: Optional[ContextCacheClient] = None
+_client_lock = threading.Lock()
+
+
+def connect_context_cache() -> Optional[ContextCacheClient]:
+    """Client for the worker's cache (None when it is not served)."""
+    global _client
+    address = os.getenv(ADDRESS_ENV)
+    authkey = os.getenv(AUTHKEY_ENV)
+    if not address or not authkey:
+        return None
+    with _client_lock:
+        if _client is None:
+            if ':' in address and not os.path.exists(address):
+                host, port = address.rsplit(':', 1)
+                address = (host, int(port))
+            _CacheManager.register('cache')
+            manager = _CacheManager(address=address, authkey=bytes.fromhex(authkey))
+            try:
+                manager.connect()
+                _client = ContextCacheClient(manager.cache())
+            except Exception as e:
+                logger.warning(f"[MediAI] Patient context cache unavailable: {e}")
+                return None
+        return _client
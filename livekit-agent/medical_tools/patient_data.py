@@ -1,48 +1,97 @@
 """
 Patient Data Access Functions
 Provides async functions to fetch patient information from database.
+
+PatientRepository runs every query on the shared pool (see pool.py), so the
+parallel fetches of get_full_context reuse warm pooled connections instead of
+opening one connection per call. The module-level functions are kept for
+existing callers and use the process-wide pool manager.
 """
 
-import os
-import asyncpg
-from typing import Dict, List, Optional
-from datetime import datetime
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
 
+from .pool import require_pool
 
-async def get_db_connection():
-    """Create database connection using DATABASE_URL from environment."""
-    database_url = os.getenv('DATABASE_URL')
-    if not database_url:
-        raise ValueError('DATABASE_URL environment variable not set')
-    
-    return await asyncpg.connect(database_url)
 
+def _isoformat(value: Any) -> Optional[str]:
+    """ISO string for timestamps; text columns (exams.date, last_visit) pass through."""
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _json_value(value: Any) -> Any:
+    """asyncpg returns json columns as text unless a codec is registered."""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+# Patient row, the last $2 exams (JSON-aggregated via LATERAL) and the two
+# wellness plan excerpts the prompt uses, in a single round trip
+PROMPT_CONTEXT_QUERY = """
+    SELECT p.name, p.email, p.age, p.reported_symptoms, p.doctor_notes, p.exam_results,
+           left(p.wellness_plan->>'dietaryPlan', 200) AS dietary_plan,
+           left(p.wellness_plan->>'exercisePlan', 200) AS exercise_plan,
+           COALESCE(e.exams, '[]'::json) AS recent_exams
+    FROM patients p
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_object(
+                   'type', x.type,
+                   'status', x.status,
+                   'result', x.result,
+                   'preliminary_diagnosis', x.preliminary_diagnosis,
+                   'date', x.created_at::text
+               ) ORDER BY x.created_at DESC) AS exams
+        FROM (
+            SELECT type, status, result, preliminary_diagnosis, created_at
+            FROM exams
+            WHERE patient_id = p.id
+            ORDER BY created_at DESC
+            LIMIT $2
+        ) x
+    ) e ON true
+    WHERE p.id = $1
+"""
+
+
+class PatientRepository:
+    """Patient, exam and consultation queries on a (shared) asyncpg pool.
 
-async def get_patient_info(patient_id: str) -> Dict:
-    """
-    Get patient basic information.
-    
     Args:
-        patient_id: The patient's unique identifier
-        
-    Returns:
-        Dictionary with patient information
+        pool: asyncpg pool or MeteredPool; each method acquires its own
+            connection, so concurrent calls run on separate pooled connections
     """
-    conn = await get_db_connection()
-    try:
-        patient = await conn.fetchrow(
-            """
-            SELECT id, name, age, gender, city, state, status, 
-                   reported_symptoms, last_visit, created_at
-            FROM patients
-            WHERE id = $1
-            """,
-            patient_id
-        )
-        
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def get_info(self, patient_id: str) -> Dict:
+        """
+        Get patient basic information.
+
+        Args:
+            patient_id: The patient's unique identifier
+
+        Returns:
+            Dictionary with patient information
+        """
+        async with self.pool.acquire() as conn:
+            patient = await conn.fetchrow(
+                """
+                SELECT id, name, age, gender, city, state, status,
+                       reported_symptoms, last_visit, created_at
+                FROM patients
+                WHERE id = $1
+                """,
+                patient_id
+            )
+
         if not patient:
             return {"error": "Patient not found"}
-        
+
         return {
             "id": patient['id'],
             "name": patient['name'],
@@ -51,140 +100,172 @@ async def get_patient_info(patient_id: str) -> Dict:
             "location": f"{patient['city']}, {patient['state']}",
             "status": patient['status'],
             "reported_symptoms": patient['reported_symptoms'],
-            "last_visit": patient['last_visit'].isoformat() if patient['last_visit'] else None
+            "last_visit": _isoformat(patient['last_visit'])
         }
-    finally:
-        await conn.close()
 
+    async def get_exams(self, patient_id: str, limit: int = 10) -> List[Dict]:
+        """
+        Get patient exam history.
+
+        Args:
+            patient_id: The patient's unique identifier
+            limit: Maximum number of exams to return (default: 10)
+
+        Returns:
+            List of exam dictionaries
+        """
+        async with self.pool.acquire() as conn:
+            exams = await conn.fetch(
+                """
+                SELECT id, type, date, results, status,
+                       preliminary_diagnosis, explanation,
+                       doctor_notes, final_explanation
+                FROM exams
+                WHERE patient_id = $1
+                ORDER BY created_at DESC
+                LIMIT $2
+                """,
+                patient_id, limit
+            )
 
-async def get_patient_exams(patient_id: str, limit: int = 10) -> List[Dict]:
-    """
-    Get patient exam history.
-    
-    Args:
-        patient_id: The patient's unique identifier
-        limit: Maximum number of exams to return (default: 10)
-        
-    Returns:
-        List of exam dictionaries
-    """
-    conn = await get_db_connection()
-    try:
-        exams = await conn.fetch(
-            """
-            SELECT id, type, date, results, status, 
-                   preliminary_diagnosis, ai_explanation,
-                   doctor_notes, final_explanation
-            FROM exams
-            WHERE patient_id = $1
-            ORDER BY date DESC
-            LIMIT $2
-            """,
-            patient_id, limit
-        )
-        
         return [
             {
                 "id": exam['id'],
                 "type": exam['type'],
-                "date": exam['date'].isoformat(),
-                "results": exam['results'],
+                "date": _isoformat(exam['date']),
+                "results": _json_value(exam['results']),
                 "status": exam['status'],
                 "diagnosis": exam['preliminary_diagnosis'],
-                "explanation": exam['ai_explanation'] or exam['final_explanation']
+                "explanation": exam['final_explanation'] or exam['explanation']
             }
             for exam in exams
         ]
-    finally:
-        await conn.close()
 
+    async def get_consultations(self, patient_id: str, limit: int = 5) -> List[Dict]:
+        """
+        Get patient consultation history.
+
+        Args:
+            patient_id: The patient's unique identifier
+            limit: Maximum number of consultations to return (default: 5)
+
+        Returns:
+            List of consultation dictionaries
+        """
+        async with self.pool.acquire() as conn:
+            consultations = await conn.fetch(
+                """
+                SELECT id, type, date, summary
+                FROM consultations
+                WHERE patient_id = $1
+                ORDER BY created_at DESC
+                LIMIT $2
+                """,
+                patient_id, limit
+            )
 
-async def get_consultation_history(patient_id: str, limit: int = 5) -> List[Dict]:
-    """
-    Get patient consultation history.
-    
-    Args:
-        patient_id: The patient's unique identifier
-        limit: Maximum number of consultations to return (default: 5)
-        
-    Returns:
-        List of consultation dictionaries
-    """
-    conn = await get_db_connection()
-    try:
-        consultations = await conn.fetch(
-            """
-            SELECT id, type, date, transcription, summary, 
-                   main_concerns, ai_recommendations
-            FROM consultations
-            WHERE patient_id = $1
-            ORDER BY date DESC
-            LIMIT $2
-            """,
-            patient_id, limit
-        )
-        
         return [
             {
                 "id": consultation['id'],
                 "type": consultation['type'],
-                "date": consultation['date'].isoformat(),
-                "summary": consultation['summary'],
-                "concerns": consultation['main_concerns'],
-                "recommendations": consultation['ai_recommendations']
+                "date": _isoformat(consultation['date']),
+                "summary": consultation['summary']
             }
             for consultation in consultations
         ]
-    finally:
-        await conn.close()
 
+    async def get_prompt_context(self, patient_id: str, exam_limit: int = 3) -> Optional[Dict]:
+        """
+        Everything the agent prompt needs in one query (PROMPT_CONTEXT_QUERY).
 
-async def get_patient_full_context(patient_id: str) -> str:
-    """
-    Get complete patient context as formatted text for LLM.
-    
-    Args:
-        patient_id: The patient's unique identifier
-        
-    Returns:
-        Formatted string with complete patient context
-    """
-    # Get all data in parallel
-    patient_info, exams, consultations = await asyncio.gather(
-        get_patient_info(patient_id),
-        get_patient_exams(patient_id),
-        get_consultation_history(patient_id)
-    )
-    
-    # Format as readable text
-    context = f"""INFORMAÇÕES DO PACIENTE:
+        Args:
+            patient_id: The patient's unique identifier
+            exam_limit: Number of recent exams to include (default: 3)
+
+        Returns:
+            Dictionary with the patient fields, dietary_plan / exercise_plan
+            excerpts and recent_exams (list), or None if the patient does not exist
+        """
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(PROMPT_CONTEXT_QUERY, patient_id, exam_limit)
+
+        if not row:
+            return None
+
+        data = dict(row)
+        data['recent_exams'] = _json_value(data['recent_exams'])
+        return data
+
+    async def get_full_context(self, patient_id: str) -> str:
+        """
+        Get complete patient context as formatted text for LLM.
+
+        Args:
+            patient_id: The patient's unique identifier
+
+        Returns:
+            Formatted string with complete patient context
+        """
+        # Get all data in parallel (one pooled connection each)
+        patient_info, exams, consultations = await asyncio.gather(
+            self.get_info(patient_id),
+            self.get_exams(patient_id, limit=5),
+            self.get_consultations(patient_id, limit=3)
+        )
+
+        # Format as readable text
+        context = f"""INFORMAÇÕES DO PACIENTE:
 Nome: {patient_info.get('name', 'N/A')}
 Idade: {patient_info.get('age', 'N/A')} anos
 Gênero: {patient_info.get('gender', 'N/A')}
 Localização: {patient_info.get('location', 'N/A')}
 Status: {patient_info.get('status', 'N/A')}
-Sintomas Relatados: {patient_info.get('reported_symptoms', 'Nenhum')}
-Última Visita: {patient_info.get('last_visit', 'Primeira consulta')}
+Sintomas Relatados: {patient_info.get('reported_symptoms') or 'Nenhum'}
+Última Visita: {patient_info.get('last_visit') or 'Primeira consulta'}
 
 """
-    
-    if exams:
-        context += "HISTÓRICO DE EXAMES:\n"
-        for i, exam in enumerate(exams[:5], 1):
-            context += f"{i}. {exam['type']} ({exam['date']}):\n"
-            context += f"   Status: {exam['status']}\n"
-            if exam['diagnosis']:
-                context += f"   Diagnóstico: {exam['diagnosis']}\n"
-            if exam['explanation']:
-                context += f"   Explicação: {exam['explanation'][:200]}...\n"
-        context += "\n"
-    
-    if consultations:
-        context += "HISTÓRICO DE CONSULTAS:\n"
-        for i, consult in enumerate(consultations[:3], 1):
-            context += f"{i}. {consult['type']} ({consult['date']}):\n"
-            if consult['summary']:
-                context += f"   Resumo: {consult['summary'][:150]}...\n"
-        context += "\n"
-    
-    return context
+
+        if exams:
+            context += "HISTÓRICO DE EXAMES:\n"
+            for i, exam in enumerate(exams, 1):
+                context += f"{i}. {exam['type']} ({exam['date']}):\n"
+                context += f"   Status: {exam['status']}\n"
+                if exam['diagnosis']:
+                    context += f"   Diagnóstico: {exam['diagnosis']}\n"
+                if exam['explanation']:
+                    context += f"   Explicação: {exam['explanation'][:200]}...\n"
+            context += "\n"
+
+        if consultations:
+            context += "HISTÓRICO DE CONSULTAS:\n"
+            for i, consult in enumerate(consultations, 1):
+                context += f"{i}. {consult['type']} ({consult['date']}):\n"
+                if consult['summary']:
+                    context += f"   Resumo: {consult['summary'][:150]}...\n"
+            context += "\n"
+
+        return context
+
+
+async def _repository() -> PatientRepository:
+    return PatientRepository(await require_pool())
+
+
+async def get_patient_info(patient_id: str) -> Dict:
+    """Get patient basic information (see PatientRepository.get_info)."""
+    return await (await _repository()).get_info(patient_id)
+
+
+async def get_patient_exams(patient_id: str, limit: int = 10) -> List[Dict]:
+    """Get patient exam history (see PatientRepository.get_exams)."""
+    return await (await _repository()).get_exams(patient_id, limit)
+
+
+async def get_consultation_history(patient_id: str, limit: int = 5) -> List[Dict]:
+    """Get patient consultation history (see PatientRepository.get_consultations)."""
+    return await (await _repository()).get_consultations(patient_id, limit)
+
+
+async def get_patient_full_context(patient_id: str) -> str:
+    """Get complete patient context as formatted text for LLM (see PatientRepository.get_full_context)."""
+    return await (await _repository()).get_full_context(patient_id)
@@ -0,0 +1,250 @@
+"""
+Shared Database Pool
+One asyncpg pool per event loop, shared by everything in the job that talks
+to Postgres (patient context, avatar config, medical_tools), instead of a pool
+created and torn down inside every consultation.
+
+asyncpg pools are bound to the loop that created them, so pools are keyed by
+loop: under the default process executor that is one pool per job process,
+under the thread executor one per job thread. start() begins the TCP/TLS/auth
+handshakes in the background so they overlap with the LiveKit room connect.
+
+Configuration (environment):
+    DATABASE_URL                     connection string (no pool when unset)
+    DB_POOL_MIN_SIZE                 connections opened up front (default 1)
+    DB_POOL_MAX_SIZE                 maximum connections (default 5)
+    DB_COMMAND_TIMEOUT               per-statement timeout in seconds (default 10)
+    DB_POOL_MAX_INACTIVE_LIFETIME    idle connection lifetime in seconds (default 300)
+    DB_POOL_ACQUIRE_TIMEOUT          max wait for a free connection (default 10)
+    DB_STATEMENT_CACHE_SIZE          prepared statements cached per connection
+                                     (default 100; 0 behind pgbouncer in transaction mode)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger("mediai-avatar")
+
+
+class _MeteredAcquire:
+    """async with pool.acquire() as conn, recording wait time and in-use count."""
+
+    def __init__(self, metered: 'MeteredPool', timeout: Optional[float]):
+        self._metered = metered
+        self._timeout = timeout
+        self._conn = None
+
+    async def __aenter__(self):
+        metered = self._metered
+        metered.waiting += 1
+        started = time.perf_counter()
+        try:
+            self._conn = await metered.pool.acquire(timeout=self._timeout)
+        except asyncio.TimeoutError:
+            metered.acquire_timeouts += 1
+            raise
+        finally:
+            metered.waiting -= 1
+        metered._record_acquire((time.perf_counter() - started) * 1000)
+        metered.in_use += 1
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._metered.in_use -= 1
+        await self._metered.pool.release(self._conn)
+        self._conn = None
+
+
+class MeteredPool:
+    """asyncpg pool wrapper exposing acquire-wait and in-use gauges.
+
+    Drop-in for the call sites that use `async with pool.acquire() as conn`.
+    """
+
+    def __init__(self, pool, acquire_timeout: Optional[float] = None):
+        self.pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.in_use = 0
+        self.waiting = 0
+        self.acquires = 0
+        self.acquire_timeouts = 0
+        self.last_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._total_wait_ms = 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> _MeteredAcquire:
+        return _MeteredAcquire(self, timeout if timeout is not None else self.acquire_timeout)
+
+    def _record_acquire(self, wait_ms: float):
+        self.acquires += 1
+        self.last_wait_ms = wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self._total_wait_ms += wait_ms
+
+    async def close(self):
+        await self.pool.close()
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "size": self.pool.get_size(),
+            "idle": self.pool.get_idle_size(),
+            "maxSize": self.pool.get_max_size(),
+            "inUse": self.in_use,
+            "waiting": self.waiting,
+            "acquires": self.acquires,
+            "acquireTimeouts": self.acquire_timeouts,
+            "lastWaitMs": round(self.last_wait_ms, 1),
+            "maxWaitMs": round(self.max_wait_ms, 1),
+            "avgWaitMs": round(self._total_wait_ms / self.acquires, 1) if self.acquires else 0.0,
+        }
+
+
+class DatabasePoolManager:
+    """Creates and hands out the shared pool of the running event loop."""
+
+    def __init__(self,
+                 database_url: Optional[str] = None,
+                 min_size: Optional[int] = None,
+                 max_size: Optional[int] = None,
+                 command_timeout: Optional[float] = None,
+                 max_inactive_lifetime: Optional[float] = None,
+                 acquire_timeout: Optional[float] = None,
+                 statement_cache_size: Optional[int] = None):
+        self.database_url = database_url if database_url is not None else os.getenv('DATABASE_URL')
+        self.max_size = max(1, max_size if max_size is not None else int(os.getenv('DB_POOL_MAX_SIZE', '5')))
+        self.min_size = min(self.max_size,
+                            min_size if min_size is not None else int(os.getenv('DB_POOL_MIN_SIZE', '1')))
+        self.command_timeout = (command_timeout if command_timeout is not None
+                                else float(os.getenv('DB_COMMAND_TIMEOUT', '10')))
+        self.max_inactive_lifetime = (max_inactive_lifetime if max_inactive_lifetime is not None
+                                      else float(os.getenv('DB_POOL_MAX_INACTIVE_LIFETIME', '300')))
+        self.acquire_timeout = (acquire_timeout if acquire_timeout is not None
+                                else float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', '10')))
+        self.statement_cache_size = max(0, statement_cache_size if statement_cache_size is not None
+                                        else int(os.getenv('DB_STATEMENT_CACHE_SIZE', '100')))
+        self._lock = threading.Lock()
+        self._pools: Dict[asyncio.AbstractEventLoop, MeteredPool] = {}
+        self._creating: Dict[asyncio.AbstractEventLoop, asyncio.Task] = {}
+        self.created = 0
+        self.last_create_ms = 0.0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.database_url)
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Begin creating this loop's pool in the background (idempotent)."""
+        if not self.configured:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop in self._pools:
+                return None
+            task = self._creating.get(loop)
+            if task is None:
+                task = loop.create_task(self._create(loop), name="db_pool_create")
+                self._creating[loop] = task
+        return task
+
+    async def _create(self, loop: asyncio.AbstractEventLoop) -> Optional[MeteredPool]:
+        import asyncpg
+
+        started = time.perf_counter()
+        try:
+            pool = await asyncpg.create_pool(self.database_url,
+                                             min_size=self.min_size,
+                                             max_size=self.max_size,
+                                             command_timeout=self.command_timeout,
+                                             max_inactive_connection_lifetime=self.max_inactive_lifetime,
+                                             statement_cache_size=self.statement_cache_size)
+        except Exception as e:
+            logger.error(f"[MediAI] Failed to create database pool: {e}")
+            with self._lock:
+                self._creating.pop(loop, None)
+            return None
+
+        metered = MeteredPool(pool, acquire_timeout=self.acquire_timeout)
+        self.last_create_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._pools[loop] = metered
+            self._creating.pop(loop, None)
+            self.created += 1
+        logger.info(f"[MediAI] 💾 Database pool ready in {self.last_create_ms:.0f} ms "
+                    f"(min {self.min_size}, max {self.max_size})")
+        return metered
+
+    async def get_pool(self) -> Optional[MeteredPool]:
+        """The running loop's shared pool, created on first use; None without DATABASE_URL or on failure."""
+        if not self.configured:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.get(loop)
+        if pool is not None:
+            return pool
+        task = self.start()
+        if task is None:
+            with self._lock:
+                return self._pools.get(loop)
+        return await asyncio.shield(task)
+
+    async def close(self):
+        """Close the running loop's pool (call before the loop shuts down)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.pop(loop, None)
+            task = self._creating.pop(loop, None)
+        if task is not None and pool is None:
+            pool = await task
+            with self._lock:
+                self._pools.pop(loop, None)
+        if pool is not None:
+            logger.info("[MediAI] 💾 Closing database connection pool...")
+            await pool.close()
+
+    def snapshot(self) -> Optional[Dict[str, float]]:
+        """Gauges of the running loop's pool (None when there is none)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        with self._lock:
+            pool = self._pools.get(loop)
+        if pool is None:
+            return None
+        stats = pool.snapshot()
+        stats["createMs"] = round(self.last_create_ms, 1)
+        return stats
+
+
+_manager: Optional[DatabasePoolManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_pool_manager() -> DatabasePoolManager:
+    """Process-wide DatabasePoolManager."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = DatabasePoolManager()
+    return _manager
+
+
+async def require_pool() -> MeteredPool:
+    """The running loop's shared pool.
+
+    Raises:
+        ValueError: DATABASE_URL is not set or the pool could not be created
+    """
+    manager = get_pool_manager()
+    if not manager.configured:
+        raise ValueError('DATABASE_URL environment variable not set')
+    pool = await manager.get_pool()
+    if pool is None:
+        raise ValueError('Database pool unavailable')
+    return pool
@@ -0,0 +1,36 @@
+-- Patient context cache invalidation (livekit-agent/medical_tools/context_cache.py)
+--
+-- Sends the patient id on channel 'patient_context_changed' whenever a field
+-- used in the agent's patient context changes, or an exam is added, changed or
+-- removed. The agent only caches patient contexts while both triggers exist.
+--
+-- Apply once per database:
+--   psql "$DATABASE_URL" -f livekit-agent/sql/patient_context_notify.sql
+
+CREATE OR REPLACE FUNCTION notify_patient_context_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'patients' THEN
+        PERFORM pg_notify('patient_context_changed', CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END);
+    ELSE
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM pg_notify('patient_context_changed', OLD.patient_id);
+        END IF;
+        IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.patient_id IS DISTINCT FROM OLD.patient_id) THEN
+            PERFORM pg_notify('patient_context_changed', NEW.patient_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS patients_context_notify ON patients;
+CREATE TRIGGER patients_context_notify
+    AFTER UPDATE OF name, age, reported_symptoms, doctor_notes, exam_results, wellness_plan OR DELETE
+    ON patients
+    FOR EACH ROW EXECUTE FUNCTION notify_patient_context_changed();
+
+DROP TRIGGER IF EXISTS exams_context_notify ON exams;
+CREATE TRIGGER exams_context_notify
+    AFTER INSERT OR UPDATE OR DELETE
+    ON exams
+    FOR EACH ROW EXECUTE FUNCTION notify_patient_context_changed();
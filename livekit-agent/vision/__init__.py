@@ -0,0 +1,82 @@
+"""
+Vision Pipeline for MediAI LiveKit Agent
+Frame conversion and processing helpers used by look_at_patient and streaming vision.
+"""
+
+from .buffers import BufferPool, BufferWriter
+from .capture import LatestFrameCapture
+from .change_detection import (FrameChangeDetector, average_hash,
+                               hamming_distance, luma_thumbnail,
+                               mean_absolute_difference)
+from .client import (VisionClient, VisionResult, get_vision_client,
+                     resolve_vision_model_name, resolve_vision_timeout)
+from .encoder import (ProcessPoolEncoder, encode_frame_to_jpeg,
+                      get_process_encoder, shutdown_process_encoder)
+from .executor import VisionExecutor, VisionJobDropped, VisionQueueFull
+from .geometry import GeometryConfig, OutputGeometry, compute_output_geometry
+from .live import (LIVE_VIDEO_INPUT_USD_PER_M, LiveVideoConfig, VisionModeStats,
+                   resolve_vision_mode)
+from .memory import FrameMemoryStats, GCPolicy, current_rss_bytes
+from .observation_cache import ObservationCache, normalize_question
+from .observation_push import ObservationPublisher, observation_similarity
+from .quality import (AdaptiveJpegEncoder, EncodedImage, EncodingProfile,
+                      estimate_image_tokens, profile_for_focus)
+from .roi import RegionOfInterestDetector, skin_mask
+from .sharpness import FrameScore, score_frame, select_best_frame
+from .tracks import TrackRegistry, is_avatar_identity
+from .yuv import (ConversionBackend, available_backends, get_backend,
+                  i420_to_rgb, nv12_to_rgb)
+
+__all__ = [
+    'BufferPool',
+    'BufferWriter',
+    'LatestFrameCapture',
+    'FrameChangeDetector',
+    'average_hash',
+    'hamming_distance',
+    'luma_thumbnail',
+    'mean_absolute_difference',
+    'VisionClient',
+    'VisionResult',
+    'get_vision_client',
+    'resolve_vision_model_name',
+    'resolve_vision_timeout',
+    'ProcessPoolEncoder',
+    'encode_frame_to_jpeg',
+    'get_process_encoder',
+    'shutdown_process_encoder',
+    'VisionExecutor',
+    'VisionJobDropped',
+    'VisionQueueFull',
+    'GeometryConfig',
+    'OutputGeometry',
+    'compute_output_geometry',
+    'LiveVideoConfig',
+    'VisionModeStats',
+    'LIVE_VIDEO_INPUT_USD_PER_M',
+    'resolve_vision_mode',
+    'FrameMemoryStats',
+    'GCPolicy',
+    'current_rss_bytes',
+    'ObservationCache',
+    'normalize_question',
+    'ObservationPublisher',
+    'observation_similarity',
+    'AdaptiveJpegEncoder',
+    'EncodedImage',
+    'EncodingProfile',
+    'estimate_image_tokens',
+    'profile_for_focus',
+    'RegionOfInterestDetector',
+    'skin_mask',
+    'FrameScore',
+    'score_frame',
+    'select_best_frame',
+    'TrackRegistry',
+    'is_avatar_identity',
+    'ConversionBackend',
+    'available_backends',
+    'get_backend',
+    'i420_to_rgb',
+    'nv12_to_rgb'
+]
@@ -0,0 +1,153 @@
+"""
+Vision Buffer Pool
+Reusable, size-bucketed bytearrays for the frame pipeline (RGB conversion
+output and JPEG encoding scratch), so steady-state frame processing allocates
+nothing large and pipeline memory is bounded by construction instead of being
+reclaimed with forced gc.collect() calls.
+
+Buckets are powers of two (minimum MIN_BUCKET_BYTES). Each bucket keeps at
+most max_per_bucket idle buffers and the pool never holds more than
+max_pooled_bytes in total; anything beyond that is simply dropped.
+"""
+
+import io
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+MIN_BUCKET_BYTES = 64 * 1024
+
+
+def _bucket_for_request(nbytes: int) -> int:
+    """Smallest bucket size that can hold nbytes."""
+    size = MIN_BUCKET_BYTES
+    while size < nbytes:
+        size <<= 1
+    return size
+
+
+def _bucket_for_buffer(capacity: int) -> int:
+    """Largest bucket size a buffer of this capacity can serve (0 if too small)."""
+    if capacity < MIN_BUCKET_BYTES:
+        return 0
+    return 1 << (capacity.bit_length() - 1)
+
+
+class BufferPool:
+    """Thread-safe pool of bytearrays grouped by power-of-two size.
+
+    Args:
+        max_per_bucket: idle buffers kept per size (VISION_BUFFER_POOL_PER_BUCKET, default 2)
+        max_pooled_bytes: cap on idle bytes held by the pool
+            (VISION_BUFFER_POOL_MAX_MB, default 32 MB; 0 disables pooling)
+        on_allocate: called with the size of every buffer the pool has to allocate
+    """
+
+    def __init__(self,
+                 max_per_bucket: Optional[int] = None,
+                 max_pooled_bytes: Optional[int] = None,
+                 on_allocate: Optional[Callable[[int], None]] = None):
+        if max_per_bucket is None:
+            max_per_bucket = int(os.getenv('VISION_BUFFER_POOL_PER_BUCKET', '2'))
+        if max_pooled_bytes is None:
+            max_pooled_bytes = int(float(os.getenv('VISION_BUFFER_POOL_MAX_MB', '32')) * 1024 * 1024)
+        self.max_per_bucket = max_per_bucket
+        self.max_pooled_bytes = max_pooled_bytes
+        self._on_allocate = on_allocate
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, List[bytearray]] = {}
+        self._pooled_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def acquire(self, nbytes: int) -> bytearray:
+        """A buffer of at least nbytes (contents are undefined)."""
+        size = _bucket_for_request(nbytes)
+        with self._lock:
+            bucket = self._buckets.get(size)
+            if bucket:
+                buf = bucket.pop()
+                self._pooled_bytes -= len(buf)
+                self.hits += 1
+                return buf
+            self.misses += 1
+
+        buf = bytearray(size)
+        if self._on_allocate:
+            self._on_allocate(size)
+        return buf
+
+    def release(self, buf: Optional[bytearray]):
+        """Return a buffer to the pool; it must no longer be referenced elsewhere."""
+        if buf is None:
+            return
+        size = _bucket_for_buffer(len(buf))
+        with self._lock:
+            bucket = self._buckets.setdefault(size, []) if size else None
+            if (bucket is None or len(bucket) >= self.max_per_bucket
+                    or self._pooled_bytes + len(buf) > self.max_pooled_bytes):
+                self.dropped += 1
+                return
+            bucket.append(buf)
+            self._pooled_bytes += len(buf)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._pooled_bytes = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "pooledBytes": self._pooled_bytes,
+                "pooledBuffers": sum(len(b) for b in self._buckets.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "dropped": self.dropped,
+            }
+
+
+class BufferWriter(io.RawIOBase):
+    """Write-only file object backed by a (pooled) bytearray.
+
+    Lets PIL encode JPEGs into reusable scratch memory; the buffer grows in
+    place if the encoded image does not fit.
+    """
+
+    def __init__(self, buf: bytearray):
+        super().__init__()
+        self._buf = buf
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        n = len(data)
+        end = self._pos + n
+        if end > len(self._buf):
+            self._buf.extend(bytes(end - len(self._buf)))
+        self._buf[self._pos:end] = data
+        self._pos = end
+        return n
+
+    def tell(self) -> int:
+        return self._pos
+
+    def reset(self):
+        """Discard what was written (the buffer is kept for the next encode)."""
+        self._pos = 0
+
+    def getvalue(self) -> bytes:
+        """Copy of the bytes written so far."""
+        with memoryview(self._buf) as view:
+            return bytes(view[:self._pos])
+
+    def detach_buffer(self) -> bytearray:
+        """Hand the backing buffer back (for BufferPool.release) and close the writer."""
+        buf, self._buf = self._buf, bytearray()
+        self._pos = 0
+        self.close()
+        return buf
@@ -0,0 +1,177 @@
+"""
+Persistent On-Demand Frame Capture
+Keeps one lightweight video stream open per patient track and retains only
+the most recent frame, so look_at_patient gets a fresh frame in milliseconds
+instead of paying for a new subscription + first-keyframe wait on every call.
+
+Memory is bounded: the stream is created with a single-slot queue (the factory
+is expected to pass capacity=1 to rtc.VideoStream), only one decoded frame is
+kept here, and frames above max_frame_bytes are dropped. The stream closes
+itself after idle_timeout seconds without a get_frame() call.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger("mediai-avatar")
+
+# 1080p RGBA - anything larger is not worth holding on to for analysis
+DEFAULT_MAX_FRAME_BYTES = 1920 * 1080 * 4
+
+
+class LatestFrameCapture:
+    """Single-slot ring buffer fed by a long-lived video stream.
+
+    Args:
+        stream_factory: zero-argument callable returning an async-iterable
+            stream of frame events (with .frame) that supports aclose(),
+            e.g. lambda: rtc.VideoStream(track, capacity=1)
+        idle_timeout: seconds without get_frame() before the stream is torn
+            down (VISION_CAPTURE_IDLE_TIMEOUT, default 120; 0 keeps it open)
+        max_frame_bytes: frames with larger buffers are dropped
+            (VISION_CAPTURE_MAX_FRAME_BYTES, default 1080p RGBA)
+    """
+
+    def __init__(self,
+                 stream_factory: Callable[[], Any],
+                 idle_timeout: Optional[float] = None,
+                 max_frame_bytes: Optional[int] = None):
+        if idle_timeout is None:
+            idle_timeout = float(os.getenv('VISION_CAPTURE_IDLE_TIMEOUT', '120'))
+        if max_frame_bytes is None:
+            max_frame_bytes = int(os.getenv('VISION_CAPTURE_MAX_FRAME_BYTES', str(DEFAULT_MAX_FRAME_BYTES)))
+        self._stream_factory = stream_factory
+        self.idle_timeout = idle_timeout
+        self.max_frame_bytes = max_frame_bytes
+
+        self._stream = None
+        self._task: Optional[asyncio.Task] = None
+        self._latest = None
+        self._latest_time = 0.0
+        self._last_access = time.monotonic()
+        self._new_frame = asyncio.Event()
+
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self.starts = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Open the stream (no-op if it is already running)."""
+        if self.is_running:
+            return
+        self._last_access = time.monotonic()
+        self._stream = self._stream_factory()
+        self._task = asyncio.create_task(self._run())
+        self.starts += 1
+
+    async def _run(self):
+        stream = self._stream
+        frames = stream.__aiter__()
+        try:
+            while True:
+                wait = None
+                if self.idle_timeout > 0:
+                    wait = self._last_access + self.idle_timeout - time.monotonic()
+                    if wait <= 0:
+                        logger.info(f"[Vision] Frame capture idle for {self.idle_timeout:.0f}s, closing stream")
+                        break
+                try:
+                    event = await asyncio.wait_for(frames.__anext__(), timeout=wait)
+                except asyncio.TimeoutError:
+                    continue
+                except StopAsyncIteration:
+                    break
+
+                frame = getattr(event, 'frame', event)
+                if len(frame.data) > self.max_frame_bytes:
+                    self.frames_dropped += 1
+                    continue
+
+                # Single slot: the previous frame is released here
+                self._latest = frame
+                self._latest_time = time.monotonic()
+                self.frames_received += 1
+
+                waiters, self._new_frame = self._new_frame, asyncio.Event()
+                waiters.set()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"[Vision] Frame capture stream error: {e}")
+        finally:
+            self._latest = None
+            self._stream = None
+            try:
+                await stream.aclose()
+            except Exception:
+                pass
+
+    async def get_frame(self, timeout: float = 5.0, max_age: float = 1.0):
+        """Latest frame no older than max_age seconds, waiting up to timeout for one.
+
+        Restarts the stream if it was closed for idleness.
+
+        Raises:
+            asyncio.TimeoutError: no frame arrived within timeout
+        """
+        self._last_access = time.monotonic()
+        self.start()
+
+        if self._latest is not None and time.monotonic() - self._latest_time <= max_age:
+            return self._latest
+
+        await asyncio.wait_for(self._new_frame.wait(), timeout=timeout)
+        return self._latest
+
+    async def get_burst(self, count: int, window: float, timeout: float = 5.0,
+                        max_age: float = 1.0) -> List[Any]:
+        """Up to count distinct frames: the current one plus new ones arriving within window seconds.
+
+        Always returns at least one frame (or raises like get_frame).
+        """
+        first = await self.get_frame(timeout=timeout, max_age=max_age)
+        frames = [first]
+        deadline = time.monotonic() + window
+        while len(frames) < count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._new_frame.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            frame = self._latest
+            if frame is None:
+                break
+            if frame is not frames[-1]:
+                frames.append(frame)
+        self._last_access = time.monotonic()
+        return frames
+
+    async def aclose(self):
+        """Stop the stream and drop the retained frame."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._latest = None
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "running": self.is_running,
+            "framesReceived": self.frames_received,
+            "framesDropped": self.frames_dropped,
+            "starts": self.starts,
+            "latestFrameAgeMs": round((time.monotonic() - self._latest_time) * 1000, 1)
+            if self._latest is not None else None,
+        }
@@ -0,0 +1,185 @@
+"""
+Frame Change Detection
+Cheap perceptual difference between video frames, used to skip encoding and
+Gemini Vision calls while the patient is essentially static.
+
+A frame is reduced to a small luma thumbnail read straight from the raw buffer
+(no colour conversion), then compared with the last analysed frame using the
+mean absolute difference (0-255 scale).
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+THUMB_WIDTH = 32
+THUMB_HEIGHT = 24
+
+# Packed formats: byte offsets of R, G, B and bytes per pixel
+_PACKED_LAYOUTS = {
+    'rgba': (0, 1, 2, 4),
+    'bgra': (2, 1, 0, 4),
+    'rgb24': (0, 1, 2, 3),
+}
+
+
+def luma_thumbnail(data,
+                   width: int,
+                   height: int,
+                   fmt: str,
+                   thumb_width: int = THUMB_WIDTH,
+                   thumb_height: int = THUMB_HEIGHT) -> Optional[bytes]:
+    """Downscaled luma of a raw frame (thumb_width x thumb_height bytes).
+
+    Each thumbnail pixel averages a 2x2 sample inside its cell, which is
+    enough to smooth sensor noise without touching the whole frame.
+
+    Args:
+        data: raw frame buffer (bytes/bytearray/memoryview)
+        fmt: 'i420', 'nv12', 'rgba', 'bgra' or 'rgb24'
+
+    Returns:
+        Thumbnail bytes or None for unsupported formats / empty frames
+    """
+    if width <= 0 or height <= 0:
+        return None
+
+    thumb_width = min(thumb_width, width)
+    thumb_height = min(thumb_height, height)
+    cell_w = width / thumb_width
+    cell_h = height / thumb_height
+    xs = [(int(x * cell_w + cell_w / 4), int(x * cell_w + 3 * cell_w / 4))
+          for x in range(thumb_width)]
+    ys = [(int(y * cell_h + cell_h / 4), int(y * cell_h + 3 * cell_h / 4))
+          for y in range(thumb_height)]
+
+    if fmt in ('i420', 'nv12'):
+        # The Y plane is already luma
+        if len(data) < width * height:
+            return None
+        return bytes(
+            (data[y0 * width + x0] + data[y0 * width + x1] +
+             data[y1 * width + x0] + data[y1 * width + x1]) >> 2
+            for y0, y1 in ys for x0, x1 in xs)
+
+    layout = _PACKED_LAYOUTS.get(fmt)
+    if layout is None:
+        return None
+    r_off, g_off, b_off, bpp = layout
+    if len(data) < width * height * bpp:
+        return None
+
+    def luma(idx: int) -> int:
+        # BT.601 luma, integer approximation
+        return (77 * data[idx + r_off] + 150 * data[idx + g_off] + 29 * data[idx + b_off]) >> 8
+
+    return bytes(
+        (luma((y0 * width + x0) * bpp) + luma((y0 * width + x1) * bpp) +
+         luma((y1 * width + x0) * bpp) + luma((y1 * width + x1) * bpp)) >> 2
+        for y0, y1 in ys for x0, x1 in xs)
+
+
+def mean_absolute_difference(a: bytes, b: bytes) -> float:
+    """Mean absolute difference between two equally sized thumbnails."""
+    if not a or len(a) != len(b):
+        return 255.0
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+def average_hash(thumbnail: Optional[bytes],
+                 thumb_width: int = THUMB_WIDTH,
+                 thumb_height: int = THUMB_HEIGHT,
+                 hash_size: int = 8) -> Optional[int]:
+    """64-bit average hash (aHash) of a luma thumbnail.
+
+    The thumbnail is pooled into hash_size x hash_size blocks; each bit is set
+    when its block is brighter than the mean of all blocks.
+    """
+    if not thumbnail or len(thumbnail) < thumb_width * thumb_height:
+        return None
+    hash_size = min(hash_size, thumb_width, thumb_height)
+    blocks = []
+    for by in range(hash_size):
+        y0 = by * thumb_height // hash_size
+        y1 = (by + 1) * thumb_height // hash_size
+        for bx in range(hash_size):
+            x0 = bx * thumb_width // hash_size
+            x1 = (bx + 1) * thumb_width // hash_size
+            blocks.append(sum(sum(thumbnail[y * thumb_width + x0:y * thumb_width + x1])
+                              for y in range(y0, y1)) / ((y1 - y0) * (x1 - x0)))
+
+    mean = sum(blocks) / len(blocks)
+    value = 0
+    for block in blocks:
+        value = (value << 1) | (block > mean)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count('1')
+
+
+class FrameChangeDetector:
+    """Decides whether a frame differs enough from the last analysed one.
+
+    Args:
+        threshold: minimum mean absolute luma difference (0-255) that counts
+            as a change (VISION_CHANGE_THRESHOLD, default 6.0)
+        max_skip_seconds: force a refresh after this long without analysis,
+            even if nothing changed (VISION_CHANGE_MAX_SKIP, default 120s; 0 disables)
+    """
+
+    def __init__(self, threshold: Optional[float] = None, max_skip_seconds: Optional[float] = None):
+        if threshold is None:
+            threshold = float(os.getenv('VISION_CHANGE_THRESHOLD', '6.0'))
+        if max_skip_seconds is None:
+            max_skip_seconds = float(os.getenv('VISION_CHANGE_MAX_SKIP', '120'))
+        self.threshold = threshold
+        self.max_skip_seconds = max_skip_seconds
+
+        self._reference: Optional[bytes] = None
+        self._reference_time = 0.0
+
+        self.frames_checked = 0
+        self.frames_skipped = 0
+        self.frames_analysed = 0
+        self.last_difference = 0.0
+
+    def has_changed(self, thumbnail: Optional[bytes], now: Optional[float] = None) -> bool:
+        """True if the frame should be analysed; counts it as skipped otherwise."""
+        now = now or time.time()
+        self.frames_checked += 1
+
+        if thumbnail is None or self._reference is None:
+            return True
+        if self.max_skip_seconds > 0 and now - self._reference_time >= self.max_skip_seconds:
+            return True
+
+        self.last_difference = mean_absolute_difference(thumbnail, self._reference)
+        if self.last_difference >= self.threshold:
+            return True
+
+        self.frames_skipped += 1
+        return False
+
+    def mark_analysed(self, thumbnail: Optional[bytes], now: Optional[float] = None):
+        """Record the frame that was actually sent for analysis."""
+        self.frames_analysed += 1
+        if thumbnail is not None:
+            self._reference = thumbnail
+            self._reference_time = now or time.time()
+
+    def reset(self):
+        """Forget the reference frame (e.g. when the video track changes)."""
+        self._reference = None
+        self._reference_time = 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "framesChecked": self.frames_checked,
+            "framesSkipped": self.frames_skipped,
+            "framesAnalysed": self.frames_analysed,
+            "lastDifference": round(self.last_difference, 2),
+            "threshold": self.threshold,
+        }
@@ -0,0 +1,129 @@
+"""
+Gemini Vision Client Registry
+One long-lived vision client per worker process, shared by look_at_patient,
+streaming analysis and any other image tool.
+
+The model name is resolved once (GEMINI_VISION_MODEL > GEMINI_LLM_MODEL >
+gemini-2.5-flash) and the underlying client keeps its connection warm between
+calls, so no per-frame setup happens on the patient-visible path.
+
+Calls go through the native async google.genai API (client.aio), so a
+multi-second round trip never occupies a default-executor thread. Each call is
+bounded by VISION_TIMEOUT_SECONDS and is cancelled cleanly with its caller.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("mediai-avatar")
+
+DEFAULT_VISION_MODEL = 'gemini-2.5-flash'
+DEFAULT_VISION_TIMEOUT = 20.0
+
+
+def resolve_vision_model_name() -> str:
+    """Vision model from the environment (native-audio models can't do images)."""
+    model_name = os.getenv('GEMINI_VISION_MODEL') or os.getenv('GEMINI_LLM_MODEL') or DEFAULT_VISION_MODEL
+    if 'native-audio' in model_name:
+        model_name = DEFAULT_VISION_MODEL
+    return model_name
+
+
+def resolve_vision_timeout() -> float:
+    """Per-call timeout in seconds (VISION_TIMEOUT_SECONDS, default 20)."""
+    try:
+        return float(os.getenv('VISION_TIMEOUT_SECONDS', DEFAULT_VISION_TIMEOUT))
+    except ValueError:
+        return DEFAULT_VISION_TIMEOUT
+
+
+class VisionResult:
+    """Text returned by a vision call plus what it cost."""
+
+    def __init__(self, text: Optional[str], usage_metadata: Any = None, latency_ms: float = 0.0):
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self.latency_ms = latency_ms
+
+
+class VisionClient:
+    """Long-lived async Gemini Vision client for a single model."""
+
+    def __init__(self, model_name: str, timeout: Optional[float] = None):
+        from google import genai
+        from google.genai import types
+
+        self.model_name = model_name
+        self.timeout = timeout if timeout is not None else resolve_vision_timeout()
+        self._client = genai.Client(api_key=os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY'))
+        self._types = types
+        self._warm = False
+        self.calls = 0
+        self.timeouts = 0
+
+    async def analyze(self, prompt: str, jpeg_bytes: bytes) -> VisionResult:
+        """Send one JPEG + prompt to the model.
+
+        Errors (including asyncio.TimeoutError) are re-raised so callers'
+        circuit breakers can see them; cancelling the caller cancels the request.
+        """
+        start = time.perf_counter()
+        image_part = self._types.Part.from_bytes(data=jpeg_bytes, mime_type='image/jpeg')
+        try:
+            response = await asyncio.wait_for(
+                self._client.aio.models.generate_content(model=self.model_name,
+                                                         contents=[prompt, image_part]),
+                timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"[Vision] Vision call timed out after {self.timeout:.0f}s ({self.model_name})")
+            raise
+        self.calls += 1
+        self._warm = True
+        text = response.text if response and response.text else None
+        return VisionResult(text=text,
+                            usage_metadata=getattr(response, 'usage_metadata', None),
+                            latency_ms=(time.perf_counter() - start) * 1000)
+
+    async def warm_up(self):
+        """Open the connection ahead of the first patient-visible call."""
+        if self._warm:
+            return
+        try:
+            await asyncio.wait_for(self._client.aio.models.get(model=self.model_name),
+                                   timeout=self.timeout)
+            self._warm = True
+            logger.info(f"[Vision] 🔥 Vision client warmed up ({self.model_name})")
+        except Exception as e:
+            logger.warning(f"[Vision] Vision client warm-up failed: {e}")
+
+
+_clients: Dict[str, VisionClient] = {}
+_clients_lock = threading.Lock()
+_default_model: Optional[str] = None
+
+
+def _default_model_name() -> str:
+    global _default_model
+    if _default_model is None:
+        _default_model = resolve_vision_model_name()
+    return _default_model
+
+
+def get_vision_client(model_name: Optional[str] = None) -> VisionClient:
+    """Process-wide VisionClient for model_name (default: resolved from env once)."""
+    model_name = model_name or _default_model_name()
+    client = _clients.get(model_name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(model_name)
+            if client is None:
+                client = VisionClient(model_name)
+                _clients[model_name] = client
+                logger.info(f"[Vision] Vision client created for model {model_name}")
+    return client
+
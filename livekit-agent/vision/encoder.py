@@ -0,0 +1,201 @@
+"""
+Process-Pool Frame Encoder
+Optional backend that moves colour conversion, resizing and JPEG encoding out
+of the job process, so PIL work from several concurrent consultations on one
+host does not contend on the GIL with the LiveKit/Gemini event loop.
+
+Raw frame planes are copied once into a reusable shared-memory segment; the
+worker process attaches to it, runs encode_frame_to_jpeg and returns only the
+encoded bytes. Workers are started with the 'spawn' method (the job process
+runs native LiveKit threads, which must never be forked).
+
+Enabled with VISION_ENCODER=process (VISION_ENCODER_PROCESSES workers, default 2).
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional
+
+from .geometry import OutputGeometry
+from .yuv import get_backend, i420_to_rgb, nv12_to_rgb
+
+logger = logging.getLogger("mediai-avatar")
+
+# Packed formats decoded by PIL directly into RGB (BGRX swaps R and B)
+PACKED_RAW_MODES = {
+    'rgba': 'RGBX',
+    'rgb24': 'RGB',
+    'bgra': 'BGRX',
+}
+
+DEFAULT_JPEG_QUALITY = 85
+
+
+def encode_frame_to_jpeg(data,
+                         width: int,
+                         height: int,
+                         fmt: str,
+                         geometry: OutputGeometry,
+                         quality: int = DEFAULT_JPEG_QUALITY) -> Optional[bytes]:
+    """Raw frame -> JPEG bytes (conversion, crop/resize, optional upscale, encode).
+
+    Same pipeline as MediAIAgent._process_video_frame_sync, without the buffer
+    pool and memory accounting that only make sense inside the job process.
+    """
+    import io
+
+    from PIL import Image
+
+    if fmt in PACKED_RAW_MODES:
+        img = Image.frombuffer('RGB', (width, height), data, 'raw', PACKED_RAW_MODES[fmt], 0, 1)
+        if not geometry.is_identity(width, height):
+            img = img.resize(geometry.sample_size, Image.LANCZOS, box=geometry.crop)
+    elif fmt in ('i420', 'nv12'):
+        convert = i420_to_rgb if fmt == 'i420' else nv12_to_rgb
+        result = convert(data, width, height, backend=get_backend(), geometry=geometry)
+        if result is None:
+            return None
+        rgb_data, size = result
+        img = Image.frombuffer('RGB', size, rgb_data, 'raw', 'RGB', 0, 1)
+    else:
+        return None
+
+    if geometry.needs_upscale:
+        img = img.resize(geometry.output_size, Image.BILINEAR)
+
+    out = io.BytesIO()
+    img.save(out, format='JPEG', quality=quality)
+    return out.getvalue()
+
+
+def _encode_from_shared_memory(shm_name: str, nbytes: int, width: int, height: int, fmt: str,
+                               geometry: OutputGeometry, quality: int) -> Optional[bytes]:
+    """Worker-process entry point: attach to the parent's segment and encode."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf[:nbytes]
+        try:
+            return encode_frame_to_jpeg(view, width, height, fmt, geometry, quality)
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+def _worker_init():
+    # Segments belong to the parent; keep the worker's resource tracker from
+    # unlinking them when it exits (Python < 3.13 registers attached segments)
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.register = lambda *args, **kwargs: None
+        resource_tracker.unregister = lambda *args, **kwargs: None
+    except Exception:
+        pass
+
+
+def _worker_ping() -> int:
+    return os.getpid()
+
+
+class ProcessPoolEncoder:
+    """Encodes frames in worker processes via shared memory.
+
+    Args:
+        max_workers: worker processes (VISION_ENCODER_PROCESSES, default 2)
+        max_idle_segments: shared-memory segments kept for reuse between frames
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_idle_segments: int = 4):
+        if max_workers is None:
+            max_workers = int(os.getenv('VISION_ENCODER_PROCESSES', '2'))
+        self.max_workers = max(1, max_workers)
+        self.max_idle_segments = max_idle_segments
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_worker_init)
+        self._lock = threading.Lock()
+        self._idle: List[shared_memory.SharedMemory] = []
+        self._all: List[shared_memory.SharedMemory] = []
+        self.frames_encoded = 0
+
+    def _acquire_segment(self, nbytes: int) -> shared_memory.SharedMemory:
+        with self._lock:
+            for i, shm in enumerate(self._idle):
+                if shm.size >= nbytes:
+                    return self._idle.pop(i)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        with self._lock:
+            self._all.append(shm)
+        return shm
+
+    def _release_segment(self, shm: shared_memory.SharedMemory):
+        with self._lock:
+            if len(self._idle) < self.max_idle_segments:
+                self._idle.append(shm)
+                return
+            self._all.remove(shm)
+        shm.close()
+        shm.unlink()
+
+    def encode(self, data, width: int, height: int, fmt: str, geometry: OutputGeometry,
+               quality: int = DEFAULT_JPEG_QUALITY) -> Optional[bytes]:
+        """Blocking encode of one raw frame (call from a worker thread, not the event loop)."""
+        view = memoryview(data).cast('B')
+        nbytes = view.nbytes
+        shm = self._acquire_segment(nbytes)
+        try:
+            shm.buf[:nbytes] = view
+            future = self._pool.submit(_encode_from_shared_memory, shm.name, nbytes, width, height,
+                                       fmt, geometry, quality)
+            result = future.result()
+            self.frames_encoded += 1
+            return result
+        finally:
+            self._release_segment(shm)
+
+    def warm_up(self) -> int:
+        """Spawn every worker now (blocking) instead of on the first frames; returns the worker count."""
+        futures = [self._pool.submit(_worker_ping) for _ in range(self.max_workers)]
+        return len({future.result() for future in futures})
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            segments, self._all, self._idle = self._all, [], []
+        for shm in segments:
+            try:
+                shm.close()
+                shm.unlink()
+            except Exception:
+                pass
+
+
+_encoder: Optional[ProcessPoolEncoder] = None
+_encoder_lock = threading.Lock()
+
+
+def get_process_encoder() -> Optional[ProcessPoolEncoder]:
+    """Shared ProcessPoolEncoder when VISION_ENCODER=process, else None."""
+    global _encoder
+    if os.getenv('VISION_ENCODER', 'thread').lower() != 'process':
+        return None
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                _encoder = ProcessPoolEncoder()
+                logger.info(f"[Vision] Process-pool JPEG encoder started ({_encoder.max_workers} workers)")
+    return _encoder
+
+
+def shutdown_process_encoder():
+    """Stop the shared encoder's workers and free its shared memory (no-op if never started)."""
+    global _encoder
+    with _encoder_lock:
+        encoder, _encoder = _encoder, None
+    if encoder is not None:
+        encoder.shutdown()
+        logger.info("[Vision] Process-pool JPEG encoder stopped")
@@ -0,0 +1,209 @@
+"""
+Vision Executor
+Dedicated worker pool for frame processing with a bounded job queue, so vision
+load never competes with the default asyncio.to_thread executor used by the
+rest of the job (and therefore never delays realtime audio handling).
+
+Queue semantics:
+- at most max_workers jobs run at once; up to max_queue more wait
+- droppable jobs (streaming frames) sharing a key replace each other: only the
+  newest pending frame is kept and the superseded caller gets VisionJobDropped
+- non-droppable jobs (look_at_patient) sharing a key are coalesced: callers
+  await the single pending job instead of queueing duplicates
+- when the queue is full the oldest droppable job is evicted; if every pending
+  job is non-droppable the new job is rejected with VisionQueueFull
+"""
+
+import asyncio
+import collections
+import logging
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+
+logger = logging.getLogger("mediai-avatar")
+
+
+class VisionJobDropped(Exception):
+    """The job was superseded by a newer frame before it started."""
+
+
+class VisionQueueFull(Exception):
+    """The vision queue is full of jobs that cannot be dropped."""
+
+
+class _Job:
+    __slots__ = ('fn', 'args', 'future', 'key', 'droppable', 'enqueued_at', 'waiters')
+
+    def __init__(self, fn, args, future, key, droppable):
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.key = key
+        self.droppable = droppable
+        self.enqueued_at = time.perf_counter()
+        self.waiters = 1
+
+
+class VisionExecutor:
+    """Bounded, metered executor for the vision pipeline.
+
+    Args:
+        max_workers: concurrent jobs (VISION_WORKERS, default 2)
+        max_queue: pending jobs waiting for a worker (VISION_QUEUE_SIZE, default 4)
+        executor: pool that runs the jobs (default: a dedicated ThreadPoolExecutor)
+    """
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 max_queue: Optional[int] = None,
+                 executor: Optional[Executor] = None):
+        if max_workers is None:
+            max_workers = int(os.getenv('VISION_WORKERS', '2'))
+        if max_queue is None:
+            max_queue = int(os.getenv('VISION_QUEUE_SIZE', '4'))
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(1, max_queue)
+        self._executor = executor or ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='vision')
+        self._owns_executor = executor is None
+        self._pending: Deque[_Job] = collections.deque()
+        self._running = 0
+        self._closed = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.peak_queue_depth = 0
+        self.last_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._total_wait_ms = 0.0
+        self._started = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    async def submit(self,
+                     fn: Callable[..., Any],
+                     *args,
+                     key: Optional[Hashable] = None,
+                     droppable: bool = False) -> Any:
+        """Run fn(*args) on the vision pool and return its result.
+
+        Raises:
+            VisionJobDropped: a newer droppable job with the same key replaced this one
+            VisionQueueFull: no room in the queue and nothing droppable to evict
+        """
+        if self._closed:
+            raise RuntimeError("VisionExecutor is closed")
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+
+        if key is not None:
+            for job in self._pending:
+                if job.key != key or job.future.done():
+                    continue
+                if droppable and job.droppable:
+                    # Newest frame wins: replace the pending one in place
+                    job.future.set_exception(VisionJobDropped())
+                    job.future.exception()  # mark retrieved if nobody awaits it
+                    self.dropped += 1
+                    replacement = _Job(fn, args, loop.create_future(), key, droppable)
+                    self._pending[self._pending.index(job)] = replacement
+                    return await self._wait(replacement)
+                if not droppable and not job.droppable:
+                    self.coalesced += 1
+                    job.waiters += 1
+                    return await self._wait(job)
+
+        if len(self._pending) >= self.max_queue and not self._evict_oldest_droppable():
+            self.rejected += 1
+            logger.warning(f"[Vision] Vision queue full ({self.max_queue}), rejecting job")
+            raise VisionQueueFull()
+
+        job = _Job(fn, args, loop.create_future(), key, droppable)
+        self._pending.append(job)
+        self.peak_queue_depth = max(self.peak_queue_depth, len(self._pending))
+        return await self._wait(job)
+
+    async def _wait(self, job: _Job) -> Any:
+        self._dispatch()
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            # Last caller gave up: forget the job if it has not started yet
+            job.waiters -= 1
+            if job.waiters <= 0 and job in self._pending:
+                self._pending.remove(job)
+                job.future.cancel()
+            raise
+
+    def _evict_oldest_droppable(self) -> bool:
+        for job in self._pending:
+            if job.droppable:
+                self._pending.remove(job)
+                if not job.future.done():
+                    job.future.set_exception(VisionJobDropped())
+                    job.future.exception()
+                self.dropped += 1
+                return True
+        return False
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self._running < self.max_workers and self._pending:
+            job = self._pending.popleft()
+            if job.future.done():
+                continue
+
+            wait_ms = (time.perf_counter() - job.enqueued_at) * 1000
+            self.last_wait_ms = wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self._total_wait_ms += wait_ms
+            self._started += 1
+
+            self._running += 1
+            work = loop.run_in_executor(self._executor, job.fn, *job.args)
+            work.add_done_callback(lambda done, job=job: self._on_done(job, done))
+
+    def _on_done(self, job: _Job, done: asyncio.Future):
+        self._running -= 1
+        self.completed += 1
+        if not job.future.done():
+            if done.cancelled():
+                job.future.cancel()
+            elif done.exception() is not None:
+                job.future.set_exception(done.exception())
+            else:
+                job.future.set_result(done.result())
+        if not self._closed:
+            self._dispatch()
+
+    def shutdown(self):
+        """Drop pending jobs and stop the pool (running jobs finish in the background)."""
+        self._closed = True
+        while self._pending:
+            job = self._pending.popleft()
+            if not job.future.done():
+                job.future.cancel()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "queueDepth": len(self._pending),
+            "peakQueueDepth": self.peak_queue_depth,
+            "running": self._running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "lastWaitMs": round(self.last_wait_ms, 1),
+            "maxWaitMs": round(self.max_wait_ms, 1),
+            "avgWaitMs": round(self._total_wait_ms / self._started, 1) if self._started else 0.0,
+        }
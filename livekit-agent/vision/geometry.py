@@ -0,0 +1,162 @@
+"""
+Output Geometry for Vision Frames
+Decides the final analysis size of a frame up front, so colour conversion can
+sample directly at that size instead of converting and resizing in separate passes.
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+ASPECT_POLICIES = ('fit', 'fill', 'stretch')
+
+# Automatic sizing (no explicit target): natural size clamped to these bounds
+DEFAULT_MIN_SIZE = (320, 240)
+DEFAULT_MAX_SIZE = (1280, 960)
+
+
+class GeometryConfig:
+    """Output-size knobs for the vision pipeline.
+
+    target_width/target_height = 0 keeps the automatic behaviour: YUV frames
+    are sampled at 1/2 resolution, packed frames at full resolution, and the
+    result is clamped to [320x240, 1280x960] preserving aspect ratio.
+
+    With an explicit target, aspect_policy decides how the frame maps onto it:
+    - fit:     scale to fit inside the target box (aspect preserved)
+    - fill:    centre-crop to the target aspect, then scale to the target box
+    - stretch: scale to exactly the target box (aspect not preserved)
+    """
+
+    def __init__(self,
+                 target_width: int = 0,
+                 target_height: int = 0,
+                 aspect_policy: str = 'fit',
+                 min_size: Tuple[int, int] = DEFAULT_MIN_SIZE,
+                 max_size: Tuple[int, int] = DEFAULT_MAX_SIZE):
+        if aspect_policy not in ASPECT_POLICIES:
+            raise ValueError(f"aspect_policy must be one of {ASPECT_POLICIES}, got '{aspect_policy}'")
+        self.target_width = max(0, int(target_width))
+        self.target_height = max(0, int(target_height))
+        self.aspect_policy = aspect_policy
+        self.min_size = min_size
+        self.max_size = max_size
+
+    @property
+    def has_target(self) -> bool:
+        return self.target_width > 0 and self.target_height > 0
+
+    @classmethod
+    def from_env(cls) -> 'GeometryConfig':
+        """Build from VISION_TARGET_WIDTH / VISION_TARGET_HEIGHT / VISION_ASPECT_POLICY."""
+        policy = os.getenv('VISION_ASPECT_POLICY', 'fit').lower()
+        if policy not in ASPECT_POLICIES:
+            policy = 'fit'
+        return cls(target_width=int(os.getenv('VISION_TARGET_WIDTH', '0') or 0),
+                   target_height=int(os.getenv('VISION_TARGET_HEIGHT', '0') or 0),
+                   aspect_policy=policy)
+
+
+class OutputGeometry:
+    """Where to sample a frame and at what size.
+
+    crop:        (left, top, right, bottom) region of the source frame
+    sample_size: size produced by the single conversion/resize pass
+    output_size: final size; only differs from sample_size when the target is
+                 larger than the source region (upscaling is left to PIL)
+    """
+
+    def __init__(self, crop: Tuple[int, int, int, int], sample_size: Tuple[int, int],
+                 output_size: Tuple[int, int]):
+        self.crop = crop
+        self.sample_size = sample_size
+        self.output_size = output_size
+
+    @property
+    def needs_upscale(self) -> bool:
+        return self.output_size != self.sample_size
+
+    def is_identity(self, width: int, height: int) -> bool:
+        """True when the frame can be used as-is (no crop, no resize)."""
+        return self.crop == (0, 0, width, height) and self.sample_size == (width, height)
+
+    def sample_grid(self) -> Tuple[List[int], List[int]]:
+        """Source column/row indices for nearest-neighbour sampling."""
+        left, top, right, bottom = self.crop
+        crop_w, crop_h = right - left, bottom - top
+        out_w, out_h = self.sample_size
+        src_xs = [left + (x * crop_w) // out_w for x in range(out_w)]
+        src_ys = [top + (y * crop_h) // out_h for y in range(out_h)]
+        return src_xs, src_ys
+
+    def scaled(self, factor: float) -> 'OutputGeometry':
+        """Same crop, sample and output sizes reduced by factor (budget downscaling)."""
+        return OutputGeometry(crop=self.crop,
+                              sample_size=_scaled(*self.sample_size, factor),
+                              output_size=_scaled(*self.output_size, factor))
+
+    def __repr__(self):
+        return f"OutputGeometry(crop={self.crop}, sample={self.sample_size}, output={self.output_size})"
+
+
+def _scaled(width: int, height: int, scale: float) -> Tuple[int, int]:
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def compute_output_geometry(width: int,
+                            height: int,
+                            config: Optional[GeometryConfig] = None,
+                            natural_downsample: int = 1,
+                            crop: Optional[Tuple[int, int, int, int]] = None) -> OutputGeometry:
+    """Resolve the crop region and output size for a width x height frame.
+
+    Args:
+        width, height: source frame size
+        config: sizing knobs (defaults to automatic sizing)
+        natural_downsample: automatic-mode reduction applied before clamping
+            (2 for YUV frames, matching the historical 1/2 resolution sampling)
+        crop: optional region of interest in source coordinates
+    """
+    config = config or GeometryConfig()
+    left, top, right, bottom = crop or (0, 0, width, height)
+    left, top = max(0, left), max(0, top)
+    right, bottom = min(width, right), min(height, bottom)
+    if right <= left or bottom <= top:
+        left, top, right, bottom = 0, 0, width, height
+    region_w, region_h = right - left, bottom - top
+
+    if not config.has_target:
+        out_w = max(1, region_w // natural_downsample)
+        out_h = max(1, region_h // natural_downsample)
+        min_w, min_h = config.min_size
+        max_w, max_h = config.max_size
+        if out_w < min_w or out_h < min_h:
+            out_w, out_h = _scaled(out_w, out_h, max(min_w / out_w, min_h / out_h))
+        elif out_w > max_w or out_h > max_h:
+            out_w, out_h = _scaled(out_w, out_h, min(max_w / out_w, max_h / out_h))
+    elif config.aspect_policy == 'fit':
+        out_w, out_h = _scaled(region_w, region_h,
+                               min(config.target_width / region_w, config.target_height / region_h))
+    else:
+        out_w, out_h = config.target_width, config.target_height
+        if config.aspect_policy == 'fill':
+            # Centre-crop the region to the target aspect ratio
+            target_aspect = out_w / out_h
+            if region_w / region_h > target_aspect:
+                new_w = max(1, int(round(region_h * target_aspect)))
+                left += (region_w - new_w) // 2
+                region_w = new_w
+            else:
+                new_h = max(1, int(round(region_w / target_aspect)))
+                top += (region_h - new_h) // 2
+                region_h = new_h
+            right, bottom = left + region_w, top + region_h
+
+    # Never sample above source resolution - upscaling is a cheap PIL pass afterwards
+    sample_w, sample_h = min(out_w, region_w), min(out_h, region_h)
+    if (sample_w, sample_h) != (out_w, out_h):
+        scale = min(region_w / out_w, region_h / out_h, 1.0)
+        sample_w, sample_h = _scaled(out_w, out_h, scale)
+
+    return OutputGeometry(crop=(left, top, right, bottom),
+                          sample_size=(sample_w, sample_h),
+                          output_size=(out_w, out_h))
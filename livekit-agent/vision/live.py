@@ -0,0 +1,159 @@
+"""
+Live Video Mode
+Third vision mode next to ON-DEMAND and STREAMING: downscaled, low-rate frames
+go straight into the Gemini Live session's video input (push_video), so the
+conversation model sees the patient itself instead of reading text produced
+by a second generate_content call.
+
+VISION_MODE selects the mode: 'on_demand', 'streaming' or 'live'. When unset,
+ENABLE_VISION_STREAMING=true keeps meaning 'streaming'.
+
+VisionModeStats puts both approaches side by side in the session metrics:
+per-observation latency and tokens of the separate analysis call vs per-frame
+preparation time and estimated tokens of live frames, each priced at its own
+Gemini rate: analysis calls are image/text input and text output, live frames
+are realtime audio/video input.
+"""
+
+import os
+from typing import Dict, Optional, Tuple
+
+VISION_MODES = ('on_demand', 'streaming', 'live')
+
+# Gemini Live tokens per video frame by media resolution
+LIVE_TOKENS_PER_FRAME = {
+    'low': 66,
+    'medium': 258,
+    'high': 258,
+}
+
+# USD per 1M tokens (Gemini 2.5 Flash Native Audio, same table as MetricsCollector)
+ANALYSIS_INPUT_USD_PER_M = 0.50   # image + prompt of a generate_content call
+ANALYSIS_OUTPUT_USD_PER_M = 2.00  # text observation
+LIVE_VIDEO_INPUT_USD_PER_M = 3.00  # frames pushed into the Live session (audio/video input)
+
+
+def resolve_vision_mode() -> str:
+    """VISION_MODE, falling back to ENABLE_VISION_STREAMING for older configs."""
+    mode = os.getenv('VISION_MODE', '').lower().replace('-', '_')
+    if mode in VISION_MODES:
+        return mode
+    if os.getenv('ENABLE_VISION_STREAMING', 'false').lower() == 'true':
+        return 'streaming'
+    return 'on_demand'
+
+
+class LiveVideoConfig:
+    """Frame rate and encoding of frames pushed into the realtime session.
+
+    Args:
+        frame_interval: seconds between pushed frames (VISION_LIVE_FRAME_INTERVAL, default 2)
+        max_size: largest frame pushed (VISION_LIVE_MAX_WIDTH x VISION_LIVE_MAX_HEIGHT, default 640x480)
+        jpeg_quality: JPEG quality used by the realtime plugin (VISION_LIVE_JPEG_QUALITY, default 70)
+        media_resolution: Gemini Live media resolution, 'low', 'medium' or 'high'
+            (VISION_LIVE_MEDIA_RESOLUTION, default 'low')
+    """
+
+    def __init__(self,
+                 frame_interval: Optional[float] = None,
+                 max_size: Optional[Tuple[int, int]] = None,
+                 jpeg_quality: Optional[int] = None,
+                 media_resolution: Optional[str] = None):
+        if frame_interval is None:
+            frame_interval = float(os.getenv('VISION_LIVE_FRAME_INTERVAL', '2.0'))
+        if max_size is None:
+            max_size = (int(os.getenv('VISION_LIVE_MAX_WIDTH', '640')),
+                        int(os.getenv('VISION_LIVE_MAX_HEIGHT', '480')))
+        if jpeg_quality is None:
+            jpeg_quality = int(os.getenv('VISION_LIVE_JPEG_QUALITY', '70'))
+        if media_resolution is None:
+            media_resolution = os.getenv('VISION_LIVE_MEDIA_RESOLUTION', 'low').lower()
+        if media_resolution not in LIVE_TOKENS_PER_FRAME:
+            media_resolution = 'low'
+        self.frame_interval = max(0.5, frame_interval)
+        self.max_size = max_size
+        self.jpeg_quality = jpeg_quality
+        self.media_resolution = media_resolution
+
+    @property
+    def tokens_per_frame(self) -> int:
+        return LIVE_TOKENS_PER_FRAME[self.media_resolution]
+
+    def encode_options(self):
+        """images.EncodeOptions for the RealtimeModel (frames are already at max_size, so no upscale)."""
+        from livekit.agents.utils import images
+
+        width, height = self.max_size
+        return images.EncodeOptions(
+            format="JPEG",
+            quality=self.jpeg_quality,
+            resize_options=images.ResizeOptions(width=width, height=height, strategy="scale_aspect_fit"),
+        )
+
+    def media_resolution_option(self):
+        """google.genai MediaResolution enum value for the RealtimeModel."""
+        from google.genai import types
+
+        return {
+            'low': types.MediaResolution.MEDIA_RESOLUTION_LOW,
+            'medium': types.MediaResolution.MEDIA_RESOLUTION_MEDIUM,
+            'high': types.MediaResolution.MEDIA_RESOLUTION_HIGH,
+        }[self.media_resolution]
+
+
+class VisionModeStats:
+    """Latency/cost of separate-analysis observations vs live frames."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.analysis_calls = 0
+        self.analysis_latency_ms = 0.0
+        self.analysis_input_tokens = 0
+        self.analysis_output_tokens = 0
+        self.live_frames = 0
+        self.live_prepare_ms = 0.0
+        self.live_estimated_tokens = 0
+
+    def record_analysis(self, latency_ms: float, input_tokens: int, output_tokens: int):
+        self.analysis_calls += 1
+        self.analysis_latency_ms += latency_ms
+        self.analysis_input_tokens += input_tokens
+        self.analysis_output_tokens += output_tokens
+
+    def record_live_frame(self, prepare_ms: float, estimated_tokens: int):
+        self.live_frames += 1
+        self.live_prepare_ms += prepare_ms
+        self.live_estimated_tokens += estimated_tokens
+
+    @property
+    def analysis_cost_usd(self) -> float:
+        return (self.analysis_input_tokens * ANALYSIS_INPUT_USD_PER_M
+                + self.analysis_output_tokens * ANALYSIS_OUTPUT_USD_PER_M) / 1_000_000
+
+    @property
+    def live_cost_usd(self) -> float:
+        return self.live_estimated_tokens * LIVE_VIDEO_INPUT_USD_PER_M / 1_000_000
+
+    def snapshot(self) -> Dict[str, object]:
+        calls, frames = self.analysis_calls, self.live_frames
+        return {
+            "mode": self.mode,
+            "analysis": {
+                "calls": calls,
+                "avgLatencyMs": round(self.analysis_latency_ms / calls, 1) if calls else None,
+                "inputTokens": self.analysis_input_tokens,
+                "outputTokens": self.analysis_output_tokens,
+                "avgTokensPerObservation": round(
+                    (self.analysis_input_tokens + self.analysis_output_tokens) / calls) if calls else None,
+                "costUsd": round(self.analysis_cost_usd, 6),
+                "avgCostPerObservationUsd": round(self.analysis_cost_usd / calls, 6) if calls else None,
+            },
+            "live": {
+                "frames": frames,
+                "avgPrepareMs": round(self.live_prepare_ms / frames, 1) if frames else None,
+                "estimatedTokens": self.live_estimated_tokens,
+                "avgTokensPerFrame": round(self.live_estimated_tokens / frames) if frames else None,
+                "costUsd": round(self.live_cost_usd, 6),
+                "avgCostPerFrameUsd": round(self.live_cost_usd / frames, 6) if frames else None,
+            },
+        }
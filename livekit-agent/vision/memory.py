@@ -0,0 +1,172 @@
+"""
+Vision Memory Accounting
+Counts buffer allocations made while processing frames and samples process RSS,
+so peak memory per vision call can be compared against job_memory_limit_mb.
+
+Also holds the opt-in garbage collection policy that replaces the old
+per-frame gc.collect() calls (full collections cause audio jitter).
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, Optional
+
+logger = logging.getLogger("mediai-avatar")
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:  # Windows
+    resource = None
+    RESOURCE_AVAILABLE = False
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_bytes() -> int:
+    """Current resident set size of this process (0 if unknown)."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if RESOURCE_AVAILABLE:
+        # ru_maxrss is the lifetime peak (KB on Linux) - best available fallback
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return 0
+
+
+class FrameMemoryStats:
+    """Allocation counter for the vision frame pipeline.
+
+    Each processed frame is bracketed by begin_frame()/end_frame(); every buffer
+    the pipeline allocates is reported via record_allocation(). Python-level
+    allocation peaks per frame are additionally traced with tracemalloc when
+    VISION_TRACE_ALLOCATIONS=true.
+    """
+
+    def __init__(self, trace_allocations: Optional[bool] = None):
+        if trace_allocations is None:
+            trace_allocations = os.getenv('VISION_TRACE_ALLOCATIONS', 'false').lower() == 'true'
+        self.trace_allocations = trace_allocations
+        self._lock = threading.Lock()
+
+        self.frames = 0
+        self.total_bytes_allocated = 0
+        self.last_frame_bytes_allocated = 0
+        self.peak_frame_bytes_allocated = 0
+        self.last_frame_rss_growth = 0
+        self.peak_rss_bytes = 0
+        self.last_traced_peak_bytes = 0
+        self.peak_traced_bytes = 0
+        self.last_frame_ms = 0.0
+
+        self._frame_bytes = 0
+        self._frame_start = 0.0
+        self._rss_before = 0
+
+    def begin_frame(self):
+        """Start accounting for a new frame."""
+        with self._lock:
+            self._frame_bytes = 0
+        self._frame_start = time.perf_counter()
+        self._rss_before = current_rss_bytes()
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+    def record_allocation(self, nbytes: int):
+        """Report a buffer allocated by the pipeline for the current frame."""
+        with self._lock:
+            self._frame_bytes += nbytes
+            self.total_bytes_allocated += nbytes
+
+    def end_frame(self):
+        """Finish accounting for the current frame and update peaks."""
+        rss_after = current_rss_bytes()
+        traced_peak = 0
+        if self.trace_allocations and tracemalloc.is_tracing():
+            _, traced_peak = tracemalloc.get_traced_memory()
+
+        with self._lock:
+            self.frames += 1
+            self.last_frame_bytes_allocated = self._frame_bytes
+            self.peak_frame_bytes_allocated = max(self.peak_frame_bytes_allocated, self._frame_bytes)
+            self.last_frame_rss_growth = max(0, rss_after - self._rss_before)
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss_after, self._rss_before)
+            self.last_traced_peak_bytes = traced_peak
+            self.peak_traced_bytes = max(self.peak_traced_bytes, traced_peak)
+            self.last_frame_ms = (time.perf_counter() - self._frame_start) * 1000
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counters as a plain dict (for logs and metrics metadata)."""
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "totalBytesAllocated": self.total_bytes_allocated,
+                "lastFrameBytesAllocated": self.last_frame_bytes_allocated,
+                "peakFrameBytesAllocated": self.peak_frame_bytes_allocated,
+                "lastFrameRssGrowthBytes": self.last_frame_rss_growth,
+                "peakRssBytes": self.peak_rss_bytes,
+                "lastTracedPeakBytes": self.last_traced_peak_bytes,
+                "peakTracedBytes": self.peak_traced_bytes,
+                "lastFrameMs": round(self.last_frame_ms, 1),
+            }
+
+
+class GCPolicy:
+    """Opt-in garbage collection for the vision pipeline.
+
+    Modes (VISION_GC_POLICY):
+        off       never collect from the pipeline (default)
+        periodic  collect at most once every VISION_GC_INTERVAL seconds (default 60)
+        threshold collect when RSS exceeds VISION_GC_RSS_THRESHOLD_MB (default 1500),
+                  at most once every VISION_GC_INTERVAL seconds
+    """
+
+    MODES = ('off', 'periodic', 'threshold')
+
+    def __init__(self,
+                 mode: Optional[str] = None,
+                 interval_seconds: Optional[float] = None,
+                 rss_threshold_bytes: Optional[int] = None):
+        if mode is None:
+            mode = os.getenv('VISION_GC_POLICY', 'off')
+        mode = mode.lower()
+        if mode not in self.MODES:
+            logger.warning(f"[Vision] Unknown VISION_GC_POLICY '{mode}', using 'off'")
+            mode = 'off'
+        if interval_seconds is None:
+            interval_seconds = float(os.getenv('VISION_GC_INTERVAL', '60'))
+        if rss_threshold_bytes is None:
+            rss_threshold_bytes = int(float(os.getenv('VISION_GC_RSS_THRESHOLD_MB', '1500')) * 1024 * 1024)
+        self.mode = mode
+        self.interval_seconds = interval_seconds
+        self.rss_threshold_bytes = rss_threshold_bytes
+
+        self._last_collect = time.monotonic()
+        self.collections = 0
+        self.last_collect_ms = 0.0
+
+    def maybe_collect(self) -> bool:
+        """Run gc.collect() if the policy says so; True if a collection ran."""
+        if self.mode == 'off':
+            return False
+        now = time.monotonic()
+        if now - self._last_collect < self.interval_seconds:
+            return False
+        if self.mode == 'threshold' and current_rss_bytes() < self.rss_threshold_bytes:
+            return False
+
+        start = time.perf_counter()
+        gc.collect()
+        self._last_collect = time.monotonic()
+        self.collections += 1
+        self.last_collect_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f"[Vision] GC policy '{self.mode}' collected in {self.last_collect_ms:.1f} ms")
+        return True
@@ -0,0 +1,126 @@
+"""
+Vision Observation Cache
+In-session LRU/TTL cache of Gemini Vision observations for look_at_patient.
+
+Entries are keyed by the observation focus, the normalized patient question
+and a perceptual hash of the frame. A lookup hits when focus and question match
+and the new frame's hash is within VISION_CACHE_MAX_DISTANCE bits of a cached
+one, i.e. the patient is holding still and asking the same thing again - the
+frame is then neither encoded nor sent to Gemini.
+"""
+
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .change_detection import hamming_distance
+
+CacheKey = Tuple[str, str, int]
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, strip accents/punctuation and collapse whitespace."""
+    if not question:
+        return ""
+    text = unicodedata.normalize('NFKD', question.lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+class ObservationCache:
+    """Maps (focus, question, frame hash) to the observation Gemini returned.
+
+    Args:
+        max_entries: LRU capacity (VISION_CACHE_SIZE, default 32; 0 disables)
+        ttl_seconds: entry lifetime (VISION_CACHE_TTL, default 60s)
+        max_distance: max Hamming distance between 64-bit frame hashes that
+            still counts as the same image (VISION_CACHE_MAX_DISTANCE, default 3)
+    """
+
+    def __init__(self,
+                 max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None,
+                 max_distance: Optional[int] = None):
+        if max_entries is None:
+            max_entries = int(os.getenv('VISION_CACHE_SIZE', '32'))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('VISION_CACHE_TTL', '60'))
+        if max_distance is None:
+            max_distance = int(os.getenv('VISION_CACHE_MAX_DISTANCE', '3'))
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+
+        self._entries: 'OrderedDict[CacheKey, Tuple[str, float]]' = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def _evict_expired(self, now: float):
+        expired = [key for key, (_, stored_at) in self._entries.items()
+                   if now - stored_at > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+
+    def get(self, frame_hash: Optional[int], focus: str, question: str,
+            now: Optional[float] = None) -> Optional[str]:
+        """Cached observation for an effectively unchanged frame, or None (counted as miss)."""
+        if not self.enabled or frame_hash is None:
+            return None
+
+        now = now or time.time()
+        self._evict_expired(now)
+        focus = (focus or "geral").lower()
+        question = normalize_question(question)
+
+        best_key = None
+        best_distance = self.max_distance + 1
+        for key in self._entries:
+            if key[0] != focus or key[1] != question:
+                continue
+            distance = hamming_distance(key[2], frame_hash)
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+
+        if best_key is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(best_key)
+        self.hits += 1
+        return self._entries[best_key][0]
+
+    def put(self, frame_hash: Optional[int], focus: str, question: str, observation: str,
+            now: Optional[float] = None):
+        """Store an observation; the least recently used entry is evicted when full."""
+        if not self.enabled or frame_hash is None or not observation:
+            return
+
+        key = ((focus or "geral").lower(), normalize_question(question), frame_hash)
+        self._entries[key] = (observation, now or time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,92 @@
+"""
+Observation Push for Streaming Vision
+Decides which streaming observations are worth injecting into the realtime
+session's chat context, so the model already has current visual context when
+the patient speaks instead of spending a get_visual_observation round-trip.
+
+An observation is pushed only when it says something new (word-set similarity
+with the last pushed one below VISION_PUSH_SIMILARITY) and at least
+VISION_PUSH_MIN_INTERVAL seconds after the previous push. Gemini Live cannot
+remove chat items, so every push stays in the context: the rate limit is also
+what bounds context growth.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+from .observation_cache import normalize_question
+
+MESSAGE_PREFIX = "[Observação visual automática]"
+
+
+def observation_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the normalized word sets (0 = disjoint, 1 = same words)."""
+    words_a = set(normalize_question(a).split())
+    words_b = set(normalize_question(b).split())
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+class ObservationPublisher:
+    """Deduplicating, rate-limited gate for pushed observations.
+
+    Args:
+        enabled: push observations at all (VISION_PUSH_OBSERVATIONS, default true)
+        min_interval: seconds between pushes (VISION_PUSH_MIN_INTERVAL, default 30)
+        similarity_threshold: observations at least this similar to the last
+            pushed one are dropped (VISION_PUSH_SIMILARITY, default 0.6)
+    """
+
+    def __init__(self,
+                 enabled: Optional[bool] = None,
+                 min_interval: Optional[float] = None,
+                 similarity_threshold: Optional[float] = None):
+        if enabled is None:
+            enabled = os.getenv('VISION_PUSH_OBSERVATIONS', 'true').lower() == 'true'
+        if min_interval is None:
+            min_interval = float(os.getenv('VISION_PUSH_MIN_INTERVAL', '30'))
+        if similarity_threshold is None:
+            similarity_threshold = float(os.getenv('VISION_PUSH_SIMILARITY', '0.6'))
+        self.enabled = enabled
+        self.min_interval = min_interval
+        self.similarity_threshold = similarity_threshold
+
+        self._last_text: Optional[str] = None
+        self._last_push_time = 0.0
+
+        self.pushed = 0
+        self.skipped_duplicate = 0
+        self.skipped_rate_limited = 0
+
+    def should_push(self, observation: str, now: Optional[float] = None) -> bool:
+        """True when observation is new enough and the rate limit allows a push."""
+        if not self.enabled or not observation:
+            return False
+        now = time.monotonic() if now is None else now
+        if self._last_text is not None:
+            if observation_similarity(observation, self._last_text) >= self.similarity_threshold:
+                self.skipped_duplicate += 1
+                return False
+            if now - self._last_push_time < self.min_interval:
+                self.skipped_rate_limited += 1
+                return False
+        return True
+
+    def mark_pushed(self, observation: str, now: Optional[float] = None):
+        self._last_text = observation
+        self._last_push_time = time.monotonic() if now is None else now
+        self.pushed += 1
+
+    @staticmethod
+    def format_message(observation: str) -> str:
+        return f"{MESSAGE_PREFIX} {observation.strip()}"
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "pushed": self.pushed,
+            "skippedDuplicate": self.skipped_duplicate,
+            "skippedRateLimited": self.skipped_rate_limited,
+        }
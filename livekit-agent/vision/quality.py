@@ -0,0 +1,192 @@
+"""
+Adaptive Image Quality for Gemini Vision
+Picks the analysis resolution and JPEG quality per observation_focus and keeps
+each uploaded image inside a byte and token budget.
+
+- Detail foci (mancha, ferimento, hematoma, pele, ...) get full-resolution
+  sampling, up to 1280x960, at high JPEG quality.
+- Face foci (face, rosto, ...) get up to 960x720.
+- Everything else (geral, postura, ...) gets up to 640x480 at a lower quality.
+
+Resolution is capped so the estimated Gemini image tokens stay within
+VISION_TOKEN_BUDGET. Quality then steps down (and, as a last resort, the image
+shrinks) until the JPEG fits VISION_BYTE_BUDGET. The starting quality per
+profile adapts to what recent frames actually needed.
+"""
+
+import math
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from .geometry import GeometryConfig
+from .observation_cache import normalize_question
+
+# Gemini: images with both sides <= 384 px cost 258 tokens; larger images are
+# tiled into 768x768 crops of 258 tokens each
+TOKENS_PER_TILE = 258
+SMALL_IMAGE_SIDE = 384
+TILE_SIDE = 768
+
+QUALITY_STEP = 10
+MAX_DOWNSCALE_STEPS = 3
+DOWNSCALE_FACTOR = 0.8
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Approximate Gemini input tokens for a width x height image."""
+    if width <= SMALL_IMAGE_SIDE and height <= SMALL_IMAGE_SIDE:
+        return TOKENS_PER_TILE
+    return math.ceil(width / TILE_SIDE) * math.ceil(height / TILE_SIDE) * TOKENS_PER_TILE
+
+
+class EncodingProfile:
+    """Resolution/quality settings for a family of observation foci.
+
+    natural_downsample overrides the format default (2 for YUV) when set, so
+    detail profiles can sample at full source resolution.
+    """
+
+    def __init__(self, name: str, max_size: Tuple[int, int], quality: int, min_quality: int,
+                 natural_downsample: Optional[int] = None):
+        self.name = name
+        self.max_size = max_size
+        self.quality = quality
+        self.min_quality = min_quality
+        self.natural_downsample = natural_downsample
+
+    def __repr__(self):
+        return f"EncodingProfile({self.name}, max={self.max_size}, q={self.quality})"
+
+
+DETAIL_PROFILE = EncodingProfile('detail', (1280, 960), quality=90, min_quality=60, natural_downsample=1)
+FACE_PROFILE = EncodingProfile('face', (960, 720), quality=85, min_quality=55)
+OVERVIEW_PROFILE = EncodingProfile('overview', (640, 480), quality=70, min_quality=45)
+
+# Matched against the normalized focus (lowercase, no accents), substring match
+DETAIL_KEYWORDS = ('mancha', 'ferid', 'ferimento', 'hematoma', 'lesao', 'pele', 'machucad',
+                   'corte', 'queimad', 'olho', 'boca', 'garganta', 'lingua', 'unha', 'pinta',
+                   'verruga', 'erupcao', 'alergia', 'inchac', 'cicatriz', 'dente')
+FACE_KEYWORDS = ('face', 'rosto', 'cabeca', 'expressao')
+
+
+def profile_for_focus(observation_focus: str) -> EncodingProfile:
+    focus = normalize_question(observation_focus or '')
+    if any(keyword in focus for keyword in DETAIL_KEYWORDS):
+        return DETAIL_PROFILE
+    if any(keyword in focus for keyword in FACE_KEYWORDS):
+        return FACE_PROFILE
+    return OVERVIEW_PROFILE
+
+
+class EncodedImage:
+    """JPEG bytes plus what was actually sent (for cost/detail reporting)."""
+
+    def __init__(self, data: bytes, width: int, height: int, quality: int, profile: str):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.profile = profile
+        self.estimated_tokens = estimate_image_tokens(width, height)
+
+    def __len__(self):
+        return len(self.data)
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "bytes": len(self.data),
+            "width": self.width,
+            "height": self.height,
+            "quality": self.quality,
+            "profile": self.profile,
+            "estimatedTokens": self.estimated_tokens,
+        }
+
+
+class AdaptiveJpegEncoder:
+    """Per-focus geometry and JPEG quality within a byte/token budget.
+
+    Args:
+        byte_budget: max JPEG size in bytes (VISION_BYTE_BUDGET, default 250000)
+        token_budget: max estimated image tokens (VISION_TOKEN_BUDGET, default 1032 = 4 tiles)
+    """
+
+    def __init__(self, byte_budget: Optional[int] = None, token_budget: Optional[int] = None):
+        if byte_budget is None:
+            byte_budget = int(os.getenv('VISION_BYTE_BUDGET', '250000'))
+        if token_budget is None:
+            token_budget = int(os.getenv('VISION_TOKEN_BUDGET', str(4 * TOKENS_PER_TILE)))
+        self.byte_budget = byte_budget
+        self.token_budget = max(TOKENS_PER_TILE, token_budget)
+        self._lock = threading.Lock()
+        self._start_quality: Dict[str, int] = {}
+
+    def geometry_config(self, profile: EncodingProfile, base: GeometryConfig) -> GeometryConfig:
+        """Sizing for this profile; an explicit VISION_TARGET_* size always wins."""
+        if base.has_target:
+            return base
+        max_w, max_h = profile.max_size
+        while estimate_image_tokens(max_w, max_h) > self.token_budget and max_w > SMALL_IMAGE_SIDE:
+            max_w, max_h = int(max_w * DOWNSCALE_FACTOR), int(max_h * DOWNSCALE_FACTOR)
+        min_w, min_h = base.min_size
+        return GeometryConfig(aspect_policy=base.aspect_policy,
+                              min_size=(min(min_w, max_w), min(min_h, max_h)),
+                              max_size=(max_w, max_h))
+
+    def start_quality(self, profile: EncodingProfile) -> int:
+        with self._lock:
+            return self._start_quality.get(profile.name, profile.quality)
+
+    def record(self, profile: EncodingProfile, quality: int, nbytes: int):
+        """Adapt the next starting quality to how this frame fitted the budget."""
+        with self._lock:
+            if nbytes > self.byte_budget:
+                quality = max(profile.min_quality, quality - QUALITY_STEP)
+            elif nbytes < self.byte_budget // 2:
+                quality = min(profile.quality, quality + QUALITY_STEP // 2)
+            self._start_quality[profile.name] = quality
+
+    def fit_budget(self, profile: EncodingProfile,
+                   encode_at: Callable[[int, float], int]) -> Tuple[int, float, int]:
+        """Budget loop shared by the thread and process encoders.
+
+        encode_at(quality, scale) encodes the frame at scale x its size and
+        returns the JPEG size in bytes. Quality steps down first, then the image
+        shrinks. Returns (quality, scale, nbytes) of the last attempt.
+        """
+        quality = self.start_quality(profile)
+        scale = 1.0
+        downscales = 0
+        while True:
+            nbytes = encode_at(quality, scale)
+            if nbytes <= self.byte_budget:
+                break
+            if quality - QUALITY_STEP >= profile.min_quality:
+                quality -= QUALITY_STEP
+            elif downscales < MAX_DOWNSCALE_STEPS:
+                downscales += 1
+                scale *= DOWNSCALE_FACTOR
+            else:
+                break
+
+        self.record(profile, quality, nbytes)
+        return quality, scale, nbytes
+
+    def encode(self, img, profile: EncodingProfile, writer) -> EncodedImage:
+        """Encode a PIL image into writer (BufferWriter-like, with reset()/getvalue())."""
+        from PIL import Image
+
+        sized = {1.0: img}
+
+        def encode_at(quality: int, scale: float) -> int:
+            if scale not in sized:
+                sized[scale] = img.resize((max(1, int(img.width * scale)),
+                                           max(1, int(img.height * scale))), Image.BILINEAR)
+            writer.reset()
+            sized[scale].save(writer, format='JPEG', quality=quality)
+            return writer.tell()
+
+        quality, scale, _ = self.fit_budget(profile, encode_at)
+        encoded = sized[scale]
+        return EncodedImage(writer.getvalue(), encoded.width, encoded.height, quality, profile.name)
@@ -0,0 +1,247 @@
+"""
+Region of Interest for Focused Observations
+Cheap skin-region heuristic that crops face/lesion observations to where the
+patient actually is, so the uploaded image spends its pixels (and Gemini
+tokens) on the relevant area instead of the room.
+
+The frame is sampled on a coarse grid straight from the raw buffer (chroma
+planes for YUV, BT.601 Cb/Cr for packed RGB). Cells whose chroma falls in the
+classic skin range (Cb 77-127, Cr 133-173) are grouped into 4-connected
+regions and the largest one becomes the crop, padded by a margin. For face
+foci the region is trimmed to a face-shaped box from its top (skin connected
+to the neck/arms would otherwise pull the crop down).
+
+No region (too small, or covering most of the frame) means no crop: the
+whole frame is uploaded exactly as before.
+
+Opt-in (VISION_ROI=on): the heuristic can miss findings outside the largest
+skin region (a lesion on the neck or arm, a rash next to the face) or pick
+the wrong region under unusual lighting or skin tones.
+"""
+
+import collections
+import os
+from typing import Dict, List, Optional, Tuple
+
+GRID_WIDTH = 64
+GRID_HEIGHT = 48
+
+# Chai & Ngan YCbCr skin range, plus a luma floor to ignore dark noise
+CB_RANGE = (77, 127)
+CR_RANGE = (133, 173)
+MIN_LUMA = 40
+
+# Face box: height relative to width, measured from the top of the region
+FACE_ASPECT = 1.35
+
+# Packed formats: byte offsets of R, G, B and bytes per pixel
+_PACKED_LAYOUTS = {
+    'rgba': (0, 1, 2, 4),
+    'bgra': (2, 1, 0, 4),
+    'rgb24': (0, 1, 2, 3),
+}
+
+
+def _is_skin(y: int, cb: int, cr: int) -> bool:
+    return (y >= MIN_LUMA and CB_RANGE[0] <= cb <= CB_RANGE[1]
+            and CR_RANGE[0] <= cr <= CR_RANGE[1])
+
+
+def skin_mask(data,
+              width: int,
+              height: int,
+              fmt: str,
+              grid_width: int = GRID_WIDTH,
+              grid_height: int = GRID_HEIGHT) -> Optional[List[bool]]:
+    """Row-major grid_width x grid_height skin classification of a raw frame.
+
+    Each cell is classified from the pixel at its centre.
+
+    Returns:
+        List of booleans or None for unsupported formats / short buffers
+    """
+    if width < 2 or height < 2:
+        return None
+    grid_width = min(grid_width, width)
+    grid_height = min(grid_height, height)
+    xs = [int((x + 0.5) * width / grid_width) for x in range(grid_width)]
+    ys = [int((y + 0.5) * height / grid_height) for y in range(grid_height)]
+
+    if fmt == 'i420':
+        chroma_w = width // 2
+        u_base = width * height
+        v_base = u_base + chroma_w * (height // 2)
+        if len(data) < v_base + chroma_w * (height // 2):
+            return None
+        return [_is_skin(data[y * width + x],
+                         data[u_base + min(y // 2, height // 2 - 1) * chroma_w + min(x // 2, chroma_w - 1)],
+                         data[v_base + min(y // 2, height // 2 - 1) * chroma_w + min(x // 2, chroma_w - 1)])
+                for y in ys for x in xs]
+
+    if fmt == 'nv12':
+        uv_base = width * height
+        if len(data) < uv_base + width * (height // 2):
+            return None
+        mask = []
+        for y in ys:
+            uv_row = uv_base + min(y // 2, height // 2 - 1) * width
+            for x in xs:
+                uv_idx = uv_row + min((x // 2) * 2, width - 2)
+                mask.append(_is_skin(data[y * width + x], data[uv_idx], data[uv_idx + 1]))
+        return mask
+
+    layout = _PACKED_LAYOUTS.get(fmt)
+    if layout is None:
+        return None
+    r_off, g_off, b_off, bpp = layout
+    if len(data) < width * height * bpp:
+        return None
+    mask = []
+    for y in ys:
+        for x in xs:
+            idx = (y * width + x) * bpp
+            r, g, b = data[idx + r_off], data[idx + g_off], data[idx + b_off]
+            # BT.601 full-range YCbCr, integer approximation
+            luma = (77 * r + 150 * g + 29 * b) >> 8
+            cb = 128 + ((-43 * r - 85 * g + 128 * b) >> 8)
+            cr = 128 + ((128 * r - 107 * g - 21 * b) >> 8)
+            mask.append(_is_skin(luma, cb, cr))
+    return mask
+
+
+def largest_region(mask: List[bool], grid_width: int, grid_height: int) -> Tuple[int, Optional[Tuple[int, int, int, int]]]:
+    """Size and (left, top, right, bottom) cell bounds of the largest 4-connected region."""
+    seen = bytearray(len(mask))
+    best_size, best_box = 0, None
+    for start, is_skin in enumerate(mask):
+        if not is_skin or seen[start]:
+            continue
+        seen[start] = 1
+        queue = collections.deque([start])
+        size = 0
+        left, top, right, bottom = grid_width, grid_height, 0, 0
+        while queue:
+            idx = queue.popleft()
+            size += 1
+            y, x = divmod(idx, grid_width)
+            left, right = min(left, x), max(right, x + 1)
+            top, bottom = min(top, y), max(bottom, y + 1)
+            for n, ok in ((idx - 1, x > 0), (idx + 1, x < grid_width - 1),
+                          (idx - grid_width, y > 0), (idx + grid_width, y < grid_height - 1)):
+                if ok and mask[n] and not seen[n]:
+                    seen[n] = 1
+                    queue.append(n)
+        if size > best_size:
+            best_size, best_box = size, (left, top, right, bottom)
+    return best_size, best_box
+
+
+def _shift_inside(start: float, end: float, limit: int) -> Tuple[float, float]:
+    if start < 0:
+        start, end = 0, end - start
+    if end > limit:
+        start, end = start - (end - limit), limit
+    return max(0, start), end
+
+
+class RegionOfInterestDetector:
+    """Finds the crop box for face/detail observations.
+
+    Args:
+        enabled: VISION_ROI (default off; 'on' crops face/detail observations)
+        margin: padding around the region as a fraction of its size (VISION_ROI_MARGIN, 0.25)
+        min_region: smallest skin region worth cropping to, as a fraction of
+            the grid (VISION_ROI_MIN_REGION, 0.01)
+        max_region: a region covering more than this fraction of the frame is
+            not cropped (VISION_ROI_MAX_REGION, 0.6)
+        min_crop: the crop never gets narrower/shorter than this fraction of
+            the frame, to avoid extreme zoom (VISION_ROI_MIN_CROP, 0.25)
+    """
+
+    def __init__(self,
+                 enabled: Optional[bool] = None,
+                 margin: Optional[float] = None,
+                 min_region: Optional[float] = None,
+                 max_region: Optional[float] = None,
+                 min_crop: Optional[float] = None):
+        if enabled is None:
+            enabled = os.getenv('VISION_ROI', 'off').lower() in ('on', 'true', '1')
+        if margin is None:
+            margin = float(os.getenv('VISION_ROI_MARGIN', '0.25'))
+        if min_region is None:
+            min_region = float(os.getenv('VISION_ROI_MIN_REGION', '0.01'))
+        if max_region is None:
+            max_region = float(os.getenv('VISION_ROI_MAX_REGION', '0.6'))
+        if min_crop is None:
+            min_crop = float(os.getenv('VISION_ROI_MIN_CROP', '0.25'))
+        self.enabled = enabled
+        self.margin = max(0.0, margin)
+        self.min_region = min_region
+        self.max_region = max_region
+        self.min_crop = min(1.0, max(0.05, min_crop))
+
+        self.attempts = 0
+        self.cropped = 0
+        self.last_crop: Optional[Tuple[int, int, int, int]] = None
+        self.last_area_ratio = 1.0
+
+    def find(self, data, width: int, height: int, fmt: str,
+             face: bool = False) -> Optional[Tuple[int, int, int, int]]:
+        """Crop box (left, top, right, bottom) in source pixels, or None for the whole frame."""
+        if not self.enabled:
+            return None
+        self.attempts += 1
+        self.last_crop = None
+        self.last_area_ratio = 1.0
+
+        mask = skin_mask(data, width, height, fmt)
+        if mask is None:
+            return None
+        grid_w, grid_h = min(GRID_WIDTH, width), min(GRID_HEIGHT, height)
+        size, box = largest_region(mask, grid_w, grid_h)
+        cells = grid_w * grid_h
+        if box is None or size < self.min_region * cells or size > self.max_region * cells:
+            return None
+
+        left, top, right, bottom = box
+        if face:
+            bottom = min(bottom, top + max(1, round((right - left) * FACE_ASPECT * grid_h / grid_w * width / height)))
+
+        # Cells -> source pixels, padded by the margin
+        cell_w, cell_h = width / grid_w, height / grid_h
+        pad_x = (right - left) * cell_w * self.margin
+        pad_y = (bottom - top) * cell_h * self.margin
+        x0, x1 = left * cell_w - pad_x, right * cell_w + pad_x
+        y0, y1 = top * cell_h - pad_y, bottom * cell_h + pad_y
+
+        # Enforce the minimum crop size around the region centre
+        min_w, min_h = width * self.min_crop, height * self.min_crop
+        if x1 - x0 < min_w:
+            cx = (x0 + x1) / 2
+            x0, x1 = cx - min_w / 2, cx + min_w / 2
+        if y1 - y0 < min_h:
+            cy = (y0 + y1) / 2
+            y0, y1 = cy - min_h / 2, cy + min_h / 2
+
+        # Shift back inside the frame, then clamp; even coordinates keep YUV chroma aligned
+        x0, x1 = _shift_inside(x0, x1, width)
+        y0, y1 = _shift_inside(y0, y1, height)
+        crop = (max(0, int(x0) & ~1), max(0, int(y0) & ~1),
+                min(width, (int(x1) + 1) & ~1), min(height, (int(y1) + 1) & ~1))
+        area_ratio = (crop[2] - crop[0]) * (crop[3] - crop[1]) / (width * height)
+        if area_ratio >= 0.9:
+            return None
+
+        self.cropped += 1
+        self.last_crop = crop
+        self.last_area_ratio = area_ratio
+        return crop
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "attempts": self.attempts,
+            "cropped": self.cropped,
+            "lastCrop": list(self.last_crop) if self.last_crop else None,
+            "lastAreaRatio": round(self.last_area_ratio, 3),
+        }
@@ -0,0 +1,126 @@
+"""
+Patient Video Track Registry
+Per-room index of subscribed patient video tracks, kept current by room events
+(track_subscribed / track_unsubscribed / participant_disconnected).
+
+Lookups are O(1) and callers that need a track before the patient's camera is
+up await a future that the next track_subscribed event resolves - no polling
+per call or per participant.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from livekit import rtc
+
+logger = logging.getLogger("mediai-avatar")
+
+# Avatar workers publish video too - never treat them as the patient
+AVATAR_IDENTITIES = ('bey-avatar-agent', 'tavus-avatar', 'avatar-agent')
+
+
+def is_avatar_identity(identity: str) -> bool:
+    identity = (identity or '').lower()
+    return identity in AVATAR_IDENTITIES or 'avatar' in identity
+
+
+class TrackRegistry:
+    """Subscribed patient video tracks of one room, indexed by participant identity."""
+
+    def __init__(self, room: rtc.Room):
+        self._room = room
+        self._tracks: Dict[str, rtc.Track] = {}
+        self._waiters: List[Tuple[Optional[str], asyncio.Future]] = []
+        self._handlers = {
+            "track_published": self._on_track_published,
+            "track_subscribed": self._on_track_subscribed,
+            "track_unsubscribed": self._on_track_unsubscribed,
+            "participant_disconnected": self._on_participant_disconnected,
+        }
+        for event, handler in self._handlers.items():
+            room.on(event, handler)
+
+        # Participants that were already in the room before the registry existed
+        for participant in room.remote_participants.values():
+            for publication in participant.track_publications.values():
+                if publication.track is not None:
+                    self._on_track_subscribed(publication.track, publication, participant)
+                else:
+                    self._on_track_published(publication, participant)
+
+    @staticmethod
+    def _is_patient_video(publication, participant) -> bool:
+        return publication.kind == rtc.TrackKind.KIND_VIDEO and not is_avatar_identity(participant.identity)
+
+    def _on_track_published(self, publication, participant):
+        if not self._is_patient_video(publication, participant):
+            return
+        try:
+            if not publication.subscribed:
+                publication.set_subscribed(True)
+        except Exception as e:
+            logger.warning(f"[Vision] Could not subscribe to video track: {e}")
+
+    def _on_track_subscribed(self, track, publication, participant):
+        if not self._is_patient_video(publication, participant):
+            return
+        self._tracks[participant.identity] = track
+        logger.info(f"[Vision] Video track registered for {participant.identity} ({publication.sid})")
+
+        pending = []
+        for identity, waiter in self._waiters:
+            if identity is not None and identity != participant.identity:
+                pending.append((identity, waiter))
+            elif not waiter.done():
+                waiter.set_result((participant.identity, track))
+        self._waiters = pending
+
+    def _on_track_unsubscribed(self, track, publication, participant):
+        if self._tracks.get(participant.identity) is track:
+            del self._tracks[participant.identity]
+            logger.info(f"[Vision] Video track removed for {participant.identity}")
+
+    def _on_participant_disconnected(self, participant):
+        if self._tracks.pop(participant.identity, None) is not None:
+            logger.info(f"[Vision] Video track removed for {participant.identity} (disconnected)")
+
+    def get_video_track(self, identity: Optional[str] = None) -> Optional[Tuple[str, rtc.Track]]:
+        """(identity, track) for identity, or for any patient when identity is None."""
+        if identity is not None:
+            track = self._tracks.get(identity)
+            return (identity, track) if track is not None else None
+        for identity, track in self._tracks.items():
+            return identity, track
+        return None
+
+    async def wait_for_video_track(self,
+                                   identity: Optional[str] = None,
+                                   timeout: float = 5.0) -> Optional[Tuple[str, rtc.Track]]:
+        """Current patient track, or the next one subscribed within timeout (None otherwise)."""
+        found = self.get_video_track(identity)
+        if found is not None:
+            return found
+
+        entry = (identity, asyncio.get_running_loop().create_future())
+        self._waiters.append(entry)
+        try:
+            return await asyncio.wait_for(entry[1], timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+
+    def close(self):
+        """Detach from room events and release any waiters."""
+        for event, handler in self._handlers.items():
+            try:
+                self._room.off(event, handler)
+            except Exception:
+                pass
+        for _, waiter in self._waiters:
+            if not waiter.done():
+                waiter.cancel()
+        self._waiters.clear()
+        self._tracks.clear()
@@ -0,0 +1,375 @@
+"""
+YUV to RGB Colour Conversion Engine
+Pluggable BT.601 converters for the vision pipeline.
+
+All backends produce bit-identical output to the original per-pixel loop:
+    R = clamp((298*C + 409*E + 128) >> 8)
+    G = clamp((298*C - 100*D - 208*E + 128) >> 8)
+    B = clamp((298*C + 516*D + 128) >> 8)
+with C = Y - 16, D = U - 128, E = V - 128.
+
+Backends:
+- numpy: vectorized over whole planes (fastest, default when NumPy is importable)
+- table: pure Python, lookup tables + C-level gathers per row (no NumPy needed)
+- pure:  reference per-pixel loop, kept for hosts where nothing else is safe
+
+Downscaling: with box filtering (the default) the numpy backend averages the
+Y/U/V samples of every source cell that maps onto an output pixel before the
+colour conversion, so strong single-pass downscales do not alias fine texture.
+table/pure always sample one source pixel per output pixel; the bit-identical
+guarantee above holds for box_filter=False.
+"""
+
+import logging
+import os
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+from .geometry import OutputGeometry
+
+logger = logging.getLogger("mediai-avatar")
+
+# NumPy is optional - table/pure backends cover hosts without it
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Default 1/2 resolution sampling when no output geometry is given
+DEFAULT_DOWNSAMPLE_FACTOR = 2
+
+# Offset folded into the luma table so (value >> 8) is always a valid
+# non-negative index into _CLAMP (adding a multiple of 256 commutes with >> 8)
+_CLAMP_OFFSET = 1024
+_Y_TABLE = [298 * (i - 16) + 128 + (_CLAMP_OFFSET << 8) for i in range(256)]
+_RV_TABLE = [409 * (i - 128) for i in range(256)]
+_GU_TABLE = [-100 * (i - 128) for i in range(256)]
+_GV_TABLE = [-208 * (i - 128) for i in range(256)]
+_BU_TABLE = [516 * (i - 128) for i in range(256)]
+_CLAMP = bytes(max(0, min(255, i - _CLAMP_OFFSET)) for i in range(2 * _CLAMP_OFFSET))
+
+
+class ChromaLayout:
+    """Describes where U/V samples live inside a planar/semi-planar buffer.
+
+    I420: U and V are separate planes (stride = width // 2, step = 1)
+    NV12: U and V are interleaved in one plane (stride = width, step = 2)
+    """
+
+    def __init__(self, u_offset: int, v_offset: int, stride: int, step: int):
+        self.u_offset = u_offset
+        self.v_offset = v_offset
+        self.stride = stride
+        self.step = step
+
+
+class ConversionBackend:
+    """Base class for YUV to RGB backends."""
+
+    name = "base"
+
+    def convert(self, data, width: int, height: int, chroma: ChromaLayout,
+                src_xs: List[int], src_ys: List[int],
+                out: Optional[bytearray] = None,
+                box_end: Optional[Tuple[int, int]] = None) -> bytearray:
+        """Convert the sampled grid (src_ys x src_xs) to packed RGB24.
+
+        When out is given (at least len(src_xs) * len(src_ys) * 3 bytes, e.g.
+        from a BufferPool) the pixels are written into it and it is returned.
+
+        box_end = (right, bottom) asks for box filtering: output pixel (x, y)
+        averages source columns src_xs[x]..src_xs[x + 1] (right for the last
+        one) and the matching rows. Backends without filtering ignore it.
+        """
+        raise NotImplementedError
+
+
+class PurePythonBackend(ConversionBackend):
+    """Reference per-pixel implementation (slow, no dependencies)."""
+
+    name = "pure"
+
+    def convert(self, data, width, height, chroma, src_xs, src_ys, out=None, box_end=None):
+        out_w = len(src_xs)
+        rgb_data = out if out is not None else bytearray(out_w * len(src_ys) * 3)
+        idx = 0
+
+        for src_y in src_ys:
+            y_row = src_y * width
+            uv_row = (src_y // 2) * chroma.stride
+            for src_x in src_xs:
+                uv_idx = uv_row + (src_x // 2) * chroma.step
+
+                Y = data[y_row + src_x]
+                U = data[chroma.u_offset + uv_idx]
+                V = data[chroma.v_offset + uv_idx]
+
+                C = Y - 16
+                D = U - 128
+                E = V - 128
+
+                rgb_data[idx] = max(0, min(255, (298 * C + 409 * E + 128) >> 8))
+                rgb_data[idx + 1] = max(0, min(255, (298 * C - 100 * D - 208 * E + 128) >> 8))
+                rgb_data[idx + 2] = max(0, min(255, (298 * C + 516 * D + 128) >> 8))
+                idx += 3
+
+        return rgb_data
+
+
+def _gather(indices: List[int]):
+    """itemgetter that always returns a tuple (even for a single index)."""
+    if len(indices) == 1:
+        single = indices[0]
+        return lambda seq: (seq[single], )
+    return itemgetter(*indices)
+
+
+class TableBackend(ConversionBackend):
+    """Pure-Python backend using lookup tables and row-level gathers.
+
+    Each output row is gathered with a single itemgetter call per plane and
+    written into the RGB buffer with strided slice assignment, so the only
+    Python-level work per pixel is a few table lookups.
+    """
+
+    name = "table"
+
+    def convert(self, data, width, height, chroma, src_xs, src_ys, out=None, box_end=None):
+        out_w = len(src_xs)
+        row_bytes = out_w * 3
+        rgb_data = out if out is not None else bytearray(row_bytes * len(src_ys))
+
+        get_luma = _gather(src_xs)
+        get_chroma = _gather([(x // 2) * chroma.step for x in src_xs])
+        chroma_row_len = (src_xs[-1] // 2) * chroma.step + 1 if src_xs else 0
+
+        y_table, rv, gu, gv, bu, clamp = (_Y_TABLE, _RV_TABLE, _GU_TABLE,
+                                          _GV_TABLE, _BU_TABLE, _CLAMP)
+
+        for row, src_y in enumerate(src_ys):
+            y_start = src_y * width
+            uv_start = (src_y // 2) * chroma.stride
+            u_start = chroma.u_offset + uv_start
+            v_start = chroma.v_offset + uv_start
+
+            luma = [y_table[v] for v in get_luma(data[y_start:y_start + width])]
+            us = get_chroma(data[u_start:u_start + chroma_row_len])
+            vs = get_chroma(data[v_start:v_start + chroma_row_len])
+
+            base = row * row_bytes
+            end = base + row_bytes
+            rgb_data[base:end:3] = bytes(
+                [clamp[(c + rv[v]) >> 8] for c, v in zip(luma, vs)])
+            rgb_data[base + 1:end:3] = bytes([
+                clamp[(c + gu[u] + gv[v]) >> 8]
+                for c, u, v in zip(luma, us, vs)
+            ])
+            rgb_data[base + 2:end:3] = bytes(
+                [clamp[(c + bu[u]) >> 8] for c, u in zip(luma, us)])
+
+        return rgb_data
+
+
+def _box_average(plane, row_starts, col_starts):
+    """Rounded mean of each cell of a 2-D uint8 plane.
+
+    Cell (i, j) spans rows row_starts[i]..row_starts[i + 1] and columns
+    col_starts[j]..col_starts[j + 1] (to the plane edge for the last one).
+    Repeated starts (cells narrower than one chroma sample) take that sample.
+    """
+    sums = np.add.reduceat(np.add.reduceat(plane, row_starts, axis=0, dtype=np.uint32),
+                           col_starts, axis=1)
+    row_counts = np.diff(row_starts, append=plane.shape[0])
+    col_counts = np.diff(col_starts, append=plane.shape[1])
+    counts = (np.maximum(row_counts, 1)[:, None] * np.maximum(col_counts, 1)[None, :]).astype(np.uint32)
+    return ((sums + counts // 2) // counts).astype(np.int32)
+
+
+class NumpyBackend(ConversionBackend):
+    """Vectorized backend operating on whole planes at once.
+
+    With box_end it box-filters the Y/U/V planes (np.add.reduceat over the
+    sampling cells) instead of picking one source pixel per output pixel.
+    """
+
+    name = "numpy"
+
+    def convert(self, data, width, height, chroma, src_xs, src_ys, out=None, box_end=None):
+        out_w = len(src_xs)
+        out_h = len(src_ys)
+        buf = np.frombuffer(data, dtype=np.uint8)
+
+        if box_end is not None and (box_end[0] - src_xs[0] > out_w or box_end[1] - src_ys[0] > out_h):
+            Y, U, V = self._box_filtered_planes(buf, width, height, chroma, src_xs, src_ys, box_end)
+            C = Y * 298 + (128 - 16 * 298)
+            D = U - 128
+            E = V - 128
+        else:
+            xs = np.asarray(src_xs, dtype=np.intp)
+            ys = np.asarray(src_ys, dtype=np.intp)
+            luma_idx = ys[:, None] * width + xs[None, :]
+            uv_idx = ((ys // 2) * chroma.stride)[:, None] + ((xs // 2) * chroma.step)[None, :]
+
+            C = buf[luma_idx].astype(np.int32) * 298 + (128 - 16 * 298)
+            D = buf[chroma.u_offset + uv_idx].astype(np.int32) - 128
+            E = buf[chroma.v_offset + uv_idx].astype(np.int32) - 128
+
+        rgb_data = out if out is not None else bytearray(out_w * out_h * 3)
+        pixels = np.frombuffer(rgb_data, dtype=np.uint8, count=out_w * out_h * 3).reshape(out_h, out_w, 3)
+        pixels[:, :, 0] = np.clip((C + 409 * E) >> 8, 0, 255)
+        pixels[:, :, 1] = np.clip((C - 100 * D - 208 * E) >> 8, 0, 255)
+        pixels[:, :, 2] = np.clip((C + 516 * D) >> 8, 0, 255)
+        return rgb_data
+
+    @staticmethod
+    def _box_filtered_planes(buf, width, height, chroma, src_xs, src_ys, box_end):
+        """Per-output-pixel Y, U, V means over the sampling cells (int32 arrays)."""
+        left, top = src_xs[0], src_ys[0]
+        right, bottom = box_end
+        xs = np.asarray(src_xs, dtype=np.intp)
+        ys = np.asarray(src_ys, dtype=np.intp)
+
+        luma = buf[:height * width].reshape(height, width)[top:bottom, left:right]
+        Y = _box_average(luma, ys - top, xs - left)
+
+        # Chroma cells: the 2x2-subsampled columns/rows covering each luma cell
+        uv_width, uv_height = width // 2, height // 2
+        uv_left, uv_top = left // 2, top // 2
+        uv_right = min(uv_width, (right + 1) // 2)
+        uv_bottom = min(uv_height, (bottom + 1) // 2)
+        uv_cols = np.minimum(xs // 2, uv_right - 1) - uv_left
+        uv_rows = np.minimum(ys // 2, uv_bottom - 1) - uv_top
+        plane_bytes = uv_bottom * chroma.stride
+        if chroma.step == 1:
+            u_plane = buf[chroma.u_offset:chroma.u_offset + plane_bytes].reshape(uv_bottom, chroma.stride)
+            v_plane = buf[chroma.v_offset:chroma.v_offset + plane_bytes].reshape(uv_bottom, chroma.stride)
+        else:
+            interleaved = buf[chroma.u_offset:chroma.u_offset + plane_bytes].reshape(uv_bottom, chroma.stride // 2, 2)
+            u_plane, v_plane = interleaved[:, :, 0], interleaved[:, :, 1]
+        U = _box_average(u_plane[uv_top:uv_bottom, uv_left:uv_right], uv_rows, uv_cols)
+        V = _box_average(v_plane[uv_top:uv_bottom, uv_left:uv_right], uv_rows, uv_cols)
+        return Y, U, V
+
+
+_BACKENDS: Dict[str, ConversionBackend] = {
+    PurePythonBackend.name: PurePythonBackend(),
+    TableBackend.name: TableBackend(),
+}
+if NUMPY_AVAILABLE:
+    _BACKENDS[NumpyBackend.name] = NumpyBackend()
+
+
+def available_backends() -> List[str]:
+    """Names of the backends usable on this host, fastest first."""
+    order = [NumpyBackend.name, TableBackend.name, PurePythonBackend.name]
+    return [name for name in order if name in _BACKENDS]
+
+
+def get_backend(name: Optional[str] = None) -> ConversionBackend:
+    """Resolve a backend by name (or VISION_YUV_BACKEND, default "auto").
+
+    Unknown or unavailable names fall back to the fastest available backend.
+    """
+    name = (name or os.getenv('VISION_YUV_BACKEND', 'auto')).lower()
+    if name in _BACKENDS:
+        return _BACKENDS[name]
+    if name != 'auto':
+        logger.warning(
+            f"[Vision] YUV backend '{name}' not available, using {available_backends()[0]}")
+    return _BACKENDS[available_backends()[0]]
+
+
+def _default_geometry(width: int, height: int) -> OutputGeometry:
+    """Historical behaviour: plain 1/2 resolution sampling of the full frame."""
+    size = (width // DEFAULT_DOWNSAMPLE_FACTOR, height // DEFAULT_DOWNSAMPLE_FACTOR)
+    return OutputGeometry(crop=(0, 0, width, height), sample_size=size, output_size=size)
+
+
+def i420_to_rgb(
+    yuv_data,
+    width: int,
+    height: int,
+    backend: Optional[ConversionBackend] = None,
+    geometry: Optional[OutputGeometry] = None,
+    out: Optional[bytearray] = None,
+    box_filter: bool = True
+) -> Optional[Tuple[bytearray, Tuple[int, int]]]:
+    """Convert I420/YUV420p to packed RGB24.
+
+    I420 format: Y plane (width*height) + U plane (width/2*height/2) + V plane (width/2*height/2)
+
+    Colour conversion, cropping and downscaling happen in one pass: only the
+    pixels on the geometry's sampling grid are read (default: 1/2 resolution).
+    With box_filter each output pixel averages its source cell on backends
+    that support it (numpy); False keeps plain grid sampling.
+    The result is written into out when it is given and large enough.
+
+    Returns:
+        (rgb_bytes, (out_width, out_height)) or None if the buffer is too small
+    """
+    y_size = width * height
+    uv_size = (width // 2) * (height // 2)
+
+    if len(yuv_data) < y_size + 2 * uv_size:
+        logger.warning(f"[Vision] I420 data too small: {len(yuv_data)} < {y_size + 2 * uv_size}")
+        return None
+
+    geometry = geometry or _default_geometry(width, height)
+    src_xs, src_ys = geometry.sample_grid()
+    if not src_xs or not src_ys:
+        return None
+
+    chroma = ChromaLayout(u_offset=y_size,
+                          v_offset=y_size + uv_size,
+                          stride=width // 2,
+                          step=1)
+    backend = backend or get_backend()
+    if out is not None and len(out) < len(src_xs) * len(src_ys) * 3:
+        out = None
+    box_end = (geometry.crop[2], geometry.crop[3]) if box_filter else None
+    rgb = backend.convert(yuv_data, width, height, chroma, src_xs, src_ys, out, box_end)
+    return rgb, (len(src_xs), len(src_ys))
+
+
+def nv12_to_rgb(
+    nv12_data,
+    width: int,
+    height: int,
+    backend: Optional[ConversionBackend] = None,
+    geometry: Optional[OutputGeometry] = None,
+    out: Optional[bytearray] = None,
+    box_filter: bool = True
+) -> Optional[Tuple[bytearray, Tuple[int, int]]]:
+    """Convert NV12 to packed RGB24.
+
+    NV12 format: Y plane (width*height) + interleaved UV plane (width*height/2)
+
+    Sampling follows the same single-pass geometry rules as i420_to_rgb.
+
+    Returns:
+        (rgb_bytes, (out_width, out_height)) or None if the buffer is too small
+    """
+    y_size = width * height
+    uv_size = width * (height // 2)
+
+    if len(nv12_data) < y_size + uv_size:
+        logger.warning(f"[Vision] NV12 data too small: {len(nv12_data)} < {y_size + uv_size}")
+        return None
+
+    geometry = geometry or _default_geometry(width, height)
+    src_xs, src_ys = geometry.sample_grid()
+    if not src_xs or not src_ys:
+        return None
+
+    chroma = ChromaLayout(u_offset=y_size,
+                          v_offset=y_size + 1,
+                          stride=width,
+                          step=2)
+    backend = backend or get_backend()
+    if out is not None and len(out) < len(src_xs) * len(src_ys) * 3:
+        out = None
+    box_end = (geometry.crop[2], geometry.crop[3]) if box_filter else None
+    rgb = backend.convert(nv12_data, width, height, chroma, src_xs, src_ys, out, box_end)
+    return rgb, (len(src_xs), len(src_ys))